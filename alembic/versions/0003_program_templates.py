@@ -0,0 +1,27 @@
+"""add program template cache
+
+Revision ID: 0003_program_templates
+Revises: 0002_profile_strength
+Create Date: 2024-02-01 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_program_templates"
+down_revision = "0002_profile_strength"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "program_templates",
+        sa.Column("cache_key", sa.String(length=64), primary_key=True),
+        sa.Column("template_json", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("program_templates")
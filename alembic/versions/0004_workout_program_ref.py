@@ -0,0 +1,84 @@
+"""reference programs from workouts and store plan JSON as JSONB
+
+Revision ID: 0004_workout_program_ref
+Revises: 0003_program_templates
+Create Date: 2024-02-15 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_workout_program_ref"
+down_revision = "0003_program_templates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "programs",
+        "program_json",
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        postgresql_using="program_json::jsonb",
+    )
+    op.alter_column(
+        "workouts",
+        "plan_json",
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        postgresql_using="plan_json::jsonb",
+    )
+
+    op.add_column(
+        "workouts",
+        sa.Column("program_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("programs.id"), nullable=True),
+    )
+    op.add_column("workouts", sa.Column("day_index", sa.Integer(), nullable=True))
+
+    # Backfill: attach each workout to the newest program the user had on that
+    # date, then locate its day within that program by name.
+    op.execute(
+        """
+        UPDATE workouts AS w
+        SET program_id = (
+            SELECT p.id
+            FROM programs AS p
+            WHERE p.user_id = w.user_id AND p.created_at::date <= w.date
+            ORDER BY p.created_at DESC
+            LIMIT 1
+        )
+        WHERE w.program_id IS NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE workouts AS w
+        SET day_index = d.ordinality - 1
+        FROM programs AS p
+        CROSS JOIN LATERAL jsonb_array_elements(p.program_json -> 'days') WITH ORDINALITY AS d(day, ordinality)
+        WHERE p.id = w.program_id
+          AND w.day_index IS NULL
+          AND d.day ->> 'day' = w.day_name
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("workouts", "day_index")
+    op.drop_column("workouts", "program_id")
+    op.alter_column(
+        "workouts",
+        "plan_json",
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        postgresql_using="plan_json::json",
+    )
+    op.alter_column(
+        "programs",
+        "program_json",
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        postgresql_using="program_json::json",
+    )
@@ -0,0 +1,94 @@
+"""range-partition workout_logs by month
+
+Revision ID: 0005_partition_workout_logs
+Revises: 0004_workout_program_ref
+Create Date: 2024-03-01 00:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0005_partition_workout_logs"
+down_revision = "0004_workout_program_ref"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, user_id, workout_id, exercise_id, actual_weight, target_weight, sets, reps, completed, logged_at"
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE workout_logs RENAME TO workout_logs_unpartitioned")
+    op.execute("ALTER TABLE workout_logs_unpartitioned RENAME CONSTRAINT workout_logs_pkey TO workout_logs_unpartitioned_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE workout_logs (
+            id UUID NOT NULL,
+            user_id UUID NOT NULL REFERENCES users (id),
+            workout_id UUID NOT NULL REFERENCES workouts (id),
+            exercise_id VARCHAR NOT NULL,
+            actual_weight DOUBLE PRECISION,
+            target_weight DOUBLE PRECISION,
+            sets INTEGER,
+            reps VARCHAR,
+            completed BOOLEAN NOT NULL DEFAULT true,
+            logged_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            PRIMARY KEY (id, logged_at)
+        ) PARTITION BY RANGE (logged_at)
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_workout_logs_user_exercise_logged_at ON workout_logs (user_id, exercise_id, logged_at)"
+    )
+    op.execute("CREATE INDEX ix_workout_logs_user_logged_at ON workout_logs (user_id, logged_at)")
+
+    # One partition per month from the oldest existing log through three months
+    # ahead; `python -m app.db.partitions maintain` keeps extending the window.
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            first_month date := date_trunc(
+                'month', coalesce((SELECT min(logged_at) FROM workout_logs_unpartitioned), now()) AT TIME ZONE 'UTC'
+            )::date;
+            last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months')::date;
+            month date;
+        BEGIN
+            month := first_month;
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF workout_logs FOR VALUES FROM (%L) TO (%L)',
+                    'workout_logs_' || to_char(month, 'YYYY_MM'),
+                    month::text || ' 00:00:00+00',
+                    (month + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+    op.execute(f"INSERT INTO workout_logs ({COLUMNS}) SELECT {COLUMNS} FROM workout_logs_unpartitioned")
+    op.execute("DROP TABLE workout_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE workout_logs RENAME TO workout_logs_partitioned")
+    op.execute(
+        """
+        CREATE TABLE workout_logs (
+            id UUID PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES users (id),
+            workout_id UUID NOT NULL REFERENCES workouts (id),
+            exercise_id VARCHAR NOT NULL,
+            actual_weight DOUBLE PRECISION,
+            target_weight DOUBLE PRECISION,
+            sets INTEGER,
+            reps VARCHAR,
+            completed BOOLEAN NOT NULL DEFAULT true,
+            logged_at TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+        """
+    )
+    op.execute(f"INSERT INTO workout_logs ({COLUMNS}) SELECT {COLUMNS} FROM workout_logs_partitioned")
+    op.execute("DROP TABLE workout_logs_partitioned CASCADE")
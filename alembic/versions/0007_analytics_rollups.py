@@ -0,0 +1,79 @@
+"""add analytics rollup tables
+
+Revision ID: 0007_analytics_rollups
+Revises: 0006_exercise_catalog
+Create Date: 2024-03-22 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007_analytics_rollups"
+down_revision = "0006_exercise_catalog"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_workouts_date", "workouts", ["date"])
+    op.create_index("ix_workouts_finished_at", "workouts", ["finished_at"])
+
+    op.create_table(
+        "rollup_state",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("high_water", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "analytics_daily_activity",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("planned", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("finished", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("logs", sa.Integer(), nullable=False, server_default="0"),
+    )
+    for table, period in (
+        ("analytics_daily_muscle_volume", "day"),
+        ("analytics_weekly_muscle_volume", "week_start"),
+    ):
+        op.create_table(
+            table,
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(period, sa.Date(), primary_key=True),
+            sa.Column("muscle_group", sa.String(), primary_key=True),
+            sa.Column("sets", sa.Float(), nullable=False, server_default="0"),
+            sa.Column("volume_kg", sa.Float(), nullable=False, server_default="0"),
+        )
+    op.create_table(
+        "analytics_exercise_bests",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("exercise_id", sa.String(), primary_key=True),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("achieved_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "analytics_personal_records",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("exercise_id", sa.String(), primary_key=True),
+        sa.Column("achieved_at", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("previous_best", sa.Float(), nullable=True),
+    )
+    op.create_index(
+        "ix_analytics_personal_records_user_achieved_at",
+        "analytics_personal_records",
+        ["user_id", "achieved_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analytics_personal_records_user_achieved_at", table_name="analytics_personal_records")
+    op.drop_table("analytics_personal_records")
+    op.drop_table("analytics_exercise_bests")
+    op.drop_table("analytics_weekly_muscle_volume")
+    op.drop_table("analytics_daily_muscle_volume")
+    op.drop_table("analytics_daily_activity")
+    op.drop_table("rollup_state")
+    op.drop_index("ix_workouts_finished_at", table_name="workouts")
+    op.drop_index("ix_workouts_date", table_name="workouts")
@@ -0,0 +1,35 @@
+"""add strength standards table
+
+Revision ID: 0008_strength_standards
+Revises: 0007_analytics_rollups
+Create Date: 2024-03-29 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_strength_standards"
+down_revision = "0007_analytics_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "strength_standards",
+        sa.Column("lift", sa.String(), primary_key=True),
+        sa.Column("sex", sa.String(), primary_key=True),
+        sa.Column("weight_class", sa.Integer(), primary_key=True),
+        sa.Column("age_band", sa.Integer(), primary_key=True),
+        sa.Column("sample_size", sa.Integer(), nullable=False),
+        sa.Column("p10", sa.Float(), nullable=False),
+        sa.Column("p25", sa.Float(), nullable=False),
+        sa.Column("p50", sa.Float(), nullable=False),
+        sa.Column("p75", sa.Float(), nullable=False),
+        sa.Column("p90", sa.Float(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("strength_standards")
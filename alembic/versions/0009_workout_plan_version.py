@@ -0,0 +1,29 @@
+"""version workout plans and keep recent JSON Patch diffs
+
+Revision ID: 0009_workout_plan_version
+Revises: 0008_strength_standards
+Create Date: 2024-04-05 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009_workout_plan_version"
+down_revision = "0008_strength_standards"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Constant defaults: Postgres adds both columns without rewriting the table.
+    op.add_column("workouts", sa.Column("plan_version", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column(
+        "workouts",
+        sa.Column("plan_patches", postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("workouts", "plan_patches")
+    op.drop_column("workouts", "plan_version")
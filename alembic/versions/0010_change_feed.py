@@ -0,0 +1,141 @@
+"""per-user change feed for offline sync
+
+Revision ID: 0010_change_feed
+Revises: 0009_workout_plan_version
+Create Date: 2024-04-12 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010_change_feed"
+down_revision = "0009_workout_plan_version"
+branch_labels = None
+depends_on = None
+
+# entity name -> (row id column, backfill ordering column)
+ENTITIES = {
+    "programs": ("id", "created_at"),
+    "user_preferences": ("user_id", None),
+    "workouts": ("id", "date"),
+    "workout_logs": ("id", "logged_at"),
+}
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default="0"))
+    op.create_table(
+        "change_feed",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("entity", sa.String(), primary_key=True),
+        sa.Column("entity_id", sa.String(), primary_key=True),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+        sa.Column("op", sa.String(), nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_change_feed_user_seq", "change_feed", ["user_id", "seq"], unique=True)
+
+    # Bumping users.change_seq row-locks the user until commit, so a user's
+    # sequence numbers become visible in order and a cursor never skips a
+    # change that commits late. The triggers are deferred: the user lock is
+    # taken at commit, after every other row lock the transaction needs, so
+    # it cannot be part of a lock cycle. Each entity keeps one feed row: its
+    # latest state, or a tombstone once deleted.
+    op.execute(
+        """
+        CREATE FUNCTION record_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            row_data jsonb;
+            owner uuid;
+            next_seq bigint;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_data := to_jsonb(OLD);
+            ELSE
+                row_data := to_jsonb(NEW) - 'plan_patches';
+            END IF;
+            owner := (row_data ->> 'user_id')::uuid;
+            UPDATE users SET change_seq = change_seq + 1 WHERE id = owner RETURNING change_seq INTO next_seq;
+            IF next_seq IS NULL THEN
+                RETURN NULL;
+            END IF;
+            INSERT INTO change_feed (user_id, entity, entity_id, seq, op, data, changed_at)
+            VALUES (
+                owner,
+                TG_ARGV[0],
+                row_data ->> TG_ARGV[1],
+                next_seq,
+                CASE WHEN TG_OP = 'DELETE' THEN 'delete' ELSE 'upsert' END,
+                CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE row_data END,
+                now()
+            )
+            ON CONFLICT (user_id, entity, entity_id) DO UPDATE
+            SET seq = EXCLUDED.seq, op = EXCLUDED.op, data = EXCLUDED.data, changed_at = EXCLUDED.changed_at;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, (id_column, _) in ENTITIES.items():
+        # TG_TABLE_NAME would be the partition for workout_logs, so the entity
+        # name is passed explicitly. Triggers on a partitioned table are
+        # cloned onto every current and future partition.
+        op.execute(
+            f"""
+            CREATE CONSTRAINT TRIGGER {table}_change_feed_write AFTER INSERT OR DELETE ON {table}
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION record_change('{table}', '{id_column}')
+            """
+        )
+        op.execute(
+            f"""
+            CREATE CONSTRAINT TRIGGER {table}_change_feed_update AFTER UPDATE ON {table}
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+            EXECUTE FUNCTION record_change('{table}', '{id_column}')
+            """
+        )
+
+    # Existing rows enter the feed oldest first, so a client starting from
+    # cursor 0 receives everything.
+    backfill = " UNION ALL ".join(
+        f"""
+        SELECT user_id, '{table}' AS entity, {id_column}::text AS entity_id,
+               to_jsonb(t) - 'plan_patches' AS data, {order or "NULL::timestamptz"}::timestamptz AS ordered_at
+        FROM {table} t
+        """
+        for table, (id_column, order) in ENTITIES.items()
+    )
+    op.execute(
+        f"""
+        INSERT INTO change_feed (user_id, entity, entity_id, seq, op, data, changed_at)
+        SELECT user_id, entity, entity_id,
+               row_number() OVER (PARTITION BY user_id ORDER BY ordered_at NULLS FIRST, entity, entity_id),
+               'upsert', data, now()
+        FROM ({backfill}) AS existing
+        """
+    )
+    op.execute(
+        """
+        UPDATE users SET change_seq = feed.last_seq
+        FROM (SELECT user_id, max(seq) AS last_seq FROM change_feed GROUP BY user_id) AS feed
+        WHERE users.id = feed.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    for table in ENTITIES:
+        op.execute(f"DROP TRIGGER {table}_change_feed_update ON {table}")
+        op.execute(f"DROP TRIGGER {table}_change_feed_write ON {table}")
+    op.execute("DROP FUNCTION record_change()")
+    op.drop_index("ix_change_feed_user_seq", table_name="change_feed")
+    op.drop_table("change_feed")
+    op.drop_column("users", "change_seq")
@@ -0,0 +1,66 @@
+"""let the archive job bypass the change feed; index logs by workout
+
+Revision ID: 0011_archive_support
+Revises: 0010_change_feed
+Create Date: 2024-04-19 00:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0011_archive_support"
+down_revision = "0010_change_feed"
+branch_labels = None
+depends_on = None
+
+_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_change() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    row_data jsonb;
+    owner uuid;
+    next_seq bigint;
+BEGIN
+    {archive_check}
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW) - 'plan_patches';
+    END IF;
+    owner := (row_data ->> 'user_id')::uuid;
+    UPDATE users SET change_seq = change_seq + 1 WHERE id = owner RETURNING change_seq INTO next_seq;
+    IF next_seq IS NULL THEN
+        RETURN NULL;
+    END IF;
+    INSERT INTO change_feed (user_id, entity, entity_id, seq, op, data, changed_at)
+    VALUES (
+        owner,
+        TG_ARGV[0],
+        row_data ->> TG_ARGV[1],
+        next_seq,
+        CASE WHEN TG_OP = 'DELETE' THEN 'delete' ELSE 'upsert' END,
+        CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE row_data END,
+        now()
+    )
+    ON CONFLICT (user_id, entity, entity_id) DO UPDATE
+    SET seq = EXCLUDED.seq, op = EXCLUDED.op, data = EXCLUDED.data, changed_at = EXCLUDED.changed_at;
+    RETURN NULL;
+END
+$$
+"""
+
+# Set with SET LOCAL by app/db/archive.py: archived rows leave the feed
+# instead of turning into tombstones every client would have to download.
+_ARCHIVE_CHECK = """IF current_setting('gymbuddy.archiving', true) = 'on' THEN
+        RETURN NULL;
+    END IF;"""
+
+
+def upgrade() -> None:
+    op.execute(_FUNCTION.format(archive_check=_ARCHIVE_CHECK))
+    # Deleting an archived workout checks the workout_logs foreign key; without
+    # this index that check scans every partition.
+    op.execute("CREATE INDEX ix_workout_logs_workout_id ON workout_logs (workout_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_workout_logs_workout_id")
+    op.execute(_FUNCTION.format(archive_check=""))
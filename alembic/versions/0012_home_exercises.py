@@ -0,0 +1,50 @@
+"""add pulls and presses that need only dumbbells or bodyweight
+
+Revision ID: 0012_home_exercises
+Revises: 0011_archive_support
+Create Date: 2024-04-26 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0012_home_exercises"
+down_revision = "0011_archive_support"
+branch_labels = None
+depends_on = None
+
+# The program templates need these to fill every pull and overhead-press slot
+# with dumbbells or bodyweight alone.
+# (id, display name, aliases, muscle groups, equipment)
+NEW_EXERCISES = [
+    ("pike_push_up", "Pike Push-Up", ["pike pushup", "pike press"], ["shoulders", "triceps"], ["bodyweight"]),
+    ("bent_over_dumbbell_row", "Bent-Over Dumbbell Row", ["two arm dumbbell row", "db bent over row"], ["upper_back", "lats", "biceps"], ["dumbbell"]),
+    ("doorframe_row", "Doorframe Row", ["door frame row", "doorway row"], ["upper_back", "lats", "biceps"], ["bodyweight"]),
+]
+
+
+def upgrade() -> None:
+    exercises = sa.table(
+        "exercises",
+        sa.column("id", sa.String()),
+        sa.column("name", sa.String()),
+        sa.column("aliases", postgresql.ARRAY(sa.String())),
+        sa.column("muscle_groups", postgresql.ARRAY(sa.String())),
+        sa.column("equipment", postgresql.ARRAY(sa.String())),
+    )
+    op.execute(
+        postgresql.insert(exercises)
+        .values(
+            [
+                {"id": id_, "name": name, "aliases": aliases, "muscle_groups": muscles, "equipment": equipment}
+                for id_, name, aliases, muscles, equipment in NEW_EXERCISES
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+
+
+def downgrade() -> None:
+    ids = ", ".join(f"'{id_}'" for id_, *_ in NEW_EXERCISES)
+    op.execute(f"DELETE FROM exercises WHERE id IN ({ids})")
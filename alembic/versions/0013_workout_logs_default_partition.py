@@ -0,0 +1,34 @@
+"""catch logs outside every monthly partition in a default partition
+
+Revision ID: 0013_workout_logs_default_partition
+Revises: 0012_home_exercises
+Create Date: 2024-05-03 00:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0013_workout_logs_default_partition"
+down_revision = "0012_home_exercises"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Without it an insert past the pre-created window fails outright;
+    # `python -m app.db.partitions maintain` moves such rows into their month.
+    op.execute("CREATE TABLE workout_logs_default PARTITION OF workout_logs DEFAULT")
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM workout_logs_default) THEN
+                RAISE EXCEPTION 'workout_logs_default has rows; run python -m app.db.partitions maintain first';
+            END IF;
+        END
+        $$
+        """
+    )
+    op.execute("DROP TABLE workout_logs_default")
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.rate_limit import rate_limit
+from app.core.security import verify_jwt
+from app.db.schemas import AnalyticsSummaryResponse
+from app.db.session import get_read_db
+from app.db.utils import resolve_user_id
+from app.services.analytics import training_summary
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"], dependencies=[Depends(rate_limit("cheap"))])
+
+
+@router.get("/summary", response_model=AnalyticsSummaryResponse)
+async def get_summary(
+    weeks: int = Query(8, ge=1, le=52),
+    db: AsyncSession = Depends(get_read_db),
+    token: str = Depends(verify_jwt),
+):
+    # Reads only the rollup tables, so cost does not grow with a user's history.
+    return await training_summary(db, resolve_user_id(token), weeks)
@@ -1,41 +1,78 @@
-import uuid
-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.rate_limit import rate_limit
 from app.core.security import verify_jwt
 from app.db.models import ExerciseGuideCache
-from app.db.schemas import ExerciseGuideRequest, ExerciseGuideResponse
+from app.db.schemas import (
+    ExerciseGuideRequest,
+    ExerciseGuideResponse,
+    ExerciseSearchResponse,
+    ExerciseSearchResult,
+)
 from app.db.session import get_db
 from app.services.ai_guide import get_exercise_guide
+from app.services.exercise_catalog import exercise_index
+from app.services.guide_cache import guide_cache
 
 router = APIRouter(prefix="/api/exercise", tags=["exercise"])
 
 
-@router.post("/guide", response_model=ExerciseGuideResponse)
+@router.post("/guide", response_model=ExerciseGuideResponse, dependencies=[Depends(rate_limit("expensive"))])
 async def exercise_guide(
     payload: ExerciseGuideRequest,
     db: AsyncSession = Depends(get_db),
     token: str = Depends(verify_jwt),
 ):
+    # "Bench Press", "bench_press" and "bench" all share one cache entry.
+    exercise_name = exercise_index.canonical_id(payload.exercise_name) if payload.exercise_name else None
+    if exercise_name == "":
+        # Punctuation-only names would otherwise fall through to an image-only request.
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="exercise_name has no letters or digits"
+        )
+
+    # Guides preloaded at start-up answer without touching the database.
+    if exercise_name:
+        guide = guide_cache.get(exercise_name)
+        if guide is not None:
+            return guide
+
     # Optional cache lookup
     cached: ExerciseGuideCache | None = None
-    if payload.exercise_name:
+    if exercise_name:
         result = await db.execute(
-            select(ExerciseGuideCache).where(
-                ExerciseGuideCache.exercise_name == payload.exercise_name.lower()
-            )
+            select(ExerciseGuideCache).where(ExerciseGuideCache.exercise_name == exercise_name)
         )
         cached = result.scalars().first()
 
-    guide = await get_exercise_guide(payload.exercise_name, payload.image_url, cached)
+    guide = await get_exercise_guide(exercise_name, payload.image_url, cached)
 
-    if not cached and payload.exercise_name:
-        cache_entry = ExerciseGuideCache(
-            exercise_name=payload.exercise_name.lower(), guide_json=guide
-        )
+    if not cached and exercise_name:
+        cache_entry = ExerciseGuideCache(exercise_name=exercise_name, guide_json=guide)
         db.add(cache_entry)
         await db.commit()
+    if exercise_name:
+        guide_cache.remember(exercise_name, guide)
 
     return guide
+
+
+@router.get("/search", response_model=ExerciseSearchResponse, dependencies=[Depends(rate_limit("cheap"))])
+async def search_exercises(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    token: str = Depends(verify_jwt),
+):
+    results = [
+        ExerciseSearchResult(
+            id=entry.id,
+            name=entry.name,
+            muscle_groups=list(entry.muscle_groups),
+            equipment=list(entry.equipment),
+            score=score,
+        )
+        for entry, score in exercise_index.search(q, limit)
+    ]
+    return ExerciseSearchResponse(query=q, results=results)
@@ -1,25 +1,63 @@
+import asyncio
+from datetime import date
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.rate_limit import rate_limit
 from app.core.security import verify_jwt
+from app.db.archive import archive_horizon, archived_history
 from app.db.models import WorkoutLog
-from app.db.schemas import HistoryEntry, HistoryResponse
-from app.db.session import get_db
-from app.db.utils import ensure_user
+from app.db.partitions import history_range
+from app.db.schemas import HistoryResponse
+from app.db.session import get_read_db
+from app.db.utils import resolve_user_id
+from app.services.exercise_catalog import exercise_index
 
-router = APIRouter(prefix="/api/history", tags=["history"])
+router = APIRouter(prefix="/api/history", tags=["history"], dependencies=[Depends(rate_limit("cheap"))])
 
 
 @router.get("", response_model=HistoryResponse)
 async def get_history(
-    exercise_id: str, db: AsyncSession = Depends(get_db), token: str = Depends(verify_jwt)
+    exercise_id: str,
+    start: date | None = None,
+    end: date | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    token: str = Depends(verify_jwt),
 ):
-    user = await ensure_user(db, token)
-    result = await db.execute(
-        select(WorkoutLog.logged_at, WorkoutLog.actual_weight, WorkoutLog.target_weight)
-        .where(WorkoutLog.user_id == user.id, WorkoutLog.exercise_id == exercise_id)
-        .order_by(WorkoutLog.logged_at)
+    # Read-only route: an unknown user simply has no logs, so skip ensure_user.
+    user_id = resolve_user_id(token)
+    canonical_id = exercise_index.canonical_id(exercise_id)
+    # Bounds on logged_at let Postgres prune monthly workout_logs partitions.
+    lower, upper = history_range(start, end)
+
+    # Logs before the archive horizon only exist in the archive files (see
+    # app/db/archive.py); read them off the event loop and keep the database
+    # query to the rest of the range.
+    entries = []
+    horizon = archive_horizon()
+    if horizon is not None and (lower is None or lower < horizon):
+        archive_upper = min(upper, horizon) if upper is not None else horizon
+        entries = await asyncio.to_thread(archived_history, user_id, canonical_id, lower, archive_upper)
+        lower = horizon
+    if upper is not None and lower is not None and lower >= upper:
+        return ORJSONResponse({"exercise": exercise_id, "data": entries})
+
+    query = select(WorkoutLog.logged_at, WorkoutLog.actual_weight, WorkoutLog.target_weight).where(
+        WorkoutLog.user_id == user_id,
+        WorkoutLog.exercise_id == canonical_id,
     )
-    entries = [HistoryEntry(date=row[0].date(), weight=row[1] or row[2] or 0) for row in result.all()]
-    return HistoryResponse(exercise=exercise_id, data=entries)
+    if lower is not None:
+        query = query.where(WorkoutLog.logged_at >= lower)
+    if upper is not None:
+        query = query.where(WorkoutLog.logged_at < upper)
+    result = await db.execute(query.order_by(WorkoutLog.logged_at))
+    # Rows come straight from the database in the HistoryResponse shape, so skip
+    # per-row model construction and response_model re-validation.
+    entries += [
+        {"date": logged_at.date(), "weight": actual or target or 0.0}
+        for logged_at, actual, target in result.all()
+    ]
+    return ORJSONResponse({"exercise": exercise_id, "data": entries})
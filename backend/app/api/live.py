@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import math
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import TypeAdapter, ValidationError
+
+from app.api.workouts import log_record, record_log
+from app.core.config import get_settings
+from app.core.rate_limit import check_rate_limit
+from app.core.security import bearer_token
+from app.db.models import Workout, WorkoutLog
+from app.db.schemas import LiveMessage, LivePingMessage
+from app.db.session import SessionLocal
+from app.db.utils import ensure_user
+from app.services.progression import apply_progression_to_plan
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/workout", tags=["workouts"])
+
+settings = get_settings()
+
+# Browsers cannot set headers on a WebSocket, so they offer
+# ``["bearer", <token>]`` as subprotocols; the server echoes only "bearer".
+# Unlike a query parameter, the token stays out of access logs.
+BEARER_SUBPROTOCOL = "bearer"
+live_message = TypeAdapter(LiveMessage)
+
+
+def _token(websocket: WebSocket) -> str | None:
+    """Bearer token from the Authorization header or the subprotocol list."""
+
+    authorization = websocket.headers.get("authorization")
+    protocols = websocket.scope.get("subprotocols") or []
+    if authorization is None and BEARER_SUBPROTOCOL in protocols[:-1]:
+        authorization = f"Bearer {protocols[protocols.index(BEARER_SUBPROTOCOL) + 1]}"
+    try:
+        return bearer_token(authorization or "")
+    except HTTPException:
+        return None
+
+
+async def _receive(websocket: WebSocket) -> bytes | str:
+    """Next text or binary frame, as sent."""
+
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+    return message.get("text") or message.get("bytes") or b""
+
+
+def _next_target(workout: Workout, log: WorkoutLog) -> float | None:
+    for exercise in workout.plan_json.get("exercises", []):
+        if exercise.get("id") == log.exercise_id:
+            progressed = apply_progression_to_plan({"exercises": [exercise]}, [log])
+            return progressed["exercises"][0].get("target_weight")
+    return None
+
+
+async def _rest_timer(websocket: WebSocket, exercise_id: str, seconds: int) -> None:
+    await asyncio.sleep(seconds)
+    await websocket.send_json({"type": "rest_finished", "exercise_id": exercise_id})
+
+
+@router.websocket("/live/{workout_id}")
+async def live_session(websocket: WebSocket, workout_id: uuid.UUID):
+    """Live channel for one workout.
+
+    Client messages: ``{"type": "log", exercise_id, actual_weight, target_weight,
+    sets, reps, completed, rest_seconds?}`` and ``{"type": "ping"}``. Server
+    messages: ``logged`` (with the exercise's next target weight, from the plan
+    as it is when the log arrives), ``rest_started`` / ``rest_finished``,
+    ``pong`` and ``error``. A message that fails validation or a log that
+    cannot be saved gets an ``error`` and the socket stays open.
+
+    The user and workout are resolved once per connection and the socket keeps
+    a single DB session; it only holds a pooled connection while committing.
+    Opening the socket and every message take a token from the user's "cheap"
+    rate-limit budget; a rejected message gets an ``error`` with ``retry_after``.
+    """
+
+    bearer = _token(websocket)
+    if bearer is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Missing token")
+        return
+
+    async with SessionLocal() as db:
+        user = await ensure_user(db, bearer)
+        if await check_rate_limit("cheap", user.id):
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Rate limit exceeded")
+            return
+        workout = await db.get(Workout, workout_id)
+        if not workout or workout.user_id != user.id:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Workout not found")
+            return
+        # End the setup transaction so no connection is held between messages.
+        await db.commit()
+
+        protocols = websocket.scope.get("subprotocols") or []
+        await websocket.accept(subprotocol=BEARER_SUBPROTOCOL if BEARER_SUBPROTOCOL in protocols else None)
+        rest_timer: asyncio.Task | None = None
+        try:
+            while True:
+                data = await _receive(websocket)
+                wait = await check_rate_limit("cheap", user.id)
+                if wait:
+                    await websocket.send_json(
+                        {"type": "error", "detail": "Rate limit exceeded", "retry_after": math.ceil(wait)}
+                    )
+                    continue
+                try:
+                    message = live_message.validate_json(data)
+                except ValidationError as exc:
+                    detail = exc.errors(include_url=False, include_context=False, include_input=False)
+                    await websocket.send_json({"type": "error", "detail": detail})
+                    continue
+                if isinstance(message, LivePingMessage):
+                    await websocket.send_json({"type": "pong"})
+                    continue
+
+                payload = message.model_copy(update={"workout_id": workout_id})
+                record = log_record(user.id, payload)
+                try:
+                    # PATCH /update may have changed the plan since the socket opened.
+                    await db.refresh(workout, ["plan_json", "plan_version", "started_at"])
+                    await record_log(db, workout, record)
+                    # Write-behind mode does not commit; end the refresh's transaction.
+                    await db.commit()
+                except Exception:
+                    logger.exception("Saving a live log for workout %s failed", workout_id)
+                    await db.rollback()
+                    await websocket.send_json(
+                        {"type": "error", "detail": "Log not saved", "exercise_id": record["exercise_id"]}
+                    )
+                    continue
+                await websocket.send_json(
+                    {
+                        "type": "logged",
+                        "log_id": str(record["id"]),
+                        "exercise_id": record["exercise_id"],
+                        "next_target_weight": _next_target(workout, WorkoutLog(**record)),
+                    }
+                )
+
+                rest_seconds = message.rest_seconds or settings.live_rest_seconds
+                if rest_timer is not None:
+                    rest_timer.cancel()
+                await websocket.send_json(
+                    {
+                        "type": "rest_started",
+                        "exercise_id": record["exercise_id"],
+                        "seconds": rest_seconds,
+                        "ends_at": (datetime.utcnow() + timedelta(seconds=rest_seconds)).isoformat(),
+                    }
+                )
+                rest_timer = asyncio.create_task(_rest_timer(websocket, record["exercise_id"], rest_seconds))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if rest_timer is not None:
+                rest_timer.cancel()
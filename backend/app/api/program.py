@@ -1,50 +1,63 @@
 import uuid
 
 from fastapi import APIRouter, Depends
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.rate_limit import rate_limit
 from app.core.security import verify_jwt
 from app.db.models import Program, StrengthEstimate, UserProfile
 from app.db.schemas import ProgramCreate, ProgramResponse
 from app.db.session import get_db
 from app.db.utils import ensure_user
-from app.services.ai_program import generate_program
+from app.services.program_cache import program_template_cache
 
 router = APIRouter(prefix="/api/program", tags=["program"])
 
 
-@router.post("/init", response_model=ProgramResponse)
+@router.post("/init", response_model=ProgramResponse, dependencies=[Depends(rate_limit("expensive"))])
 async def init_program(
     payload: ProgramCreate,
     db: AsyncSession = Depends(get_db),
     token: str = Depends(verify_jwt),
 ):
-    user = await ensure_user(db, token)
+    # Everything below shares one transaction so a failure never leaves a
+    # profile without its program.
+    user = await ensure_user(db, token, commit=False)
     await _upsert_profile(db, user.id, payload)
     await _upsert_strength_estimates(db, user.id, payload.lifts)
 
-    program_json = await generate_program(payload)
+    program_json = await program_template_cache.get_or_generate(db, payload)
     program = Program(user_id=user.id, split=program_json["split"], program_json=program_json)
     db.add(program)
     await db.commit()
-    await db.refresh(program)
     return program
 
 
-async def _upsert_profile(db: AsyncSession, user_id: uuid.UUID, payload: ProgramCreate) -> None:
-    profile = await db.get(UserProfile, user_id)
-    if not profile:
-        profile = UserProfile(user_id=user_id)
-        db.add(profile)
+async def _upsert(db: AsyncSession, model: type, values: dict) -> None:
+    stmt = insert(model).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[model.user_id],
+        set_={column: stmt.excluded[column] for column in values if column != "user_id"},
+    )
+    await db.execute(stmt)
 
-    profile.gender = payload.gender
-    profile.age = payload.age
-    profile.height_cm = payload.height_cm
-    profile.weight_kg = payload.weight_kg
-    profile.equipment = payload.equipment[0] if payload.equipment else None
-    profile.goal = payload.goal
-    profile.training_days_per_week = payload.training_days_per_week
-    await db.commit()
+
+async def _upsert_profile(db: AsyncSession, user_id: uuid.UUID, payload: ProgramCreate) -> None:
+    await _upsert(
+        db,
+        UserProfile,
+        {
+            "user_id": user_id,
+            "gender": payload.gender,
+            "age": payload.age,
+            "height_cm": payload.height_cm,
+            "weight_kg": payload.weight_kg,
+            "equipment": payload.equipment[0] if payload.equipment else None,
+            "goal": payload.goal,
+            "training_days_per_week": payload.training_days_per_week,
+        },
+    )
 
 
 async def _upsert_strength_estimates(
@@ -53,19 +66,18 @@ async def _upsert_strength_estimates(
     if lifts is None:
         return
 
-    estimates = await db.get(StrengthEstimate, user_id)
-    if not estimates:
-        estimates = StrengthEstimate(user_id=user_id)
-        db.add(estimates)
-
-    estimates.bench_press_kg = lifts.get("bench") or lifts.get("bench_press")
-    estimates.squat_kg = lifts.get("squat") or lifts.get("back_squat")
-    estimates.deadlift_kg = lifts.get("deadlift")
-    estimates.lat_pulldown_kg = lifts.get("lat_pulldown")
-    estimates.dumbbell_press_kg = lifts.get("dumbbell_press")
-    estimates.dumbbell_row_kg = lifts.get("dumbbell_row")
-    estimates.goblet_squat_kg = lifts.get("goblet_squat")
-    estimates.max_pushups = int(lifts.get("max_pushups", 0)) if "max_pushups" in lifts else estimates.max_pushups
-    estimates.max_pullups = int(lifts.get("max_pullups", 0)) if "max_pullups" in lifts else estimates.max_pullups
-    estimates.plank_seconds = int(lifts.get("plank_seconds", 0)) if "plank_seconds" in lifts else estimates.plank_seconds
-    await db.commit()
+    values = {
+        "user_id": user_id,
+        "bench_press_kg": lifts.get("bench") or lifts.get("bench_press"),
+        "squat_kg": lifts.get("squat") or lifts.get("back_squat"),
+        "deadlift_kg": lifts.get("deadlift"),
+        "lat_pulldown_kg": lifts.get("lat_pulldown"),
+        "dumbbell_press_kg": lifts.get("dumbbell_press"),
+        "dumbbell_row_kg": lifts.get("dumbbell_row"),
+        "goblet_squat_kg": lifts.get("goblet_squat"),
+    }
+    # Bodyweight counts keep their stored value unless resubmitted.
+    for column in ("max_pushups", "max_pullups", "plank_seconds"):
+        if column in lifts:
+            values[column] = int(lifts[column])
+    await _upsert(db, StrengthEstimate, values)
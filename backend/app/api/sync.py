@@ -0,0 +1,186 @@
+"""Offline-first sync: push queued client mutations, pull the user's change feed.
+
+Every insert, update and delete on ``programs``, ``user_preferences``,
+``workouts`` and ``workout_logs`` bumps the user's ``change_seq`` and
+records the row's latest state in ``change_feed`` (see the ``record_change``
+trigger in ``alembic/versions/0010_change_feed.py``). ``POST /api/sync``
+applies the client's batch and returns every entity that changed after the
+client's cursor, in one transaction. ``ix_change_feed_user_seq`` makes that
+read a range scan over exactly the changed rows.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.api.workouts import apply_preference_changes, log_record, patch_today_plan
+from app.core.config import get_settings
+from app.core.rate_limit import rate_limit
+from app.core.security import verify_jwt
+from app.db.models import ChangeFeed, User, UserPreference, Workout, WorkoutLog
+from app.db.schemas import (
+    SyncChange,
+    SyncFinishMutation,
+    SyncLogMutation,
+    SyncMutation,
+    SyncMutationResult,
+    SyncPreferencesMutation,
+    SyncRequest,
+    SyncResponse,
+)
+from app.db.session import get_db
+from app.db.utils import ensure_user
+
+router = APIRouter(prefix="/api/sync", tags=["sync"], dependencies=[Depends(rate_limit("cheap"))])
+settings = get_settings()
+
+
+def _client_time(value: datetime, now: datetime) -> tuple[datetime | None, str | None]:
+    """Client timestamp as UTC, or ``None`` and why it is not accepted.
+
+    The timestamp is stored as sent, never clamped: ``logged_at`` is part of the
+    workout_logs key, so a retried log must map to the same row every time.
+    """
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    if value < now - timedelta(days=settings.sync_max_offline_days):
+        return None, "Timestamp too old"
+    if value > now + timedelta(seconds=settings.sync_max_clock_skew_seconds):
+        return None, "Timestamp in the future"
+    return value, None
+
+
+async def _apply_mutations(
+    db: AsyncSession, user_id: uuid.UUID, mutations: list[SyncMutation]
+) -> list[SyncMutationResult]:
+    now = datetime.now(timezone.utc)
+    results: dict[int, SyncMutationResult] = {}
+
+    workout_ids = {
+        mutation.workout_id
+        for mutation in mutations
+        if isinstance(mutation, (SyncLogMutation, SyncFinishMutation))
+    }
+    workouts: dict[uuid.UUID, Workout] = {}
+    if workout_ids:
+        owned = await db.execute(
+            select(Workout)
+            .options(load_only(Workout.id, Workout.started_at, Workout.finished_at))
+            .where(Workout.id.in_(workout_ids), Workout.user_id == user_id)
+        )
+        workouts = {workout.id: workout for workout in owned.scalars()}
+
+    # Logs go in as one statement; client-generated ids make a replayed batch
+    # a no-op instead of a duplicate.
+    records: dict[int, dict[str, Any]] = {}
+    log_ids: set[uuid.UUID] = set()
+    pref: UserPreference | None = None
+    swaps: dict[str, str] = {}
+    for index, mutation in enumerate(mutations):
+        if isinstance(mutation, SyncPreferencesMutation):
+            if pref is None:
+                pref = await db.get(UserPreference, user_id)
+                if pref is None:
+                    pref = UserPreference(
+                        user_id=user_id, avoid_exercises=[], preferred_equipment=[], custom_variations={}
+                    )
+                    db.add(pref)
+            swaps.update(apply_preference_changes(pref, mutation.changes, mutation.preferred_equipment))
+            results[index] = SyncMutationResult(index=index, status="applied")
+            continue
+
+        workout = workouts.get(mutation.workout_id)
+        is_log = isinstance(mutation, SyncLogMutation)
+        at, problem = _client_time(mutation.logged_at if is_log else mutation.finished_at, now)
+        if workout is None:
+            results[index] = SyncMutationResult(index=index, status="rejected", detail="Workout not found")
+        elif at is None:
+            results[index] = SyncMutationResult(index=index, status="rejected", detail=problem)
+        elif is_log and mutation.id in log_ids:
+            results[index] = SyncMutationResult(index=index, status="duplicate")
+        elif is_log:
+            log_ids.add(mutation.id)
+            records[index] = {**log_record(user_id, mutation), "id": mutation.id, "logged_at": at}
+        elif workout.finished_at is None:
+            workout.finished_at = at
+            results[index] = SyncMutationResult(index=index, status="applied")
+        else:
+            results[index] = SyncMutationResult(index=index, status="duplicate")
+
+    if records:
+        inserted = await db.execute(
+            insert(WorkoutLog.__table__)
+            .values(list(records.values()))
+            .on_conflict_do_nothing()
+            .returning(WorkoutLog.__table__.c.id)
+        )
+        new_ids = set(inserted.scalars())
+        for index, record in records.items():
+            applied = record["id"] in new_ids
+            results[index] = SyncMutationResult(index=index, status="applied" if applied else "duplicate")
+            workout = workouts[record["workout_id"]]
+            if applied and (workout.started_at is None or record["logged_at"] < workout.started_at):
+                workout.started_at = record["logged_at"]
+
+    if pref is not None:
+        await patch_today_plan(db, user_id, pref, swaps)
+    return [results[index] for index in range(len(mutations))]
+
+
+async def _changes_after(db: AsyncSession, user_id: uuid.UUID, cursor: int, limit: int) -> list[ChangeFeed]:
+    result = await db.execute(
+        select(ChangeFeed)
+        .where(ChangeFeed.user_id == user_id, ChangeFeed.seq > cursor)
+        .order_by(ChangeFeed.seq)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+@router.post("", response_model=SyncResponse)
+async def sync(payload: SyncRequest, db: AsyncSession = Depends(get_db), token: str = Depends(verify_jwt)):
+    if len(payload.mutations) > settings.sync_max_mutations:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.sync_max_mutations} mutations per sync",
+        )
+
+    user = await ensure_user(db, token, commit=False)
+    results = await _apply_mutations(db, user.id, payload.mutations)
+    if payload.mutations:
+        await db.flush()
+        # Fire the deferred change-feed triggers now so this response already
+        # includes the batch's own changes (with server-side fields filled in).
+        await db.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+
+    # One extra row tells whether another page follows.
+    page = settings.sync_page_size
+    cursor, reset = payload.cursor, False
+    rows = await _changes_after(db, user.id, cursor, page + 1)
+    if not rows and cursor:
+        # A cursor past the user's sequence (e.g. after a restore) cannot be
+        # trusted; start the client over from scratch.
+        last_seq = await db.scalar(select(User.change_seq).where(User.id == user.id))
+        if cursor > last_seq:
+            cursor, reset = 0, True
+            rows = await _changes_after(db, user.id, cursor, page + 1)
+    await db.commit()
+
+    has_more = len(rows) > page
+    rows = rows[:page]
+    return SyncResponse(
+        cursor=rows[-1].seq if rows else cursor,
+        has_more=has_more,
+        reset=reset,
+        results=results,
+        changes=[
+            SyncChange(seq=row.seq, entity=row.entity, id=row.entity_id, op=row.op, data=row.data) for row in rows
+        ],
+    )
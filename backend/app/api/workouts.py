@@ -1,30 +1,58 @@
 import uuid
 from datetime import date, datetime
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from app.core.offload import run_cpu_bound
+from app.core.rate_limit import rate_limit
 from app.core.security import verify_jwt
 from app.db.models import Program, UserPreference, Workout, WorkoutLog
 from app.db.schemas import (
+    SwapRequest,
     WorkoutFinishResponse,
     WorkoutLogRequest,
     WorkoutPlan,
+    WorkoutPlanPatch,
     WorkoutUpdateRequest,
+    WorkoutUpdateResponse,
 )
-from app.db.session import get_db
-from app.db.utils import ensure_user
+from app.db.session import get_db, get_read_db
+from app.db.utils import ensure_user, resolve_user_id
+from app.services.exercise_catalog import exercise_index
+from app.services.log_buffer import log_buffer
+from app.services.plan_patch import diff_exercises, ops_since, record_patch
+from app.services.program_templates import program_library
 from app.services.progression import apply_progression_to_plan
+from app.services.substitution import normalize_equipment, substitution_graph
 
-router = APIRouter(prefix="/api/workout", tags=["workouts"])
+router = APIRouter(prefix="/api/workout", tags=["workouts"], dependencies=[Depends(rate_limit("cheap"))])
 
 
-async def _latest_program(db: AsyncSession, user_id: uuid.UUID) -> Program | None:
+async def _latest_program(db: AsyncSession, user_id: uuid.UUID) -> tuple[Program, int] | None:
+    """Return the newest program and its day count without loading ``program_json``."""
+
     result = await db.execute(
-        select(Program).where(Program.user_id == user_id).order_by(Program.created_at.desc())
+        select(Program, func.coalesce(func.jsonb_array_length(Program.program_json["days"]), 0))
+        .options(load_only(Program.id, Program.split, Program.created_at))
+        .where(Program.user_id == user_id)
+        .order_by(Program.created_at.desc())
+        .limit(1)
     )
-    return result.scalars().first()
+    row = result.first()
+    return (row[0], row[1]) if row else None
+
+
+async def _program_day(db: AsyncSession, program_id: uuid.UUID, index: int) -> dict:
+    """Fetch a single day of a program server-side instead of the whole JSON document."""
+
+    result = await db.execute(
+        select(Program.program_json["days"][index]).where(Program.id == program_id)
+    )
+    return result.scalar_one_or_none() or {}
 
 
 async def _user_preferences(db: AsyncSession, user_id: uuid.UUID) -> UserPreference | None:
@@ -41,87 +69,206 @@ async def _recent_logs(db: AsyncSession, user_id: uuid.UUID) -> list[WorkoutLog]
     return result.scalars().all()
 
 
-@router.get("/today", response_model=WorkoutPlan)
+async def _workout_for_date(
+    db: AsyncSession, user_id: uuid.UUID, day: date, *, for_update: bool = False
+) -> Workout | None:
+    query = select(Workout).where(Workout.user_id == user_id, Workout.date == day)
+    if for_update:
+        query = query.with_for_update()
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def _latest_completed_logs(db: AsyncSession, user_id: uuid.UUID, exercise_ids: set[str]) -> list[WorkoutLog]:
+    """Newest completed log per exercise; all progression needs for a handful of exercises."""
+
+    result = await db.execute(
+        select(WorkoutLog)
+        .where(
+            WorkoutLog.user_id == user_id,
+            WorkoutLog.exercise_id.in_(exercise_ids),
+            WorkoutLog.completed.is_(True),
+        )
+        .order_by(WorkoutLog.exercise_id, WorkoutLog.logged_at.desc())
+        .distinct(WorkoutLog.exercise_id)
+    )
+    return result.scalars().all()
+
+
+def _persisted_plan(workout: Workout, since_version: int | None) -> WorkoutPlan | WorkoutPlanPatch:
+    """The stored plan, or only its diff when the client already has ``since_version``."""
+
+    if since_version is not None:
+        ops = ops_since(workout.plan_version, since_version, workout.plan_patches)
+        if ops is not None:
+            return WorkoutPlanPatch(
+                workout_id=workout.id, since_version=since_version, version=workout.plan_version, patch=ops
+            )
+    return WorkoutPlan(
+        workout_id=workout.id,
+        day=workout.day_name,
+        exercises=workout.plan_json.get("exercises", []),
+        version=workout.plan_version,
+    )
+
+
+@router.get("/today", response_model=WorkoutPlan | WorkoutPlanPatch)
 async def get_today_workout(
-    db: AsyncSession = Depends(get_db), token: str = Depends(verify_jwt)
+    since_version: int | None = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+    token: str = Depends(verify_jwt),
 ):
+    # Fast path: today's plan already exists, serve it from the read replica.
+    persisted_workout = await _workout_for_date(read_db, resolve_user_id(token), date.today())
+    if persisted_workout:
+        return _persisted_plan(persisted_workout, since_version)
+
     user = await ensure_user(db, token)
-    program = await _latest_program(db, user.id)
+    latest = await _latest_program(db, user.id)
 
-    if program is None:
+    if latest is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Program not found. Initialize a program first.",
         )
 
-    existing_today = await db.execute(
-        select(Workout).where(Workout.user_id == user.id, Workout.date == date.today())
-    )
-    persisted_workout = existing_today.scalars().first()
+    # Re-check on the primary in case the replica is lagging behind.
+    persisted_workout = await _workout_for_date(db, user.id, date.today())
     if persisted_workout:
-        return WorkoutPlan(
-            workout_id=persisted_workout.id,
-            day=persisted_workout.day_name,
-            exercises=persisted_workout.plan_json.get("exercises", []),
-        )
+        return _persisted_plan(persisted_workout, since_version)
 
-    base_program = program.program_json
+    program, day_count = latest
 
     pref_obj = await _user_preferences(db, user.id)
-    preferences = pref_obj.custom_variations if pref_obj else None
     history_logs = await _recent_logs(db, user.id)
 
-    daily_plan = await _build_daily_plan(base_program, preferences, history_logs, db, user.id)
+    day_index, daily_plan = await _build_daily_plan(
+        program.id, day_count, pref_obj, history_logs, db, user.id
+    )
 
     workout = Workout(
         user_id=user.id,
+        program_id=program.id,
+        day_index=day_index,
         day_name=daily_plan.get("day", "Day 1"),
         plan_json=daily_plan,
         date=date.today(),
     )
     db.add(workout)
     await db.commit()
-    await db.refresh(workout)
 
     return WorkoutPlan(
         workout_id=workout.id,
         day=workout.day_name,
         exercises=daily_plan.get("exercises", []),
+        version=workout.plan_version,
     )
 
 
 async def _build_daily_plan(
-    base_program: dict[str, dict],
-    preferences: dict[str, str] | None,
+    program_id: uuid.UUID,
+    day_count: int,
+    preferences: UserPreference | None,
     history_logs: list[WorkoutLog],
     db: AsyncSession,
     user_id: uuid.UUID,
-) -> dict[str, dict]:
-    if not base_program:
-        return {"day": "Day 1", "exercises": []}
-
-    days = base_program.get("days") or []
-    if not days:
-        return {"day": "Day 1", "exercises": []}
+) -> tuple[int | None, dict[str, dict]]:
+    if not day_count:
+        return None, {"day": "Day 1", "exercises": []}
 
     workout_count = await db.execute(select(func.count()).where(Workout.user_id == user_id))
-    index = workout_count.scalar_one() % len(days)
-    day_plan = days[index]
+    index = workout_count.scalar_one() % day_count
+    day_plan = await _program_day(db, program_id, index)
 
     exercises = [dict(ex) for ex in day_plan.get("exercises", [])]
-    for exercise in exercises:
-        exercise_id = exercise.get("id")
-        if preferences and exercise_id in preferences:
-            exercise["id"] = preferences[exercise_id]
+    if preferences:
+        substitution_graph.apply_preferences(
+            exercises,
+            preferences.custom_variations,
+            preferences.avoid_exercises,
+            normalize_equipment(preferences.preferred_equipment),
+        )
+
+    # Sorting a long history blocks the loop; large histories go to the offload pool.
+    progressed_plan = await run_cpu_bound(
+        len(history_logs),
+        apply_progression_to_plan,
+        {"day": day_plan.get("day", "Day 1"), "exercises": exercises},
+        history_logs,
+        program_library().default_weights,
+    )
+
+    return index, progressed_plan
 
-    progressed_plan = apply_progression_to_plan(
-        {"day": day_plan.get("day", "Day 1"), "exercises": exercises}, history_logs
+
+def apply_preference_changes(
+    pref: UserPreference, changes: list[SwapRequest], preferred_equipment: list[str] | None
+) -> dict[str, str]:
+    """Fold swaps/avoids into ``pref`` and return this batch's swaps."""
+
+    # Copy so the JSON column sees a new value rather than an in-place mutation.
+    custom_variations = dict(pref.custom_variations or {})
+    avoid_exercises = set(pref.avoid_exercises or [])
+    swaps: dict[str, str] = {}
+
+    for change in changes:
+        exercise_id = exercise_index.canonical_id(change.exercise_id)
+        if change.action == "swap" and change.new_exercise and change.exercise_id:
+            swaps[exercise_id] = exercise_index.canonical_id(change.new_exercise)
+            avoid_exercises.add(exercise_id)
+        elif change.action == "avoid" and change.exercise_id:
+            avoid_exercises.add(exercise_id)
+
+    custom_variations.update(swaps)
+    pref.custom_variations = custom_variations
+    pref.avoid_exercises = sorted(avoid_exercises)
+    if preferred_equipment is not None:
+        pref.preferred_equipment = preferred_equipment
+    return swaps
+
+
+async def patch_today_plan(
+    db: AsyncSession, user_id: uuid.UUID, pref: UserPreference, swaps: dict[str, str]
+) -> tuple[Workout | None, list[dict[str, Any]]]:
+    """Apply ``swaps`` and ``pref`` to today's unfinished plan; does not commit.
+
+    Returns the workout (``None`` when there is no unfinished plan today) and
+    the RFC 6902 ops applied to it.
+    """
+
+    # Locked so concurrent updates get distinct versions.
+    workout = await _workout_for_date(db, user_id, date.today(), for_update=True)
+    if workout is None or workout.finished_at is not None:
+        return None, []
+
+    current = workout.plan_json.get("exercises", [])
+    exercises = [dict(exercise) for exercise in current]
+    # Only this request's swaps: earlier ones are already in the stored plan.
+    substitution_graph.apply_preferences(
+        exercises, swaps, set(pref.avoid_exercises or []), normalize_equipment(pref.preferred_equipment)
     )
+    changed = [
+        index for index, (before, after) in enumerate(zip(current, exercises)) if before.get("id") != after.get("id")
+    ]
+    if changed:
+        logs = await _latest_completed_logs(db, user_id, {exercises[index]["id"] for index in changed})
+        progressed = apply_progression_to_plan(
+            {"exercises": [exercises[index] for index in changed]}, logs, program_library().default_weights
+        )
+        for index, exercise in zip(changed, progressed["exercises"]):
+            exercises[index] = exercise
 
-    return progressed_plan
+    ops = diff_exercises(current, exercises)
+    if ops:
+        workout.plan_version, workout.plan_patches = record_patch(
+            workout.plan_version, workout.plan_patches, ops
+        )
+        workout.plan_json = {**workout.plan_json, "exercises": exercises}
+    return workout, ops
 
 
-@router.patch("/update")
+@router.patch("/update", response_model=WorkoutUpdateResponse)
 async def update_workout(
     payload: WorkoutUpdateRequest, db: AsyncSession = Depends(get_db), token: str = Depends(verify_jwt)
 ):
@@ -131,50 +278,74 @@ async def update_workout(
     if not pref:
         pref = UserPreference(user_id=user.id, avoid_exercises=[], preferred_equipment=[], custom_variations={})
         db.add(pref)
+    swaps = apply_preference_changes(pref, payload.changes, payload.preferred_equipment)
 
-    custom_variations = pref.custom_variations or {}
-    avoid_exercises = set(pref.avoid_exercises or [])
+    # Apply the change to today's plan too, so the client gets a diff instead
+    # of re-fetching /today.
+    workout, ops = await patch_today_plan(db, user.id, pref, swaps)
+    await db.commit()
+    if workout is None:
+        return WorkoutUpdateResponse(status="updated", patch=[])
+    return WorkoutUpdateResponse(status="updated", workout_id=workout.id, version=workout.plan_version, patch=ops)
 
-    for change in payload.changes:
-        if change.action == "swap" and change.new_exercise and change.exercise_id:
-            custom_variations[change.exercise_id] = change.new_exercise
-            avoid_exercises.add(change.exercise_id)
 
-    pref.custom_variations = custom_variations
-    pref.avoid_exercises = sorted(avoid_exercises)
-    await db.commit()
+def log_record(user_id: uuid.UUID, payload: WorkoutLogRequest) -> dict[str, Any]:
+    """Column values for a new workout_logs row; the id is assigned up front."""
+
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "workout_id": payload.workout_id,
+        "exercise_id": exercise_index.canonical_id(payload.exercise_id),
+        "actual_weight": payload.actual_weight,
+        "target_weight": payload.target_weight,
+        "sets": payload.sets,
+        "reps": payload.reps,
+        "completed": payload.completed,
+        "logged_at": datetime.utcnow(),
+    }
+
+
+async def record_log(db: AsyncSession, workout: Workout | None, record: dict[str, Any]) -> None:
+    """Persist a log for an already-authorized workout.
 
-    return {"status": "updated", "changes": payload.changes, "preferences": pref.custom_variations}
+    In write-behind mode this returns once the log is durable in the WAL and the
+    buffer sets ``started_at``; otherwise ``workout`` is updated and committed.
+    """
+
+    if log_buffer is not None:
+        await log_buffer.append(record)
+        return
+
+    if workout.started_at is None:
+        workout.started_at = record["logged_at"]
+    db.add(WorkoutLog(**record))
+    await db.commit()
 
 
 @router.post("/log")
 async def log_workout(
     payload: WorkoutLogRequest, db: AsyncSession = Depends(get_db), token: str = Depends(verify_jwt)
 ):
-    user = await ensure_user(db, token)
-
-    workout = await db.get(Workout, payload.workout_id)
-    if not workout or workout.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found")
-
-    if workout.started_at is None:
-        workout.started_at = datetime.utcnow()
+    if log_buffer is not None:
+        # Ownership check only; the user must already exist to own the workout.
+        user_id = resolve_user_id(token)
+        owned = await db.execute(
+            select(Workout.id).where(Workout.id == payload.workout_id, Workout.user_id == user_id)
+        )
+        if owned.scalar_one_or_none() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found")
+        workout = None
+    else:
+        user = await ensure_user(db, token)
+        user_id = user.id
+        workout = await db.get(Workout, payload.workout_id)
+        if not workout or workout.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found")
 
-    log = WorkoutLog(
-        user_id=user.id,
-        workout_id=payload.workout_id,
-        exercise_id=payload.exercise_id,
-        actual_weight=payload.actual_weight,
-        target_weight=payload.target_weight,
-        sets=payload.sets,
-        reps=payload.reps,
-        completed=payload.completed,
-        logged_at=datetime.utcnow(),
-    )
-    db.add(log)
-    await db.commit()
-    await db.refresh(log)
-    return {"status": "logged", "log_id": str(log.id)}
+    record = log_record(user_id, payload)
+    await record_log(db, workout, record)
+    return {"status": "logged", "log_id": str(record["id"])}
 
 
 @router.post("/finish", response_model=WorkoutFinishResponse)
@@ -197,23 +368,24 @@ async def finish_workout(
     )
     logs = current_logs.scalars().all()
 
-    progress: dict[str, str] = {}
-    for log in logs:
-        previous_log = await db.execute(
-            select(WorkoutLog)
+    # Latest prior log per exercise in one query instead of one per log.
+    last_weights: dict[str, float | None] = {}
+    if logs:
+        previous_logs = await db.execute(
+            select(WorkoutLog.exercise_id, WorkoutLog.actual_weight, WorkoutLog.target_weight)
             .where(
                 WorkoutLog.user_id == user.id,
-                WorkoutLog.exercise_id == log.exercise_id,
+                WorkoutLog.exercise_id.in_({log.exercise_id for log in logs}),
                 WorkoutLog.workout_id != workout_id,
             )
-            .order_by(WorkoutLog.logged_at.desc())
-            .limit(1)
+            .order_by(WorkoutLog.exercise_id, WorkoutLog.logged_at.desc())
+            .distinct(WorkoutLog.exercise_id)
         )
-        last_entry = previous_log.scalars().first()
-        last_weight = None
-        if last_entry:
-            last_weight = last_entry.actual_weight or last_entry.target_weight
+        last_weights = {row[0]: row[1] or row[2] for row in previous_logs.all()}
 
+    progress: dict[str, str] = {}
+    for log in logs:
+        last_weight = last_weights.get(log.exercise_id)
         current_weight = log.actual_weight or log.target_weight
         if last_weight is not None and current_weight is not None:
             delta = current_weight - last_weight
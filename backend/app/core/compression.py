@@ -0,0 +1,224 @@
+"""Negotiated gzip/brotli response compression.
+
+Brotli is used when the client accepts it and the ``brotli`` package is
+installed, gzip otherwise. Single-message bodies under the size threshold are
+sent untouched, as are responses that already carry a ``Content-Encoding``.
+Streaming bodies are compressed chunk by chunk and flushed after each one, so
+a client sees every chunk as soon as the app sends it.
+"""
+
+from __future__ import annotations
+
+import time
+import zlib
+from collections.abc import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional; gzip covers every client
+    brotli = None
+
+# Routes never compressed, keyed by (method, route) like QUERY_BUDGETS. Probes
+# are tiny and polled constantly, so skip the negotiation entirely.
+UNCOMPRESSED_ROUTES: frozenset[tuple[str, str]] = frozenset(
+    {
+        ("GET", "/health"),
+        ("GET", "/ready"),
+        ("GET", "/health/pool"),
+    }
+)
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """``"gzip;q=0.8, br"`` -> ``{"gzip": 0.8, "br": 1.0}``; malformed q-values count as 0."""
+
+    accepted = {}
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    return accepted
+
+
+def choose_encoding(header: str, brotli_available: bool = brotli is not None) -> str | None:
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli_available else ("gzip",)
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionStats:
+    def __init__(self) -> None:
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "compressed": self.compressed,
+            "skipped": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "cpu_seconds": round(self.cpu_seconds, 6),
+        }
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware; see the module docstring for when bodies are compressed."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int | None = None,
+        gzip_level: int | None = None,
+        brotli_quality: int | None = None,
+        stats: CompressionStats = compression_stats,
+    ) -> None:
+        settings = get_settings()
+        self.app = app
+        self.minimum_size = settings.compression_minimum_size if minimum_size is None else minimum_size
+        self.gzip_level = settings.compression_gzip_level if gzip_level is None else gzip_level
+        self.brotli_quality = settings.compression_brotli_quality if brotli_quality is None else brotli_quality
+        self.stats = stats
+
+    def _encoder(self, encoding: str) -> GzipEncoder | BrotliEncoder:
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, CompressingSend(self, scope, send, encoding))
+
+
+class CompressingSend:
+    """Wraps ``send`` for one response; holds the start message until the first body chunk."""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send, encoding: str) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.send = send
+        self.encoding = encoding
+        self.start: Message | None = None
+        self.encoder: GzipEncoder | BrotliEncoder | None = None
+        self.passthrough = False
+
+    def _skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        # FastAPI stores the matched APIRoute in the scope during routing.
+        route = getattr(self.scope.get("route"), "path", None)
+        return (
+            "content-encoding" in headers
+            or (self.scope["method"], route) in UNCOMPRESSED_ROUTES
+            or message["status"] < 200
+            or message["status"] in (204, 304)
+        )
+
+    def _timed(self, compress: Callable[[], bytes], size: int) -> bytes:
+        started = time.process_time()
+        body = compress()
+        stats = self.middleware.stats
+        stats.cpu_seconds += time.process_time() - started
+        stats.bytes_in += size
+        stats.bytes_out += len(body)
+        return body
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            if self._skip(message):
+                self.passthrough = True
+                self.middleware.stats.skipped += 1
+                await self.send(message)
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                self.middleware.stats.skipped += 1
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            self.encoder = self.middleware._encoder(self.encoding)
+            self.middleware.stats.compressed += 1
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # Streaming: length is unknown until the last chunk.
+                del headers["Content-Length"]
+            else:
+                body = self._timed(lambda: self.encoder.compress(body) + self.encoder.finish(), len(body))
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(self.start)
+
+        if more_body:
+            chunk = self._timed(lambda: self.encoder.compress(body), len(body))
+        else:
+            chunk = self._timed(lambda: self.encoder.compress(body) + self.encoder.finish(), len(body))
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
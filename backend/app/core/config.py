@@ -1,4 +1,5 @@
-from pydantic import BaseSettings, Field
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -9,13 +10,112 @@ class Settings(BaseSettings):
         description="Database connection string",
     )
 
+    db_pool_size: int = Field(5, description="Connections each worker keeps open per engine")
+    db_max_overflow: int = Field(10, description="Extra connections each worker may open under load")
+    db_connection_budget: int = Field(
+        80, description="Connections all workers of one host may hold per database (app.server splits it)"
+    )
+    web_concurrency: int = Field(0, description="Worker processes for app.server; 0 sizes from CPU count")
+
+    read_database_url: str | None = Field(
+        default=None, description="Optional read replica used by read-only routes"
+    )
+    read_your_writes_seconds: float = Field(
+        5.0, description="How long a user's reads stay on the primary after they write"
+    )
+    log_write_behind: bool = Field(
+        False, description="Acknowledge set logs from a local WAL and batch-insert them"
+    )
+    log_wal_dir: str = Field("var/log-wal", description="Directory for write-behind WAL segments")
+    log_wal_fsync: bool = Field(True, description="fsync WAL appends before acknowledging")
+    log_flush_size: int = Field(500, description="Max buffered logs inserted per statement")
+    log_flush_interval_ms: int = Field(200, description="Max time a buffered log waits for a flush")
+    log_flush_max_attempts: int = Field(
+        10, description="Failed flushes of a batch before its WAL segments move to the dead-letter directory"
+    )
+    live_rest_seconds: int = Field(90, description="Default rest timer for live workout sessions")
+    sync_page_size: int = Field(500, description="Max change-feed entries returned per /api/sync call")
+    sync_max_mutations: int = Field(500, description="Max client mutations accepted per /api/sync call")
+    sync_max_offline_days: float = Field(
+        30, description="Oldest client timestamp /api/sync accepts for offline logs and finishes"
+    )
+    sync_max_clock_skew_seconds: float = Field(
+        300, description="How far ahead of server time /api/sync accepts client timestamps"
+    )
+    archive_dir: str = Field("var/archive", description="Directory app.db.archive writes cold data to")
+    archive_after_months: int = Field(
+        12, description="Whole months of workout logs and workouts kept in Postgres before archiving"
+    )
+    archive_guides_after_days: float = Field(
+        180, description="Exercise guides not regenerated for this long are archived"
+    )
+    archive_batch_size: int = Field(5000, description="Rows deleted per transaction by the archive job")
+    archive_zstd_level: int = Field(10, description="zstd level for archive files (1-22)")
+    strength_standards_reload_seconds: float = Field(
+        3600, description="How often each worker reloads the strength standards table"
+    )
+    analytics_refresh_lag_seconds: float = Field(
+        300, description="How far behind now() the analytics rollup refresh stops"
+    )
+    rate_limit_enabled: bool = Field(True, description="Enforce per-user request budgets")
+    rate_limit_backend: str = Field("memory", description="Token bucket store: memory or redis")
+    rate_limit_redis_url: str | None = Field(
+        default=None, description="Redis-protocol server shared by all workers when the backend is redis"
+    )
+    rate_limit_cheap_per_minute: float = Field(300, description="Per-user refill rate for cheap routes")
+    rate_limit_cheap_burst: float = Field(60, description="Per-user burst for cheap routes")
+    rate_limit_expensive_per_minute: float = Field(10, description="Per-user refill rate for expensive routes")
+    rate_limit_expensive_burst: float = Field(5, description="Per-user burst for expensive routes")
+    rate_limit_global_cheap_per_second: float = Field(
+        0, description="Requests per second across all users for cheap routes (0 disables)"
+    )
+    rate_limit_global_expensive_per_second: float = Field(
+        20, description="Requests per second across all users for expensive routes (0 disables)"
+    )
+
     supabase_jwt_secret: str | None = Field(
         default=None, description="Supabase JWT secret for optional verification"
     )
+    program_template_cache_size: int = Field(
+        1024, description="Max program templates kept in the in-process LRU"
+    )
+    guide_cache_size: int = Field(5000, description="Max exercise guides kept in memory per worker")
+    db_warmup_connections: int = Field(
+        5, description="Pool connections opened at start-up (capped at the pool size)"
+    )
+    shutdown_delay_seconds: float = Field(
+        5, description="After SIGTERM, how long a worker keeps serving while /ready reports draining"
+    )
+    shutdown_drain_seconds: float = Field(
+        25, description="How long the server waits for in-flight HTTP requests once it stops accepting"
+    )
+    health_probe_interval_seconds: float = Field(5, description="How often the background SELECT 1 probe runs")
+    health_probe_timeout_seconds: float = Field(
+        2, description="A probe slower than this, including waiting for a pool slot, counts as failed"
+    )
+    health_loop_lag_interval_seconds: float = Field(0.5, description="Event-loop lag sampling interval")
+    health_db_latency_degraded_ms: float = Field(250, description="Probe latency above which health is degraded")
+    health_loop_lag_degraded_ms: float = Field(
+        200, description="Event-loop lag (max over the last minute) above which health is degraded"
+    )
+    profiling_enabled: bool = Field(False, description="Sample the event loop and profile slow requests")
+    profile_dir: str = Field("var/profiles", description="Directory slow-request profiles are written to")
+    profile_slow_request_ms: float = Field(500, description="Requests slower than this get a profile written")
+    profile_sample_interval_ms: float = Field(5, description="Event-loop stack sampling interval")
+    offload_min_items: int = Field(
+        2000, description="Input size from which CPU-heavy service calls run in the offload thread pool"
+    )
+    offload_workers: int = Field(2, description="Threads in the CPU offload pool")
+    compression_enabled: bool = Field(True, description="Compress responses the client accepts gzip/br for")
+    compression_minimum_size: int = Field(
+        1024, description="Bodies smaller than this many bytes are sent uncompressed"
+    )
+    compression_gzip_level: int = Field(6, description="zlib level for gzip responses (1-9)")
+    compression_brotli_quality: int = Field(
+        4, description="Brotli quality (0-11); above ~5 costs more CPU than mobile bandwidth saves"
+    )
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
 
 def get_settings() -> Settings:
@@ -0,0 +1,192 @@
+"""Background health probes behind ``/health`` and ``/health/pool``.
+
+A ``SELECT 1`` per engine runs every ``health_probe_interval_seconds`` through
+the pool, so a saturated pool shows up as a probe timeout, and an event-loop
+sampler measures how late its own wake-ups are. Health checks only read the
+cached results plus the pool's counters, so they cost no I/O.
+
+Status is ``down`` when the primary's last probe failed or went stale, and
+``degraded`` when any check crosses its threshold or the pool has no free
+connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LAG_WINDOW = 120  # samples kept for the rolling max
+
+
+@dataclass
+class ProbeResult:
+    ok: bool = False
+    latency_ms: float | None = None
+    error: str | None = None
+    checked_at: float | None = None  # monotonic seconds
+
+
+def pool_status(engine: AsyncEngine) -> dict[str, int | None]:
+    pool = engine.pool
+    if not hasattr(pool, "size"):
+        # NullPool and friends keep no connections to report on.
+        return {"size": None, "checked_out": None, "checked_in": None, "overflow": None, "max_overflow": None}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+
+
+def pool_saturated(status: dict[str, int | None]) -> bool:
+    if status["size"] is None or status["max_overflow"] < 0:
+        # No pool, or unlimited overflow: checkouts never wait.
+        return False
+    return status["checked_out"] >= status["size"] + status["max_overflow"]
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        engines: dict[str, AsyncEngine],
+        interval: float,
+        timeout: float,
+        lag_interval: float,
+        db_latency_degraded_ms: float,
+        loop_lag_degraded_ms: float,
+    ) -> None:
+        self.engines = engines
+        self.interval = interval
+        self.timeout = timeout
+        self.lag_interval = lag_interval
+        self.db_latency_degraded_ms = db_latency_degraded_ms
+        self.loop_lag_degraded_ms = loop_lag_degraded_ms
+        self.probes = {name: ProbeResult() for name in engines}
+        self.lag_samples: deque[float] = deque(maxlen=LAG_WINDOW)
+        self._tasks: list[asyncio.Task] = []
+
+    async def _select_one(self, name: str) -> None:
+        async with self.engines[name].connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def probe(self, name: str) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._select_one(name), self.timeout)
+        except asyncio.TimeoutError:
+            result = ProbeResult(ok=False, error=f"no connection or reply within {self.timeout}s")
+        except Exception as exc:  # any failure means unhealthy, whatever the driver raised
+            result = ProbeResult(ok=False, error=f"{type(exc).__name__}: {exc}"[:200])
+        else:
+            result = ProbeResult(ok=True, latency_ms=round((time.perf_counter() - started) * 1000, 3))
+        result.checked_at = time.monotonic()
+        self.probes[name] = result
+        return result
+
+    async def _probe_forever(self) -> None:
+        while True:
+            previous = dict(self.probes)
+            results = await asyncio.gather(*(self.probe(name) for name in self.engines))
+            # Log transitions only, not every failing round.
+            for name, result in zip(self.engines, results):
+                if not result.ok and (previous[name].ok or previous[name].checked_at is None):
+                    logger.warning("Health probe for %s failed: %s", name, result.error)
+                elif result.ok and not previous[name].ok and previous[name].checked_at is not None:
+                    logger.info("Health probe for %s recovered", name)
+            await asyncio.sleep(self.interval)
+
+    async def _sample_lag_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(max(loop.time() - expected, 0.0) * 1000)
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._probe_forever()),
+            asyncio.create_task(self._sample_lag_forever()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def loop_lag(self) -> dict[str, float]:
+        if not self.lag_samples:
+            return {"last_ms": 0.0, "max_ms": 0.0}
+        return {"last_ms": round(self.lag_samples[-1], 3), "max_ms": round(max(self.lag_samples), 3)}
+
+    def _stale(self, result: ProbeResult, now: float) -> bool:
+        # Allow one missed round before calling a probe stale.
+        return result.checked_at is None or now - result.checked_at > 2 * self.interval + self.timeout
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        database = {}
+        for name, result in self.probes.items():
+            database[name] = {
+                "ok": result.ok and not self._stale(result, now),
+                "latency_ms": result.latency_ms,
+                "age_s": round(now - result.checked_at, 3) if result.checked_at is not None else None,
+                "error": result.error,
+            }
+        pools = {name: pool_status(engine) for name, engine in self.engines.items()}
+        lag = self.loop_lag()
+
+        if not database["primary"]["ok"]:
+            status = "down"
+        elif (
+            any(not probe["ok"] for probe in database.values())
+            or any(pool_saturated(pool) for pool in pools.values())
+            or any((probe["latency_ms"] or 0) > self.db_latency_degraded_ms for probe in database.values())
+            or lag["max_ms"] > self.loop_lag_degraded_ms
+        ):
+            status = "degraded"
+        else:
+            status = "ok"
+        return {"status": status, "database": database, "pools": pools, "loop_lag": lag}
+
+    def stats(self) -> dict[str, float]:
+        snapshot = self.snapshot()
+        values: dict[str, float] = {
+            "up": int(snapshot["status"] != "down"),
+            "loop_lag_max_ms": snapshot["loop_lag"]["max_ms"],
+        }
+        for name, probe in snapshot["database"].items():
+            values[f"{name}_db_ok"] = int(probe["ok"])
+            values[f"{name}_db_latency_ms"] = probe["latency_ms"] or 0.0
+        for name, pool in snapshot["pools"].items():
+            if pool["size"] is not None:
+                values[f"{name}_pool_checked_out"] = pool["checked_out"]
+                values[f"{name}_pool_overflow"] = pool["overflow"]
+        return values
+
+
+def build_health_monitor(engine: AsyncEngine, read_engine: AsyncEngine) -> HealthMonitor:
+    settings = get_settings()
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    return HealthMonitor(
+        engines,
+        interval=settings.health_probe_interval_seconds,
+        timeout=settings.health_probe_timeout_seconds,
+        lag_interval=settings.health_loop_lag_interval_seconds,
+        db_latency_degraded_ms=settings.health_db_latency_degraded_ms,
+        loop_lag_degraded_ms=settings.health_loop_lag_degraded_ms,
+    )
@@ -0,0 +1,133 @@
+"""Readiness, in-flight request tracking and connection pool warm-up.
+
+``/ready`` reports ready from the end of start-up until the worker receives
+SIGTERM. Servers stop accepting connections as soon as they act on SIGTERM
+and only run the lifespan shutdown once in-flight requests are done, so
+flipping readiness there is too late for a load balancer to react.
+``drain_on_sigterm`` instead holds the server's own SIGTERM handling back for
+``SHUTDOWN_DELAY_SECONDS`` while ``/ready`` answers 503; the server then
+stops accepting and finishes in-flight requests within its graceful timeout.
+``/health`` stays a plain liveness check.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import signal
+from collections.abc import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    def __init__(self) -> None:
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+
+    def start_draining(self) -> None:
+        self.ready = False
+        self.draining = True
+
+    @contextlib.contextmanager
+    def drain_on_sigterm(self, delay: float) -> Iterator[None]:
+        """Report draining on SIGTERM and pass the signal on to the server ``delay`` seconds later.
+
+        A second SIGTERM is passed on at once. Does nothing without a server
+        handler to defer to, or off the main thread.
+        """
+
+        previous = signal.getsignal(signal.SIGTERM)
+        loop = asyncio.get_running_loop()
+
+        def on_sigterm() -> None:
+            if self.draining:
+                previous(signal.SIGTERM, None)
+                return
+            self.start_draining()
+            logger.info("SIGTERM: reporting not ready for %.1fs before shutting down", delay)
+            loop.call_later(delay, previous, signal.SIGTERM, None)
+
+        installed = False
+        if delay > 0 and callable(previous):
+            try:
+                loop.add_signal_handler(signal.SIGTERM, on_sigterm)
+                installed = True
+            except (NotImplementedError, RuntimeError, ValueError):
+                logger.warning("Cannot defer SIGTERM here; shutting down without a readiness delay")
+        try:
+            yield
+        finally:
+            if installed:
+                loop.remove_signal_handler(signal.SIGTERM)
+                signal.signal(signal.SIGTERM, previous)
+
+    def stats(self) -> dict[str, float]:
+        return {"ready": int(self.ready), "draining": int(self.draining), "in_flight": self.in_flight}
+
+
+lifecycle = Lifecycle()
+
+
+class InFlightMiddleware:
+    """Pure ASGI middleware counting HTTP requests that have not finished yet.
+
+    WebSockets are not counted; a live session can outlast any graceful timeout.
+    """
+
+    def __init__(self, app: ASGIApp, state: Lifecycle = lifecycle) -> None:
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.state.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.state.request_finished()
+
+
+async def _open(engine: AsyncEngine) -> AsyncConnection:
+    connection = await engine.connect()
+    await connection.execute(text("SELECT 1"))
+    return connection
+
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> int:
+    """Open up to ``connections`` pooled connections concurrently and return them to the pool.
+
+    Capped at the pool size: overflow connections are closed on release, so
+    opening more would only waste the handshakes. Pools that keep nothing
+    (``NullPool``) are not warmed.
+    """
+
+    size = getattr(engine.pool, "size", None)
+    count = min(connections, size()) if size is not None else 0
+    if count <= 0:
+        return 0
+    opened = await asyncio.gather(*(_open(engine) for _ in range(count)), return_exceptions=True)
+    warmed = 0
+    for connection in opened:
+        if isinstance(connection, BaseException):
+            logger.warning("Connection warm-up failed: %s", connection)
+            continue
+        await connection.close()
+        warmed += 1
+    logger.info("Warmed %d/%d connections for %s", warmed, count, engine.url.render_as_string(hide_password=True))
+    return warmed
@@ -0,0 +1,188 @@
+"""Per-request SQL and latency instrumentation exposed in Prometheus format."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Maximum SQL statements a single request may issue, keyed by (method, route).
+# A new statement in a hot path should be a deliberate budget bump.
+QUERY_BUDGETS: dict[tuple[str, str], int] = {
+    ("POST", "/api/program/init"): 7,
+    ("GET", "/api/workout/today"): 11,
+    ("PATCH", "/api/workout/update"): 8,
+    ("POST", "/api/workout/log"): 7,
+    ("POST", "/api/workout/finish"): 7,
+    ("POST", "/api/sync"): 13,
+    ("GET", "/api/history"): 1,
+    ("POST", "/api/exercise/guide"): 2,
+    ("GET", "/api/exercise/search"): 0,
+    ("GET", "/api/analytics/summary"): 4,
+    ("GET", "/health"): 0,
+    ("GET", "/ready"): 0,
+    ("GET", "/health/pool"): 0,
+    ("GET", "/metrics"): 0,
+}
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+@dataclass
+class RouteMetrics:
+    requests: int = 0
+    statements: int = 0
+    max_statements: int = 0
+    db_seconds: float = 0.0
+    total_seconds: float = 0.0
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+
+_current_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self._sources: dict[str, Callable[[], dict[str, float]]] = {}
+
+    def register_source(self, prefix: str, source: Callable[[], dict[str, float]]) -> None:
+        """Export every numeric value returned by ``source`` as a ``prefix_<key>`` gauge."""
+
+        self._sources[prefix] = source
+
+    def observe(self, method: str, route: str, stats: RequestStats, total_seconds: float) -> None:
+        metrics = self.routes.setdefault((method, route), RouteMetrics())
+        metrics.requests += 1
+        metrics.statements += stats.statements
+        metrics.max_statements = max(metrics.max_statements, stats.statements)
+        metrics.db_seconds += stats.db_seconds
+        metrics.total_seconds += total_seconds
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if total_seconds <= bound:
+                metrics.latency_buckets[index] += 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP gymbuddy_requests_total HTTP requests handled.",
+            "# TYPE gymbuddy_requests_total counter",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines.append(f'gymbuddy_requests_total{{method="{method}",route="{route}"}} {metrics.requests}')
+
+        lines += [
+            "# HELP gymbuddy_db_statements_total SQL statements issued while handling requests.",
+            "# TYPE gymbuddy_db_statements_total counter",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines.append(f'gymbuddy_db_statements_total{{method="{method}",route="{route}"}} {metrics.statements}')
+
+        lines += [
+            "# HELP gymbuddy_db_statements_max Most SQL statements issued by a single request.",
+            "# TYPE gymbuddy_db_statements_max gauge",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines.append(f'gymbuddy_db_statements_max{{method="{method}",route="{route}"}} {metrics.max_statements}')
+
+        lines += [
+            "# HELP gymbuddy_db_duration_seconds_total Time spent executing SQL while handling requests.",
+            "# TYPE gymbuddy_db_duration_seconds_total counter",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines.append(f'gymbuddy_db_duration_seconds_total{{method="{method}",route="{route}"}} {metrics.db_seconds:.6f}')
+
+        lines += [
+            "# HELP gymbuddy_request_duration_seconds End-to-end request latency.",
+            "# TYPE gymbuddy_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            labels = f'method="{method}",route="{route}"'
+            for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets):
+                lines.append(f'gymbuddy_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'gymbuddy_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.requests}')
+            lines.append(f"gymbuddy_request_duration_seconds_sum{{{labels}}} {metrics.total_seconds:.6f}")
+            lines.append(f"gymbuddy_request_duration_seconds_count{{{labels}}} {metrics.requests}")
+
+        for prefix, source in sorted(self._sources.items()):
+            for key, value in sorted(source().items()):
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attribute every cursor execution on ``engine`` to the current request."""
+
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording statement counts, DB time and total time per route."""
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_stats.reset(token)
+            # FastAPI stores the matched APIRoute in the scope during routing.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.registry.observe(scope["method"], route, stats, time.perf_counter() - started)
+
+
+def assert_query_budgets(registry: MetricsRegistry = metrics_registry) -> None:
+    """Test helper: fail if any observed route exceeded its entry in ``QUERY_BUDGETS``.
+
+    Drive the app (for example with ``TestClient``) and then call this to check
+    the worst request seen per route.
+    """
+
+    over_budget = []
+    for (method, route), metrics in registry.routes.items():
+        if route == "unmatched":
+            continue
+        budget = QUERY_BUDGETS.get((method, route))
+        if budget is None:
+            over_budget.append(f"{method} {route}: no query budget defined")
+        elif metrics.max_statements > budget:
+            over_budget.append(f"{method} {route}: {metrics.max_statements} statements (budget {budget})")
+
+    if over_budget:
+        raise AssertionError("Query budget exceeded:\n" + "\n".join(over_budget))
@@ -0,0 +1,56 @@
+"""Run CPU-bound service calls off the event loop once their input is large.
+
+Small inputs run inline: a thread hop costs tens of microseconds, more than
+most calls take. Above ``offload_min_items`` the call moves to a small thread
+pool. Pure-Python work still holds the GIL, but the interpreter switches
+threads every few milliseconds, so the loop keeps serving other requests
+instead of stalling for the whole call. A process pool would free the GIL
+too, but would have to pickle ORM rows both ways.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from app.core.config import get_settings
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+settings = get_settings()
+
+_executor = ThreadPoolExecutor(max_workers=settings.offload_workers, thread_name_prefix="cpu-offload")
+
+
+class OffloadStats:
+    def __init__(self) -> None:
+        self.inline = 0
+        self.offloaded = 0
+
+    def stats(self) -> dict[str, float]:
+        return {"inline": self.inline, "offloaded": self.offloaded}
+
+
+offload_stats = OffloadStats()
+
+
+async def run_cpu_bound(size: int, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+    """Call ``func`` inline, or in the offload pool when ``size`` reaches the threshold.
+
+    ``size`` is whatever drives the cost (rows sorted, items validated). The
+    arguments must not be mutated by the caller until this returns.
+    """
+
+    if size < settings.offload_min_items:
+        offload_stats.inline += 1
+        return func(*args, **kwargs)
+    offload_stats.offloaded += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: func(*args, **kwargs))
+
+
+def shutdown_offload_pool() -> None:
+    _executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,175 @@
+"""Opt-in sampling profiler for slow requests (``PROFILING_ENABLED=true``).
+
+A daemon thread samples the event-loop thread's Python stack every
+``profile_sample_interval_ms`` into a ring buffer. A sample whose innermost
+frame is the selector wait is idle; anything else is the loop running code,
+which is time no other coroutine can run. When a request takes longer than
+``profile_slow_request_ms``, ProfilingMiddleware writes the samples taken
+while it was in flight to ``profile_dir`` as one JSON file tagged with the
+method and route.
+
+Samples cover the whole loop, not just the slow request: when a request is
+slow because another one blocked the loop, the culprit's stack is what shows
+up. ``stacks`` uses the collapsed ``frame;frame;frame count`` format that
+flamegraph.pl and speedscope read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 64
+# Innermost frames that mean the loop is waiting for I/O rather than running
+# code. Under uvloop the wait happens in C, so the innermost Python frame is
+# the runner that started the loop.
+_IDLE_FRAMES = {("selectors.py", "select"), ("runners.py", "run")}
+
+
+def _collapse(frame) -> tuple[str, bool]:
+    """Root-first ``file:function`` stack and whether the loop was idle."""
+
+    idle = (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in _IDLE_FRAMES
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names)), idle
+
+
+class LoopSampler:
+    def __init__(self, interval: float, window: float) -> None:
+        self.interval = interval
+        # (monotonic time, collapsed stack, idle)
+        self.samples: deque[tuple[float, str, bool]] = deque(maxlen=max(int(window / interval), 1))
+        self._target: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, loop_thread_id: int) -> None:
+        self._target = loop_thread_id
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="loop-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                stack, idle = _collapse(frame)
+                self.samples.append((time.monotonic(), stack, idle))
+            del frame
+
+    def between(self, started: float, finished: float) -> list[tuple[float, str, bool]]:
+        return [sample for sample in list(self.samples) if started <= sample[0] <= finished]
+
+
+def _write(path: Path, document: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(orjson.dumps(document, option=orjson.OPT_INDENT_2))
+
+
+class SlowRequestProfiler:
+    def __init__(self, directory: Path, threshold_ms: float, sampler: LoopSampler) -> None:
+        self.directory = directory
+        self.threshold_ms = threshold_ms
+        self.sampler = sampler
+        self.slow_requests = 0
+        self.profiles_written = 0
+        self.busy_samples = 0
+        self.idle_samples = 0
+
+    async def record(self, method: str, route: str, started: float, finished: float) -> Path | None:
+        duration_ms = (finished - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return None
+        self.slow_requests += 1
+        samples = self.sampler.between(started, finished)
+        if not samples:
+            return None
+
+        busy = Counter(stack for _, stack, idle in samples if not idle)
+        idle = len(samples) - sum(busy.values())
+        self.busy_samples += sum(busy.values())
+        self.idle_samples += idle
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        path = self.directory / f"{stamp}_{method}_{slug}_{int(duration_ms)}ms.json"
+        document = {
+            "method": method,
+            "route": route,
+            "duration_ms": round(duration_ms, 3),
+            "sample_interval_ms": self.sampler.interval * 1000,
+            "samples": len(samples),
+            # Share of the request the loop spent running code instead of waiting on I/O.
+            "loop_busy_share": round(sum(busy.values()) / len(samples), 4),
+            "stacks": [f"{stack} {count}" for stack, count in busy.most_common()],
+        }
+        await asyncio.to_thread(_write, path, document)
+        self.profiles_written += 1
+        return path
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "slow_requests": self.slow_requests,
+            "profiles_written": self.profiles_written,
+            "busy_samples": self.busy_samples,
+            "idle_samples": self.idle_samples,
+        }
+
+
+def build_profiler() -> SlowRequestProfiler | None:
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        return None
+    interval = settings.profile_sample_interval_ms / 1000
+    # Keep enough history to cover the slowest request we would still profile.
+    sampler = LoopSampler(interval, window=max(settings.profile_slow_request_ms / 1000 * 20, 60))
+    return SlowRequestProfiler(Path(settings.profile_dir), settings.profile_slow_request_ms, sampler)
+
+
+profiler = build_profiler()
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware handing each request's timing to the profiler."""
+
+    def __init__(self, app: ASGIApp, slow_profiler: SlowRequestProfiler) -> None:
+        self.app = app
+        self.profiler = slow_profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # FastAPI stores the matched APIRoute in the scope during routing.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            try:
+                await self.profiler.record(scope["method"], route, started, time.monotonic())
+            except OSError:
+                logger.exception("Could not write slow-request profile for %s %s", scope["method"], route)
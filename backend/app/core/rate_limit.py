@@ -0,0 +1,263 @@
+"""Token-bucket rate limiting keyed on the resolved user id.
+
+Routes are grouped into classes ("cheap", "expensive") with a per-user and an
+optional global budget each. A request takes one token from every bucket that
+applies or from none of them, so a rejected request never drains the user's
+budget. The in-memory backend is per process; the Redis backend shares buckets
+across workers and hosts with a single Lua round-trip, and falls back to
+per-process buckets while Redis is unreachable rather than failing requests.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, status
+
+from app.core.config import get_settings
+from app.core.security import verify_jwt
+from app.db.utils import resolve_user_id
+
+logger = logging.getLogger(__name__)
+
+# RateLimiter.buckets names the bucket shared by all users "<class>:*".
+GLOBAL_KEY_SUFFIX = ":*"
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    rate: float  # tokens per second
+    burst: float  # bucket capacity
+
+
+class MemoryBackend:
+    """Buckets in a dict; safe without locks because the event loop is single-threaded.
+
+    Per-user buckets are evicted least recently used first once ``max_keys``
+    exist. Global buckets (keys ending in ``:*``) are kept apart and never
+    evicted, so a flood of new tokens cannot reset the global budget.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        # key -> [tokens, last refill (monotonic seconds)], least recently used first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._global: dict[str, list[float]] = {}
+
+    async def acquire(self, buckets: Sequence[tuple[str, Limit]], cost: float = 1.0) -> float:
+        return self.take(buckets, cost, time.monotonic())
+
+    def take(self, buckets: Sequence[tuple[str, Limit]], cost: float, now: float) -> float:
+        """Return 0 when every bucket had ``cost`` tokens, else seconds until they will."""
+
+        states = []
+        wait = 0.0
+        for key, limit in buckets:
+            table = self._global if key.endswith(GLOBAL_KEY_SUFFIX) else self._buckets
+            state = table.get(key)
+            if state is None:
+                if table is self._buckets and len(self._buckets) >= self.max_keys:
+                    self._evict(now)
+                state = table[key] = [limit.burst, now]
+            else:
+                if table is self._buckets:
+                    self._buckets.move_to_end(key)
+                state[0] = min(limit.burst, state[0] + (now - state[1]) * limit.rate)
+                state[1] = now
+            if state[0] < cost:
+                wait = max(wait, (cost - state[0]) / limit.rate)
+            states.append(state)
+        if wait:
+            return wait
+        for state in states:
+            state[0] -= cost
+        return 0.0
+
+    def _evict(self, now: float) -> None:
+        # Drop the least recently used bucket, plus any others idle for a
+        # minute; an idle bucket is (nearly) full anyway, so forgetting it
+        # only ever errs in the client's favour.
+        self._buckets.popitem(last=False)
+        while self._buckets:
+            state = next(iter(self._buckets.values()))
+            if now - state[1] < 60:
+                break
+            self._buckets.popitem(last=False)
+
+    async def close(self) -> None:
+        self._buckets.clear()
+        self._global.clear()
+
+
+# KEYS: bucket keys. ARGV: cost, then rate and burst per key. Uses the server
+# clock so workers with skewed clocks agree.
+_TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local wait = 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[i * 2])
+  local burst = tonumber(ARGV[i * 2 + 1])
+  local state = redis.call('HMGET', key, 't', 'ts')
+  local t = tonumber(state[1]) or burst
+  local ts = tonumber(state[2]) or now
+  t = math.min(burst, t + (now - ts) * rate)
+  tokens[i] = t
+  if t < cost then wait = math.max(wait, (cost - t) / rate) end
+end
+for i, key in ipairs(KEYS) do
+  local t = tokens[i]
+  if wait == 0 then t = t - cost end
+  local rate = tonumber(ARGV[i * 2])
+  local burst = tonumber(ARGV[i * 2 + 1])
+  redis.call('HSET', key, 't', t, 'ts', now)
+  redis.call('PEXPIRE', key, math.ceil((burst - t) / rate * 1000) + 1000)
+end
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Shared buckets in Redis or any server speaking its protocol (Valkey, KeyDB, ...)."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:", timeout: float = 0.5) -> None:
+        # Imported lazily so the in-memory default does not need the client installed.
+        from redis.asyncio import Redis
+        from redis.exceptions import RedisError
+
+        self.prefix = prefix
+        self._redis = Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._script = self._redis.register_script(_TAKE_SCRIPT)
+        self._errors = (RedisError, OSError)
+        # Per-process buckets used while Redis is unreachable: limits loosen
+        # to one budget per worker instead of every request failing.
+        self.fallback = MemoryBackend()
+        self.failures = 0
+        self._failing = False
+
+    async def acquire(self, buckets: Sequence[tuple[str, Limit]], cost: float = 1.0) -> float:
+        keys = [self.prefix + key for key, _ in buckets]
+        args: list[float] = [cost]
+        for _, limit in buckets:
+            args.extend((limit.rate, limit.burst))
+        try:
+            wait = float(await self._script(keys=keys, args=args))
+        except self._errors as exc:
+            self.failures += 1
+            if not self._failing:
+                self._failing = True
+                logger.warning("Rate limit store unreachable (%s); using per-process buckets", exc)
+            return await self.fallback.acquire(buckets, cost)
+        if self._failing:
+            self._failing = False
+            logger.warning("Rate limit store reachable again")
+        return wait
+
+    async def close(self) -> None:
+        await self.fallback.close()
+        await self._redis.aclose()
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        backend: MemoryBackend | RedisBackend,
+        per_user: dict[str, Limit],
+        global_limits: dict[str, Limit] | None = None,
+    ) -> None:
+        self.backend = backend
+        self.per_user = per_user
+        self.global_limits = global_limits or {}
+        self.allowed = 0
+        self.rejected = 0
+
+    def buckets(self, route_class: str, user_id: uuid.UUID) -> list[tuple[str, Limit]]:
+        buckets = [(f"{route_class}:{user_id}", self.per_user[route_class])]
+        if route_class in self.global_limits:
+            buckets.append((f"{route_class}{GLOBAL_KEY_SUFFIX}", self.global_limits[route_class]))
+        return buckets
+
+    async def check(self, route_class: str, user_id: uuid.UUID) -> float:
+        """Take a token for ``user_id``; returns the suggested Retry-After on rejection."""
+
+        wait = await self.backend.acquire(self.buckets(route_class, user_id))
+        if wait:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "backend_failures": getattr(self.backend, "failures", 0),
+        }
+
+
+def _per_minute(per_minute: float, burst: float) -> Limit:
+    return Limit(rate=per_minute / 60, burst=burst)
+
+
+def build_rate_limiter() -> RateLimiter | None:
+    settings = get_settings()
+    if not settings.rate_limit_enabled:
+        return None
+
+    if settings.rate_limit_backend == "redis":
+        if not settings.rate_limit_redis_url:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires RATE_LIMIT_REDIS_URL")
+        backend = RedisBackend(settings.rate_limit_redis_url)
+    else:
+        backend = MemoryBackend()
+
+    per_user = {
+        "cheap": _per_minute(settings.rate_limit_cheap_per_minute, settings.rate_limit_cheap_burst),
+        "expensive": _per_minute(settings.rate_limit_expensive_per_minute, settings.rate_limit_expensive_burst),
+    }
+    global_limits = {
+        route_class: Limit(rate=per_second, burst=per_second)
+        for route_class, per_second in (
+            ("cheap", settings.rate_limit_global_cheap_per_second),
+            ("expensive", settings.rate_limit_global_expensive_per_second),
+        )
+        if per_second > 0
+    }
+    return RateLimiter(backend, per_user, global_limits)
+
+
+rate_limiter = build_rate_limiter()
+
+
+async def check_rate_limit(route_class: str, user_id: uuid.UUID) -> float:
+    """Seconds until ``user_id`` may retry, or 0 when allowed (or limiting is off).
+
+    For callers outside the request/response cycle, e.g. WebSocket messages.
+    """
+
+    if rate_limiter is None:
+        return 0.0
+    return await rate_limiter.check(route_class, user_id)
+
+
+def rate_limit(route_class: str) -> Callable:
+    """Dependency enforcing the ``route_class`` budget; raises 429 with Retry-After."""
+
+    async def dependency(token: str = Depends(verify_jwt)) -> None:
+        wait = await check_rate_limit(route_class, resolve_user_id(token))
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return dependency
@@ -8,6 +8,16 @@ async def verify_jwt(authorization: str = Header(...)) -> str:
     the frontend integration is ready.
     """
 
+    return bearer_token(authorization)
+
+
+def bearer_token(authorization: str) -> str:
+    """Token of an ``Authorization: Bearer <token>`` value; raises 401 otherwise.
+
+    Shared by ``verify_jwt`` and the live WebSocket, which may also carry the
+    token in its subprotocol list.
+    """
+
     if not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,463 @@
+"""Move cold workout data out of Postgres into zstd-compressed NDJSON files.
+
+Run from cron after the analytics refresh::
+
+    python -m app.db.archive run
+    python -m app.db.archive run --after-months 6 --dry-run
+
+``run`` archives whole months of ``workout_logs`` older than
+``ARCHIVE_AFTER_MONTHS``. The horizon never passes the analytics rollups'
+high-water marks, so the summaries behind ``/api/analytics/summary`` already
+include every archived row and stay in Postgres. It also stays behind the
+``/api/sync`` offline window. For each month it:
+
+1. streams the month's logs, and the workouts whose logs are all older than
+   the month's end, ordered by user, into
+   ``ARCHIVE_DIR/<table>/YYYY-MM.ndjson.zst``;
+2. records the month in ``ARCHIVE_DIR/manifest.json``, which moves the
+   horizon ``/api/history`` reads archives below;
+3. removes the month's rows from ``change_feed`` in batches, then detaches
+   and drops the log partition and deletes the archived workouts in batches
+   of ``ARCHIVE_BATCH_SIZE``.
+
+Exercise guides not regenerated for ``ARCHIVE_GUIDES_AFTER_DAYS`` go to
+``ARCHIVE_DIR/exercise_guides_cache/`` and are deleted the same way. A month
+recorded in the manifest but not marked ``complete`` is finished by the next
+run, so an interrupted run is safe to repeat.
+
+Each file holds one zstd frame per user, and ``YYYY-MM.idx`` lists
+``(user id, offset, size)`` sorted by user id. Reading one user's month is a
+binary search plus one frame, whatever the file size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import mmap
+import os
+import struct
+import sys
+import uuid
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import orjson
+import zstandard
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from app.core.config import get_settings
+from app.db.models import ExerciseGuideCache, RollupState
+from app.db.partitions import add_months, detach_partition, existing_partitions, month_start
+from app.db.rollups import LOGS_STATE, WORKOUTS_STATE
+
+# user id, frame offset, frame size
+INDEX_ENTRY = struct.Struct(">16sQI")
+MANIFEST = "manifest.json"
+LOGS = "workout_logs"
+WORKOUTS = "workouts"
+GUIDES = "exercise_guides_cache"
+
+_ARCHIVING = text("SET LOCAL gymbuddy.archiving = 'on'")
+
+_LOG_ROWS = text(
+    """
+    SELECT id, user_id, workout_id, exercise_id, actual_weight, target_weight, sets, reps, completed, logged_at
+    FROM workout_logs
+    WHERE logged_at >= :start AND logged_at < :end
+    ORDER BY user_id, logged_at
+    """
+)
+
+# Workouts planned before the month's end with no log left after it. Logs
+# inside the month are still present here; their partition goes next.
+_WORKOUT_ROWS = text(
+    """
+    SELECT w.id, w.user_id, w.program_id, w.day_index, w.day_name, w.plan_json, w.plan_version,
+           w.date, w.started_at, w.finished_at
+    FROM workouts AS w
+    WHERE w.date < :end_day
+      AND NOT EXISTS (SELECT 1 FROM workout_logs AS l WHERE l.workout_id = w.id AND l.logged_at >= :end)
+    ORDER BY w.user_id, w.date
+    """
+)
+
+# One keyset page of a partition's rows, removed from the change feed.
+_FORGET_LOG_BATCH = """
+    WITH batch AS (
+        SELECT user_id, id, logged_at FROM {partition}
+        WHERE (id, logged_at) > (CAST(:after_id AS uuid), CAST(:after_at AS timestamptz))
+        ORDER BY id, logged_at
+        LIMIT :batch
+    ), forgotten AS (
+        DELETE FROM change_feed AS c USING batch
+        WHERE c.user_id = batch.user_id AND c.entity = 'workout_logs' AND c.entity_id = batch.id::text
+    )
+    SELECT id, logged_at FROM batch ORDER BY id DESC, logged_at DESC LIMIT 1
+"""
+
+# A workout that gained a log since it was exported stays in Postgres.
+_DELETE_WORKOUTS = text(
+    """
+    WITH doomed AS (
+        DELETE FROM workouts AS w
+        WHERE w.id = ANY(:ids) AND NOT EXISTS (SELECT 1 FROM workout_logs AS l WHERE l.workout_id = w.id)
+        RETURNING w.user_id, w.id
+    ), forgotten AS (
+        DELETE FROM change_feed AS c USING doomed
+        WHERE c.user_id = doomed.user_id AND c.entity = 'workouts' AND c.entity_id = doomed.id::text
+    )
+    SELECT count(*) FROM doomed
+    """
+)
+
+
+def month_files(root: Path, table: str, month: date) -> tuple[Path, Path]:
+    stem = root / table / f"{month:%Y-%m}"
+    return stem.with_suffix(".ndjson.zst"), stem.with_suffix(".idx")
+
+
+def _fsync_replace(tmp: Path, path: Path) -> None:
+    with tmp.open("rb+") as handle:
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+class FrameWriter:
+    """NDJSON rows in one zstd frame per group key, plus the sorted frame index.
+
+    Keys are 16 bytes (a user id) and rows must arrive grouped by key. Nothing
+    is visible under the final names until ``close``.
+    """
+
+    def __init__(self, path: Path, index_path: Path, level: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.index_path = index_path
+        self._tmp = path.with_name(path.name + ".tmp")
+        self._handle = self._tmp.open("wb")
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._index: list[tuple[bytes, int, int]] = []
+        self._key: bytes | None = None
+        self._lines: list[bytes] = []
+        self.rows = 0
+
+    def add(self, key: bytes, row: dict[str, Any]) -> None:
+        if key != self._key:
+            self._write_frame()
+            self._key = key
+        # asyncpg's own UUID type is not one orjson knows.
+        self._lines.append(orjson.dumps(row, default=str))
+        self.rows += 1
+
+    def _write_frame(self) -> None:
+        if not self._lines:
+            return
+        frame = self._compressor.compress(b"\n".join(self._lines) + b"\n")
+        self._index.append((self._key, self._handle.tell(), len(frame)))
+        self._handle.write(frame)
+        self._lines = []
+
+    def close(self) -> int:
+        self._write_frame()
+        self._handle.close()
+        keys = [entry[0] for entry in self._index]
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"{self.path}: rows were not grouped by key")
+        index_tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        index_tmp.write_bytes(b"".join(INDEX_ENTRY.pack(*entry) for entry in sorted(self._index)))
+        # Data first: an index never points into a file that is not there yet.
+        _fsync_replace(self._tmp, self.path)
+        _fsync_replace(index_tmp, self.index_path)
+        return self.rows
+
+
+def read_user_rows(path: Path, index_path: Path, user_id: uuid.UUID) -> list[dict[str, Any]]:
+    """One user's rows from an archive file, or ``[]`` if the file has none."""
+
+    if not index_path.exists() or index_path.stat().st_size == 0:
+        return []
+    key = user_id.bytes
+    with index_path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as index:
+        low, high = 0, len(index) // INDEX_ENTRY.size
+        while low < high:
+            middle = (low + high) // 2
+            if index[middle * INDEX_ENTRY.size : middle * INDEX_ENTRY.size + 16] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low * INDEX_ENTRY.size >= len(index):
+            return []
+        found, offset, size = INDEX_ENTRY.unpack_from(index, low * INDEX_ENTRY.size)
+    if found != key:
+        return []
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        frame = handle.read(size)
+    return [orjson.loads(line) for line in zstandard.ZstdDecompressor().decompress(frame).splitlines()]
+
+
+def iter_rows(path: Path) -> Iterator[dict[str, Any]]:
+    """Every row of an archive file, across all its frames."""
+
+    with path.open("rb") as handle:
+        reader = zstandard.ZstdDecompressor().stream_reader(handle, read_across_frames=True)
+        pending = b""
+        while chunk := reader.read(1 << 20):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield orjson.loads(line)
+
+
+def read_manifest(root: Path) -> dict[str, Any]:
+    path = root / MANIFEST
+    if not path.exists():
+        return {"horizon": None, "months": {}, "exercise_guides": []}
+    return orjson.loads(path.read_bytes())
+
+
+def write_manifest(root: Path, manifest: dict[str, Any]) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = root / f"{MANIFEST}.tmp"
+    tmp.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    _fsync_replace(tmp, root / MANIFEST)
+
+
+_manifest_cache: dict[Path, tuple[int, dict[str, Any]]] = {}
+
+
+def cached_manifest(root: Path) -> dict[str, Any] | None:
+    """The manifest, re-read only when the file changes; ``None`` before the first archive."""
+
+    path = root / MANIFEST
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _manifest_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, orjson.loads(path.read_bytes()))
+        _manifest_cache[path] = cached
+    return cached[1]
+
+
+def archive_horizon(root: Path | None = None) -> datetime | None:
+    """Logs before this instant live in the archive, not in ``workout_logs``."""
+
+    manifest = cached_manifest(root or Path(get_settings().archive_dir))
+    if not manifest or not manifest["horizon"]:
+        return None
+    return datetime.fromisoformat(manifest["horizon"])
+
+
+def archived_history(
+    user_id: uuid.UUID, exercise_id: str, lower: datetime | None, upper: datetime, root: Path | None = None
+) -> list[dict[str, Any]]:
+    """``/api/history`` entries for archived logs in ``[lower, upper)``, oldest first."""
+
+    root = root or Path(get_settings().archive_dir)
+    manifest = cached_manifest(root) or {"months": {}}
+    entries = []
+    for key in sorted(manifest["months"]):
+        month = date.fromisoformat(f"{key}-01")
+        start = datetime.combine(month, time.min, tzinfo=timezone.utc)
+        end = datetime.combine(add_months(month, 1), time.min, tzinfo=timezone.utc)
+        if end <= (lower or start) or start >= upper:
+            continue
+        for row in read_user_rows(*month_files(root, LOGS, month), user_id):
+            logged_at = datetime.fromisoformat(row["logged_at"])
+            if row["exercise_id"] == exercise_id and (lower is None or logged_at >= lower) and logged_at < upper:
+                entries.append(
+                    {"date": logged_at.date(), "weight": row["actual_weight"] or row["target_weight"] or 0.0}
+                )
+    return entries
+
+
+def cold_horizon(today: date, after_months: int, rollups_high_water: datetime | None) -> date | None:
+    """First month that stays in Postgres; ``None`` until the rollups have run."""
+
+    if rollups_high_water is None:
+        return None
+    offline = today - timedelta(days=get_settings().sync_max_offline_days)
+    return min(
+        add_months(month_start(today), -after_months),
+        month_start(rollups_high_water.date()),
+        month_start(offline),
+    )
+
+
+async def _rollups_high_water(conn: AsyncConnection) -> datetime | None:
+    result = await conn.execute(
+        select(func.min(RollupState.high_water), func.count()).where(
+            RollupState.name.in_([LOGS_STATE, WORKOUTS_STATE])
+        )
+    )
+    high_water, count = result.one()
+    return high_water if count == 2 else None
+
+
+async def _export(
+    engine: AsyncEngine, query, params: dict[str, Any], writer: FrameWriter, by_user: bool = True
+) -> int:
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=5000), params)
+        async for row in result.mappings():
+            writer.add(row["user_id"].bytes if by_user else bytes(16), dict(row))
+    return writer.close()
+
+
+async def _forget_logs(engine: AsyncEngine, partition: str, batch_size: int) -> None:
+    after_id, after_at = uuid.UUID(int=0), datetime.min.replace(tzinfo=timezone.utc)
+    while True:
+        async with engine.begin() as conn:
+            last = (
+                await conn.execute(
+                    text(_FORGET_LOG_BATCH.format(partition=partition)),
+                    {"after_id": after_id, "after_at": after_at, "batch": batch_size},
+                )
+            ).first()
+        if last is None:
+            return
+        after_id, after_at = last
+
+
+async def _delete_workouts(engine: AsyncEngine, ids: list[uuid.UUID], batch_size: int) -> int:
+    deleted = 0
+    for offset in range(0, len(ids), batch_size):
+        async with engine.begin() as conn:
+            await conn.execute(_ARCHIVING)
+            deleted += await conn.scalar(_DELETE_WORKOUTS, {"ids": ids[offset : offset + batch_size]})
+    return deleted
+
+
+async def archive_month(engine: AsyncEngine, root: Path, month: date, manifest: dict[str, Any]) -> dict[str, int]:
+    settings = get_settings()
+    key = f"{month:%Y-%m}"
+    start = datetime.combine(month, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(add_months(month, 1), time.min, tzinfo=timezone.utc)
+    log_path, log_index = month_files(root, LOGS, month)
+    workout_path, workout_index = month_files(root, WORKOUTS, month)
+
+    if key not in manifest["months"]:
+        logs = await _export(
+            engine,
+            _LOG_ROWS,
+            {"start": start, "end": end},
+            FrameWriter(log_path, log_index, settings.archive_zstd_level),
+        )
+        workouts = await _export(
+            engine,
+            _WORKOUT_ROWS,
+            {"end": end, "end_day": end.date()},
+            FrameWriter(workout_path, workout_index, settings.archive_zstd_level),
+        )
+        manifest["months"][key] = {LOGS: logs, WORKOUTS: workouts, "complete": False}
+        if manifest["horizon"] is None or datetime.fromisoformat(manifest["horizon"]) < end:
+            manifest["horizon"] = end.isoformat()
+        write_manifest(root, manifest)
+
+    async with engine.connect() as conn:
+        partition = (await existing_partitions(conn)).get(month)
+    if partition is not None:
+        await _forget_logs(engine, partition, settings.archive_batch_size)
+        async with engine.begin() as conn:
+            await detach_partition(conn, partition, drop=True)
+
+    ids = [uuid.UUID(row["id"]) for row in iter_rows(workout_path)] if workout_path.exists() else []
+    deleted = await _delete_workouts(engine, ids, settings.archive_batch_size)
+    manifest["months"][key]["complete"] = True
+    write_manifest(root, manifest)
+    return {LOGS: manifest["months"][key][LOGS], WORKOUTS: deleted}
+
+
+async def archive_guides(engine: AsyncEngine, root: Path, cutoff: datetime, manifest: dict[str, Any]) -> int:
+    settings = get_settings()
+    table = ExerciseGuideCache.__table__
+    stale = table.c.updated_at < cutoff
+    stem = root / GUIDES / f"{datetime.now(timezone.utc):%Y-%m-%dT%H%M%S}"
+    path = stem.with_suffix(".ndjson.zst")
+    writer = FrameWriter(path, stem.with_suffix(".idx"), settings.archive_zstd_level)
+    rows = await _export(engine, select(table).where(stale), {}, writer, by_user=False)
+    if not rows:
+        path.unlink(missing_ok=True)
+        writer.index_path.unlink(missing_ok=True)
+        return 0
+    manifest["exercise_guides"].append({"file": path.name, "rows": rows, "cutoff": cutoff.isoformat()})
+    write_manifest(root, manifest)
+
+    ids = [uuid.UUID(row["id"]) for row in iter_rows(path)]
+    for offset in range(0, len(ids), settings.archive_batch_size):
+        batch = ids[offset : offset + settings.archive_batch_size]
+        async with engine.begin() as conn:
+            # Guides regenerated since the export keep their row.
+            await conn.execute(table.delete().where(table.c.id.in_(batch), stale))
+    return rows
+
+
+async def run(engine: AsyncEngine, root: Path, after_months: int, guides_after_days: float, dry_run: bool) -> dict:
+    manifest = read_manifest(root)
+    async with engine.connect() as conn:
+        horizon = cold_horizon(date.today(), after_months, await _rollups_high_water(conn))
+        partitions = await existing_partitions(conn)
+
+    # Unfinished months from an interrupted run come first, whatever the horizon.
+    months = {date.fromisoformat(f"{key}-01") for key, entry in manifest["months"].items() if not entry["complete"]}
+    if horizon is not None:
+        months |= {month for month in partitions if month < horizon}
+    guides_cutoff = datetime.now(timezone.utc) - timedelta(days=guides_after_days)
+    summary: dict[str, Any] = {"horizon": horizon, "months": [f"{month:%Y-%m}" for month in sorted(months)]}
+    if dry_run:
+        return summary
+
+    summary[LOGS] = summary[WORKOUTS] = 0
+    for month in sorted(months):
+        archived = await archive_month(engine, root, month, manifest)
+        summary[LOGS] += archived[LOGS]
+        summary[WORKOUTS] += archived[WORKOUTS]
+    summary[GUIDES] = await archive_guides(engine, root, guides_cutoff, manifest)
+    return summary
+
+
+async def _main(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    engine = create_async_engine(args.database_url or settings.database_url)
+    try:
+        summary = await run(
+            engine,
+            Path(args.archive_dir or settings.archive_dir),
+            args.after_months if args.after_months is not None else settings.archive_after_months,
+            settings.archive_guides_after_days,
+            args.dry_run,
+        )
+    finally:
+        await engine.dispose()
+
+    if summary["horizon"] is None:
+        print("workout data: skipped, run `python -m app.db.rollups refresh` first")
+    else:
+        print(f"horizon: {summary['horizon']}")
+    print(f"months: {', '.join(summary['months']) or '-'}")
+    if not args.dry_run:
+        print(f"logs: {summary[LOGS]}; workouts: {summary[WORKOUTS]}; guides: {summary[GUIDES]}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL from settings")
+    parser.add_argument("--archive-dir", help="defaults to ARCHIVE_DIR from settings")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="archive cold months and stale guides")
+    run_parser.add_argument("--after-months", type=int, help="defaults to ARCHIVE_AFTER_MONTHS")
+    run_parser.add_argument("--dry-run", action="store_true", help="print the months that would be archived")
+
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Current exercise catalog, used by the program templates, the benchmark seeder and the tests.
+
+Migrations insert frozen copies of their rows; a new exercise here needs a
+migration of its own (see 0012_home_exercises).
+"""
+
+# (id, display name, aliases, muscle groups, equipment)
+DEFAULT_EXERCISES: list[tuple[str, str, list[str], list[str], list[str]]] = [
+    ("bench_press", "Bench Press", ["bench", "barbell bench press", "flat bench"], ["chest", "triceps", "shoulders"], ["barbell", "bench"]),
+    ("incline_bench_press", "Incline Bench Press", ["incline bench", "incline barbell press"], ["chest", "shoulders", "triceps"], ["barbell", "bench"]),
+    ("dumbbell_press", "Dumbbell Bench Press", ["db press", "dumbbell bench", "db bench press"], ["chest", "triceps", "shoulders"], ["dumbbell", "bench"]),
+    ("incline_dumbbell_press", "Incline Dumbbell Press", ["incline db press"], ["chest", "shoulders", "triceps"], ["dumbbell", "bench"]),
+    ("machine_chest_press", "Machine Chest Press", ["chest press"], ["chest", "triceps", "shoulders"], ["machine"]),
+    ("push_up", "Push-Up", ["pushup", "press up"], ["chest", "triceps", "shoulders", "core"], ["bodyweight"]),
+    ("dip", "Dip", ["dips", "parallel bar dip"], ["chest", "triceps", "shoulders"], ["bodyweight", "dip_station"]),
+    ("cable_fly", "Cable Fly", ["cable crossover", "cable flye"], ["chest"], ["cable"]),
+    ("dumbbell_fly", "Dumbbell Fly", ["db fly", "dumbbell flye"], ["chest"], ["dumbbell", "bench"]),
+    ("overhead_press", "Overhead Press", ["ohp", "military press", "standing press"], ["shoulders", "triceps"], ["barbell"]),
+    ("dumbbell_shoulder_press", "Dumbbell Shoulder Press", ["db shoulder press", "seated dumbbell press"], ["shoulders", "triceps"], ["dumbbell"]),
+    ("machine_shoulder_press", "Machine Shoulder Press", ["shoulder press machine"], ["shoulders", "triceps"], ["machine"]),
+    ("pike_push_up", "Pike Push-Up", ["pike pushup", "pike press"], ["shoulders", "triceps"], ["bodyweight"]),
+    ("lateral_raise", "Lateral Raise", ["side raise", "db lateral raise"], ["shoulders"], ["dumbbell"]),
+    ("face_pull", "Face Pull", ["cable face pull"], ["shoulders", "upper_back"], ["cable"]),
+    ("barbell_row", "Barbell Row", ["bent over row", "bb row", "pendlay row"], ["upper_back", "lats", "biceps"], ["barbell"]),
+    ("dumbbell_row", "Dumbbell Row", ["db row", "one arm dumbbell row"], ["upper_back", "lats", "biceps"], ["dumbbell", "bench"]),
+    ("seated_cable_row", "Seated Cable Row", ["cable row", "low row"], ["upper_back", "lats", "biceps"], ["cable"]),
+    ("machine_row", "Machine Row", ["chest supported row machine"], ["upper_back", "lats", "biceps"], ["machine"]),
+    ("inverted_row", "Inverted Row", ["bodyweight row", "australian pull up"], ["upper_back", "lats", "biceps"], ["bodyweight", "bar"]),
+    ("bent_over_dumbbell_row", "Bent-Over Dumbbell Row", ["two arm dumbbell row", "db bent over row"], ["upper_back", "lats", "biceps"], ["dumbbell"]),
+    ("doorframe_row", "Doorframe Row", ["door frame row", "doorway row"], ["upper_back", "lats", "biceps"], ["bodyweight"]),
+    ("lat_pulldown", "Lat Pulldown", ["pulldown", "lat pull down", "cable pulldown"], ["lats", "biceps", "upper_back"], ["cable"]),
+    ("pull_up", "Pull-Up", ["pullup", "pull ups"], ["lats", "biceps", "upper_back"], ["bodyweight", "bar"]),
+    ("chin_up", "Chin-Up", ["chinup", "chin ups"], ["lats", "biceps"], ["bodyweight", "bar"]),
+    ("back_squat", "Back Squat", ["squat", "barbell squat", "high bar squat"], ["quads", "glutes", "core"], ["barbell", "rack"]),
+    ("front_squat", "Front Squat", ["barbell front squat"], ["quads", "glutes", "core"], ["barbell", "rack"]),
+    ("goblet_squat", "Goblet Squat", ["db goblet squat", "kettlebell goblet squat"], ["quads", "glutes"], ["dumbbell"]),
+    ("leg_press", "Leg Press", ["machine leg press"], ["quads", "glutes"], ["machine"]),
+    ("bulgarian_split_squat", "Bulgarian Split Squat", ["split squat", "rear foot elevated split squat"], ["quads", "glutes"], ["dumbbell", "bench"]),
+    ("lunge", "Lunge", ["walking lunge", "dumbbell lunge"], ["quads", "glutes"], ["dumbbell"]),
+    ("bodyweight_squat", "Bodyweight Squat", ["air squat", "squat bodyweight"], ["quads", "glutes"], ["bodyweight"]),
+    ("leg_extension", "Leg Extension", ["knee extension"], ["quads"], ["machine"]),
+    ("deadlift", "Deadlift", ["conventional deadlift", "barbell deadlift"], ["hamstrings", "glutes", "lower_back", "upper_back"], ["barbell"]),
+    ("romanian_deadlift", "Romanian Deadlift", ["rdl", "stiff leg deadlift"], ["hamstrings", "glutes", "lower_back"], ["barbell"]),
+    ("dumbbell_romanian_deadlift", "Dumbbell Romanian Deadlift", ["db rdl", "dumbbell rdl"], ["hamstrings", "glutes", "lower_back"], ["dumbbell"]),
+    ("hip_thrust", "Hip Thrust", ["barbell hip thrust", "glute bridge"], ["glutes", "hamstrings"], ["barbell", "bench"]),
+    ("leg_curl", "Leg Curl", ["hamstring curl", "lying leg curl"], ["hamstrings"], ["machine"]),
+    ("nordic_curl", "Nordic Curl", ["nordic hamstring curl"], ["hamstrings"], ["bodyweight"]),
+    ("calf_raise", "Calf Raise", ["standing calf raise"], ["calves"], ["machine"]),
+    ("bicep_curl", "Biceps Curl", ["curl", "dumbbell curl", "bicep curl"], ["biceps"], ["dumbbell"]),
+    ("barbell_curl", "Barbell Curl", ["bb curl"], ["biceps"], ["barbell"]),
+    ("hammer_curl", "Hammer Curl", ["db hammer curl"], ["biceps", "forearms"], ["dumbbell"]),
+    ("tricep_pushdown", "Triceps Pushdown", ["pushdown", "cable pushdown", "tricep pushdown"], ["triceps"], ["cable"]),
+    ("skull_crusher", "Skull Crusher", ["lying triceps extension"], ["triceps"], ["barbell", "bench"]),
+    ("plank", "Plank", ["front plank"], ["core"], ["bodyweight"]),
+    ("hanging_leg_raise", "Hanging Leg Raise", ["leg raise"], ["core"], ["bodyweight", "bar"]),
+    ("cable_crunch", "Cable Crunch", ["kneeling cable crunch"], ["core"], ["cable"]),
+]
@@ -1,8 +1,8 @@
 import uuid
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Integer, JSON, String
-from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, JSON, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -21,6 +21,8 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, nullable=False
     )
+    # Last change-feed sequence number; bumped by database triggers only.
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
 
     preferences: Mapped["UserPreference"] = relationship(
         back_populates="user", uselist=False, cascade="all, delete-orphan"
@@ -59,7 +61,7 @@ class Program(Base):
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
     split: Mapped[str] = mapped_column(String, nullable=False)
-    program_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    program_json: Mapped[dict] = mapped_column(JSONB, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, nullable=False
     )
@@ -69,6 +71,12 @@ class Program(Base):
 
 class Workout(Base):
     __tablename__ = "workouts"
+    # Let the analytics refresh find workouts planned or finished since its
+    # last run without scanning the table.
+    __table_args__ = (
+        Index("ix_workouts_date", "date"),
+        Index("ix_workouts_finished_at", "finished_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -76,8 +84,16 @@ class Workout(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
+    program_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("programs.id")
+    )
+    day_index: Mapped[int | None] = mapped_column(Integer)
     day_name: Mapped[str] = mapped_column(String, nullable=False)
-    plan_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    plan_json: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Bumped on every in-place plan change; plan_patches holds the recent diffs
+    # (see app/services/plan_patch.py).
+    plan_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    plan_patches: Mapped[list] = mapped_column(JSONB, nullable=False, default=list, server_default="[]")
     date: Mapped[date] = mapped_column(Date, nullable=False)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -88,6 +104,14 @@ class Workout(Base):
 
 class WorkoutLog(Base):
     __tablename__ = "workout_logs"
+    # Range-partitioned by month on logged_at; see app/db/partitions.py. The
+    # partition key has to be part of the primary key.
+    __table_args__ = (
+        Index("ix_workout_logs_user_exercise_logged_at", "user_id", "exercise_id", "logged_at"),
+        Index("ix_workout_logs_user_logged_at", "user_id", "logged_at"),
+        Index("ix_workout_logs_workout_id", "workout_id"),
+        {"postgresql_partition_by": "RANGE (logged_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -105,13 +129,36 @@ class WorkoutLog(Base):
     reps: Mapped[str | None] = mapped_column(String)
     completed: Mapped[bool] = mapped_column(Boolean, default=True)
     logged_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), primary_key=True, default=datetime.utcnow, nullable=False
     )
 
     user: Mapped[User] = relationship(back_populates="logs")
     workout: Mapped[Workout] = relationship(back_populates="logs")
 
 
+class ChangeFeed(Base):
+    """Latest change per synced row, written by the ``record_change`` trigger.
+
+    Inserts, updates and deletes on ``programs``, ``user_preferences``,
+    ``workouts`` and ``workout_logs`` bump ``users.change_seq`` and upsert the
+    row's snapshot here under that sequence number (``data`` is null for
+    deletes). See ``alembic/versions/0010_change_feed.py``.
+    """
+
+    __tablename__ = "change_feed"
+    __table_args__ = (Index("ix_change_feed_user_seq", "user_id", "seq", unique=True),)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    entity: Mapped[str] = mapped_column(String, primary_key=True)
+    entity_id: Mapped[str] = mapped_column(String, primary_key=True)
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    op: Mapped[str] = mapped_column(String, nullable=False)
+    data: Mapped[dict | None] = mapped_column(JSONB)
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class ExerciseGuideCache(Base):
     __tablename__ = "exercise_guides_cache"
 
@@ -160,3 +207,106 @@ class StrengthEstimate(Base):
     plank_seconds: Mapped[int | None] = mapped_column(Integer)
 
     user: Mapped[User] = relationship(back_populates="strength_estimate")
+
+
+class ProgramTemplate(Base):
+    __tablename__ = "program_templates"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    template_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+
+
+class Exercise(Base):
+    __tablename__ = "exercises"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    aliases: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
+    muscle_groups: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
+    equipment: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
+
+
+class RollupState(Base):
+    """High-water mark of an incrementally refreshed rollup (see app/db/rollups.py)."""
+
+    __tablename__ = "rollup_state"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    high_water: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class DailyActivity(Base):
+    __tablename__ = "analytics_daily_activity"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    planned: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    finished: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    logs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailyMuscleVolume(Base):
+    __tablename__ = "analytics_daily_muscle_volume"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    muscle_group: Mapped[str] = mapped_column(String, primary_key=True)
+    sets: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    volume_kg: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+
+class WeeklyMuscleVolume(Base):
+    __tablename__ = "analytics_weekly_muscle_volume"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    muscle_group: Mapped[str] = mapped_column(String, primary_key=True)
+    sets: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    volume_kg: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+
+class ExerciseBest(Base):
+    __tablename__ = "analytics_exercise_bests"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    exercise_id: Mapped[str] = mapped_column(String, primary_key=True)
+    weight: Mapped[float] = mapped_column(Float, nullable=False)
+    achieved_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class PersonalRecord(Base):
+    __tablename__ = "analytics_personal_records"
+    __table_args__ = (Index("ix_analytics_personal_records_user_achieved_at", "user_id", "achieved_at"),)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    exercise_id: Mapped[str] = mapped_column(String, primary_key=True)
+    achieved_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    weight: Mapped[float] = mapped_column(Float, nullable=False)
+    previous_best: Mapped[float | None] = mapped_column(Float)
+
+
+class StrengthStandard(Base):
+    """Per-cohort lift percentiles; rebuilt by app/services/strength_standards.py.
+
+    ``weight_class`` and ``age_band`` hold the lower bound of the bucket (0 for
+    the lowest one); ``-1`` and sex ``"any"`` mark cohorts pooled over that
+    dimension.
+    """
+
+    __tablename__ = "strength_standards"
+
+    lift: Mapped[str] = mapped_column(String, primary_key=True)
+    sex: Mapped[str] = mapped_column(String, primary_key=True)
+    weight_class: Mapped[int] = mapped_column(Integer, primary_key=True)
+    age_band: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sample_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    p10: Mapped[float] = mapped_column(Float, nullable=False)
+    p25: Mapped[float] = mapped_column(Float, nullable=False)
+    p50: Mapped[float] = mapped_column(Float, nullable=False)
+    p75: Mapped[float] = mapped_column(Float, nullable=False)
+    p90: Mapped[float] = mapped_column(Float, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,280 @@
+"""Monthly range partitions for ``workout_logs``.
+
+Run from cron (or before each deploy) to keep partitions ahead of the clock::
+
+    python -m app.db.partitions maintain --ahead 3 --retain-months 24
+    python -m app.db.partitions check --min-ahead 1
+    python -m app.db.partitions verify-pruning --start 2024-01-01 --end 2024-01-31
+
+``maintain`` creates the next ``--ahead`` months and detaches partitions older
+than ``--retain-months``; detached partitions stay behind as standalone
+``archived_workout_logs_YYYY_MM`` tables unless ``--drop`` is given.
+
+Logs outside every monthly partition land in ``workout_logs_default`` instead
+of failing the insert. ``maintain`` moves them into their own month's
+partition, and ``check`` exits non-zero (for alerting) while the default
+partition holds rows or fewer than ``--min-ahead`` future months exist.
+``verify-pruning`` runs ``EXPLAIN`` for a ranged history query and exits
+non-zero if Postgres scans partitions outside the range.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import get_settings
+from app.db.models import WorkoutLog
+
+PARENT_TABLE = "workout_logs"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_NAME = re.compile(r"^workout_logs_(\d{4})_(\d{2})$")
+_COLUMNS = ", ".join(column.name for column in WorkoutLog.__table__.columns)
+# Rows moved out of the default partition only change partition; keep the
+# change-feed trigger (alembic 0011) from reporting them as deleted.
+_SKIP_CHANGE_FEED = text("SET LOCAL gymbuddy.archiving = 'on'")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def history_range(start: date | None, end: date | None) -> tuple[datetime | None, datetime | None]:
+    """Turn an inclusive date range into UTC ``logged_at`` bounds usable for pruning."""
+
+    lower = datetime.combine(start, time.min, tzinfo=timezone.utc) if start else None
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc) if end else None
+    return lower, upper
+
+
+async def existing_partitions(conn: AsyncConnection) -> dict[date, str]:
+    result = await conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions = {}
+    for (name,) in result.all():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def _bounds(month: date) -> str:
+    return f"FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+
+
+async def create_default_partition(conn: AsyncConnection) -> None:
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+
+async def default_partition_months(conn: AsyncConnection) -> dict[date, int]:
+    """Row count per (UTC) month of the rows sitting in the default partition."""
+
+    if not await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}):
+        return {}
+    result = await conn.execute(
+        text(
+            f"SELECT date_trunc('month', logged_at AT TIME ZONE 'UTC')::date, count(*) "
+            f"FROM {DEFAULT_PARTITION} GROUP BY 1"
+        )
+    )
+    return dict(result.all())
+
+
+async def create_partition(conn: AsyncConnection, month: date, split_default: bool = False) -> str:
+    """Create ``month``'s partition; ``split_default`` first moves its rows out of the default partition."""
+
+    name = partition_name(month)
+    if not split_default:
+        await conn.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} FOR VALUES {_bounds(month)}")
+        )
+        return name
+
+    # Postgres refuses a partition whose range overlaps rows in the default
+    # partition, so build it standalone, move the rows, then attach it.
+    await conn.execute(_SKIP_CHANGE_FEED)
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE logged_at >= :lower AND logged_at < :upper "
+            f"RETURNING {_COLUMNS}) INSERT INTO {name} ({_COLUMNS}) SELECT {_COLUMNS} FROM moved"
+        ),
+        {
+            "lower": datetime.combine(month, time.min, tzinfo=timezone.utc),
+            "upper": datetime.combine(add_months(month, 1), time.min, tzinfo=timezone.utc),
+        },
+    )
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}"))
+    return name
+
+
+async def ensure_partitions(conn: AsyncConnection, first: date, last: date) -> list[str]:
+    """Create every missing monthly partition between ``first`` and ``last`` inclusive."""
+
+    existing = await existing_partitions(conn)
+    in_default = await default_partition_months(conn)
+    created = []
+    month = month_start(first)
+    while month <= month_start(last):
+        if month not in existing:
+            created.append(await create_partition(conn, month, split_default=month in in_default))
+        month = add_months(month, 1)
+    return created
+
+
+async def detach_partition(conn: AsyncConnection, name: str, drop: bool = False) -> None:
+    await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    if drop:
+        await conn.execute(text(f"DROP TABLE {name}"))
+    else:
+        await conn.execute(text(f"ALTER TABLE {name} RENAME TO archived_{name}"))
+
+
+async def detach_partitions_before(conn: AsyncConnection, cutoff: date, drop: bool = False) -> list[str]:
+    detached = []
+    for month, name in sorted((await existing_partitions(conn)).items()):
+        if month >= month_start(cutoff):
+            break
+        await detach_partition(conn, name, drop)
+        detached.append(name)
+    return detached
+
+
+async def maintain(conn: AsyncConnection, ahead: int, retain_months: int | None, drop: bool) -> dict[str, list[str]]:
+    this_month = month_start(date.today())
+    created = await ensure_partitions(conn, this_month, add_months(this_month, ahead))
+    # Anything else in the default partition predates or outruns the window.
+    existing = await existing_partitions(conn)
+    for month in sorted(await default_partition_months(conn)):
+        if month not in existing:
+            created.append(await create_partition(conn, month, split_default=True))
+    detached = []
+    if retain_months is not None:
+        detached = await detach_partitions_before(conn, add_months(this_month, -retain_months), drop)
+    return {"created": created, "detached": detached}
+
+
+async def check(conn: AsyncConnection, min_ahead: int) -> list[str]:
+    """Problems worth alerting on; empty when partitioning is healthy."""
+
+    problems = []
+    existing = await existing_partitions(conn)
+    this_month = month_start(date.today())
+    for offset in range(min_ahead + 1):
+        month = add_months(this_month, offset)
+        if month not in existing:
+            problems.append(f"no partition for {month:%Y-%m}")
+    in_default = await default_partition_months(conn)
+    if in_default:
+        months = ", ".join(f"{month:%Y-%m}" for month in sorted(in_default))
+        problems.append(f"{sum(in_default.values())} rows in {DEFAULT_PARTITION} ({months}); run maintain")
+    return problems
+
+
+async def scanned_partitions(
+    conn: AsyncConnection, user_id: uuid.UUID, exercise_id: str, start: date, end: date
+) -> list[str]:
+    """Partitions Postgres plans to scan for a ranged ``/api/history`` query."""
+
+    lower, upper = history_range(start, end)
+    query = (
+        select(WorkoutLog.logged_at, WorkoutLog.actual_weight, WorkoutLog.target_weight)
+        .where(
+            WorkoutLog.user_id == user_id,
+            WorkoutLog.exercise_id == exercise_id,
+            WorkoutLog.logged_at >= lower,
+            WorkoutLog.logged_at < upper,
+        )
+        .order_by(WorkoutLog.logged_at)
+    )
+    compiled = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = await conn.execute(text(f"EXPLAIN {compiled}"))
+    lines = "\n".join(row[0] for row in plan.all())
+    return sorted(set(re.findall(r"\bworkout_logs_(?:\d{4}_\d{2}|default)\b", lines)))
+
+
+async def _main(args: argparse.Namespace) -> int:
+    engine = create_async_engine(args.database_url or get_settings().database_url)
+    try:
+        async with engine.begin() as conn:
+            if args.command == "maintain":
+                result = await maintain(conn, args.ahead, args.retain_months, args.drop)
+                print(f"created: {', '.join(result['created']) or '-'}")
+                print(f"detached: {', '.join(result['detached']) or '-'}")
+                return 0
+            if args.command == "check":
+                problems = await check(conn, args.min_ahead)
+                for problem in problems:
+                    print(problem)
+                return 1 if problems else 0
+
+            start, end = date.fromisoformat(args.start), date.fromisoformat(args.end)
+            scanned = await scanned_partitions(conn, uuid.UUID(args.user_id), args.exercise_id, start, end)
+            expected = set()
+            month = month_start(start)
+            while month <= month_start(end):
+                expected.add(partition_name(month))
+                month = add_months(month, 1)
+            unexpected = sorted(set(scanned) - expected)
+            print(f"scanned: {', '.join(scanned) or '-'}")
+            if unexpected:
+                print(f"pruning failed, also scanned: {', '.join(unexpected)}")
+                return 1
+            return 0
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL from settings")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    maintain_parser = commands.add_parser("maintain", help="pre-create future partitions, detach old ones")
+    maintain_parser.add_argument("--ahead", type=int, default=3, help="months to create beyond the current one")
+    maintain_parser.add_argument("--retain-months", type=int, help="detach partitions older than this many months")
+    maintain_parser.add_argument("--drop", action="store_true", help="drop detached partitions instead of keeping them")
+
+    check_parser = commands.add_parser(
+        "check", help="exit non-zero if the default partition has rows or too few future months exist"
+    )
+    check_parser.add_argument("--min-ahead", type=int, default=1, help="future months that must already exist")
+
+    verify_parser = commands.add_parser("verify-pruning", help="EXPLAIN a ranged history query")
+    verify_parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    verify_parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+    verify_parser.add_argument("--user-id", default=str(uuid.uuid4()))
+    verify_parser.add_argument("--exercise-id", default="bench_press")
+
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Incrementally refreshed analytics rollups behind ``/api/analytics/summary``.
+
+Run from cron every few minutes::
+
+    python -m app.db.rollups refresh
+    python -m app.db.rollups refresh --rebuild   # recompute from scratch
+
+Each run folds ``workout_logs`` rows with ``logged_at`` in
+``(high_water, now() - lag]`` into the daily/weekly rollups, in chunks of
+``--chunk-hours`` so a backfill never holds one huge transaction, and advances
+the high-water mark in the same transaction as the rollup writes. The lag
+(``ANALYTICS_REFRESH_LAG_SECONDS``) leaves room for write-behind flushes and
+in-flight commits; a log that lands with an older ``logged_at`` than the mark
+is only picked up by ``--rebuild``. Per-day planned/finished counts are
+recomputed (not added) for every workout planned or finished since the last run.
+
+Once ``app.db.archive`` has moved logs out of Postgres, the rollups are the
+only copy of their summaries, so ``--rebuild`` refuses to run unless
+``--discard-archived`` is given.
+
+Concurrent refreshes serialize on the ``rollup_state`` row lock.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from app.core.config import get_settings
+from app.db.models import (
+    DailyActivity,
+    DailyMuscleVolume,
+    ExerciseBest,
+    PersonalRecord,
+    RollupState,
+    WeeklyMuscleVolume,
+    WorkoutLog,
+)
+
+LOGS_STATE = "workout_logs"
+WORKOUTS_STATE = "workouts"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# A secondary muscle gets half credit for a set, the primary one full credit.
+SECONDARY_SHARE = 0.5
+
+_CREATE_WINDOW = text(
+    """
+    CREATE TEMP TABLE rollup_window (
+        user_id UUID NOT NULL,
+        exercise_id VARCHAR NOT NULL,
+        logged_at TIMESTAMPTZ NOT NULL,
+        day DATE NOT NULL,
+        week_start DATE NOT NULL,
+        completed BOOLEAN NOT NULL,
+        weight DOUBLE PRECISION NOT NULL,
+        sets INTEGER NOT NULL,
+        volume DOUBLE PRECISION NOT NULL
+    ) ON COMMIT DROP
+    """
+)
+
+# reps is free text like "8,8,6"; non-numeric parts are ignored.
+_FILL_WINDOW = text(
+    """
+    INSERT INTO rollup_window
+    SELECT l.user_id,
+           l.exercise_id,
+           l.logged_at,
+           (l.logged_at AT TIME ZONE 'UTC')::date,
+           date_trunc('week', l.logged_at AT TIME ZONE 'UTC')::date,
+           l.completed,
+           coalesce(l.actual_weight, l.target_weight, 0),
+           coalesce(l.sets, r.set_count, 0),
+           coalesce(l.actual_weight, l.target_weight, 0) * coalesce(r.total_reps, 0)
+    FROM workout_logs AS l
+    LEFT JOIN LATERAL (
+        SELECT sum(part::int) AS total_reps, count(*)::int AS set_count
+        FROM unnest(string_to_array(l.reps, ',')) AS part
+        WHERE part ~ '^ *[0-9]{1,4} *$'
+    ) AS r ON true
+    WHERE l.logged_at > :lower AND l.logged_at <= :upper
+    """
+)
+
+_MUSCLE_VOLUME = """
+    INSERT INTO {table} (user_id, {period}, muscle_group, sets, volume_kg)
+    SELECT w.user_id,
+           w.{period},
+           m.muscle,
+           sum(w.sets * CASE WHEN m.rank = 1 THEN 1.0 ELSE {secondary} END),
+           sum(w.volume * CASE WHEN m.rank = 1 THEN 1.0 ELSE {secondary} END)
+    FROM rollup_window AS w
+    LEFT JOIN exercises AS e ON e.id = w.exercise_id
+    CROSS JOIN LATERAL unnest(
+        coalesce(nullif(e.muscle_groups, '{{}}'), ARRAY['other']::varchar[])
+    ) WITH ORDINALITY AS m(muscle, rank)
+    GROUP BY w.user_id, w.{period}, m.muscle
+    ON CONFLICT (user_id, {period}, muscle_group) DO UPDATE
+    SET sets = {table}.sets + excluded.sets,
+        volume_kg = {table}.volume_kg + excluded.volume_kg
+"""
+_DAILY_VOLUME = text(
+    _MUSCLE_VOLUME.format(table=DailyMuscleVolume.__tablename__, period="day", secondary=SECONDARY_SHARE)
+)
+_WEEKLY_VOLUME = text(
+    _MUSCLE_VOLUME.format(table=WeeklyMuscleVolume.__tablename__, period="week_start", secondary=SECONDARY_SHARE)
+)
+
+_DAILY_LOGS = text(
+    """
+    INSERT INTO analytics_daily_activity (user_id, day, planned, finished, logs)
+    SELECT user_id, day, 0, 0, count(*) FROM rollup_window GROUP BY user_id, day
+    ON CONFLICT (user_id, day) DO UPDATE SET logs = analytics_daily_activity.logs + excluded.logs
+    """
+)
+
+# A PR is a completed log heavier than both the stored best and every earlier
+# log in this window. An exercise's first log sets the best without being a PR.
+_PERSONAL_RECORDS = text(
+    """
+    WITH ranked AS (
+        SELECT user_id, exercise_id, logged_at, weight,
+               max(weight) OVER (
+                   PARTITION BY user_id, exercise_id ORDER BY logged_at
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ) AS window_best
+        FROM rollup_window
+        WHERE completed AND weight > 0
+    )
+    INSERT INTO analytics_personal_records (user_id, exercise_id, achieved_at, weight, previous_best)
+    SELECT r.user_id, r.exercise_id, r.logged_at, r.weight, greatest(b.weight, r.window_best)
+    FROM ranked AS r
+    LEFT JOIN analytics_exercise_bests AS b USING (user_id, exercise_id)
+    WHERE r.weight > greatest(b.weight, r.window_best)
+    ON CONFLICT DO NOTHING
+    """
+)
+
+_EXERCISE_BESTS = text(
+    """
+    INSERT INTO analytics_exercise_bests (user_id, exercise_id, weight, achieved_at)
+    SELECT DISTINCT ON (user_id, exercise_id) user_id, exercise_id, weight, logged_at
+    FROM rollup_window
+    WHERE completed AND weight > 0
+    ORDER BY user_id, exercise_id, weight DESC, logged_at
+    ON CONFLICT (user_id, exercise_id) DO UPDATE
+    SET weight = excluded.weight, achieved_at = excluded.achieved_at
+    WHERE excluded.weight > analytics_exercise_bests.weight
+    """
+)
+
+_WORKOUT_ACTIVITY = text(
+    """
+    INSERT INTO analytics_daily_activity (user_id, day, planned, finished, logs)
+    SELECT w.user_id, w.date, count(*), count(w.finished_at), 0
+    FROM workouts AS w
+    JOIN (
+        SELECT DISTINCT user_id, date FROM workouts
+        WHERE date >= :lower_day OR finished_at > :lower
+    ) AS touched USING (user_id, date)
+    GROUP BY w.user_id, w.date
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET planned = excluded.planned, finished = excluded.finished
+    """
+)
+
+
+async def _lock_state(conn: AsyncConnection, name: str, initial: datetime | None = None) -> datetime:
+    """Return the high-water mark for ``name``, holding its row lock until commit."""
+
+    query = select(RollupState.high_water).where(RollupState.name == name).with_for_update()
+    high_water = await conn.scalar(query)
+    if high_water is not None:
+        return high_water
+    if initial is None:
+        first = await conn.scalar(select(func.min(WorkoutLog.logged_at)))
+        initial = first - timedelta(microseconds=1) if first else await conn.scalar(select(func.now()))
+    await conn.execute(
+        insert(RollupState)
+        .values(name=name, high_water=initial, refreshed_at=func.now())
+        .on_conflict_do_nothing()
+    )
+    return await conn.scalar(query)
+
+
+async def _advance(conn: AsyncConnection, name: str, high_water: datetime) -> None:
+    await conn.execute(
+        RollupState.__table__.update()
+        .where(RollupState.name == name)
+        .values(high_water=high_water, refreshed_at=func.now())
+    )
+
+
+async def refresh_log_window(conn: AsyncConnection, lower: datetime, upper: datetime) -> int:
+    """Fold logs in ``(lower, upper]`` into every log-derived rollup; returns the row count."""
+
+    await conn.execute(_CREATE_WINDOW)
+    result = await conn.execute(_FILL_WINDOW, {"lower": lower, "upper": upper})
+    if result.rowcount:
+        await conn.execute(_DAILY_VOLUME)
+        await conn.execute(_WEEKLY_VOLUME)
+        await conn.execute(_DAILY_LOGS)
+        await conn.execute(_PERSONAL_RECORDS)
+        await conn.execute(_EXERCISE_BESTS)
+    await conn.execute(text("DROP TABLE rollup_window"))
+    return result.rowcount
+
+
+async def refresh(engine: AsyncEngine, lag: timedelta, chunk: timedelta) -> dict[str, float]:
+    logs = chunks = 0
+    while True:
+        async with engine.begin() as conn:
+            lower = await _lock_state(conn, LOGS_STATE)
+            target = await conn.scalar(select(func.now())) - lag
+            upper = min(target, lower + chunk)
+            if upper <= lower:
+                break
+            logs += await refresh_log_window(conn, lower, upper)
+            await _advance(conn, LOGS_STATE, upper)
+            chunks += 1
+        if upper >= target:
+            break
+
+    async with engine.begin() as conn:
+        lower = await _lock_state(conn, WORKOUTS_STATE, initial=EPOCH)
+        upper = await conn.scalar(select(func.now())) - lag
+        result = await conn.execute(_WORKOUT_ACTIVITY, {"lower": lower, "lower_day": lower.date()})
+        await _advance(conn, WORKOUTS_STATE, max(lower, upper))
+
+    return {"logs": logs, "chunks": chunks, "workout_days": result.rowcount}
+
+
+async def reset(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        for model in (DailyActivity, DailyMuscleVolume, WeeklyMuscleVolume, ExerciseBest, PersonalRecord):
+            await conn.execute(delete(model))
+        await conn.execute(delete(RollupState).where(RollupState.name.in_([LOGS_STATE, WORKOUTS_STATE])))
+
+
+async def _main(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    if args.rebuild and not args.discard_archived:
+        # Imported here: app.db.archive imports this module.
+        from app.db.archive import archive_horizon
+
+        horizon = archive_horizon(Path(settings.archive_dir))
+        if horizon is not None:
+            print(f"logs before {horizon} are archived and cannot be recomputed; pass --discard-archived")
+            return 1
+    engine = create_async_engine(args.database_url or settings.database_url)
+    try:
+        if args.rebuild:
+            await reset(engine)
+        result = await refresh(
+            engine,
+            lag=timedelta(seconds=settings.analytics_refresh_lag_seconds),
+            chunk=timedelta(hours=args.chunk_hours),
+        )
+        print(f"logs: {result['logs']} in {result['chunks']} chunk(s); workout days: {result['workout_days']}")
+        return 0
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL from settings")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    refresh_parser = commands.add_parser("refresh", help="fold new logs and workouts into the rollups")
+    refresh_parser.add_argument("--chunk-hours", type=float, default=24, help="log window per transaction")
+    refresh_parser.add_argument("--rebuild", action="store_true", help="clear the rollups and recompute everything")
+    refresh_parser.add_argument(
+        "--discard-archived", action="store_true", help="let --rebuild drop rollups of archived months"
+    )
+
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,15 @@
 import uuid
 from datetime import date, datetime
-from typing import Any
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UserBase(BaseModel):
     id: uuid.UUID
     email: str
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ProgramCreate(BaseModel):
@@ -31,8 +30,7 @@ class ProgramResponse(BaseModel):
     program_json: dict[str, Any]
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SwapRequest(BaseModel):
@@ -44,12 +42,30 @@ class SwapRequest(BaseModel):
 class WorkoutUpdateRequest(BaseModel):
     day: str
     changes: list[SwapRequest]
+    preferred_equipment: list[str] | None = None
 
 
 class WorkoutPlan(BaseModel):
     workout_id: uuid.UUID | None = None
     day: str
     exercises: list[dict[str, Any]]
+    version: int | None = None
+
+
+class WorkoutPlanPatch(BaseModel):
+    """RFC 6902 ops taking a client's copy of the plan from ``since_version`` to ``version``."""
+
+    workout_id: uuid.UUID
+    since_version: int
+    version: int
+    patch: list[dict[str, Any]]
+
+
+class WorkoutUpdateResponse(BaseModel):
+    status: str
+    workout_id: uuid.UUID | None = None
+    version: int | None = None
+    patch: list[dict[str, Any]]
 
 
 class WorkoutLogRequest(BaseModel):
@@ -67,6 +83,73 @@ class WorkoutFinishResponse(BaseModel):
     progress: dict[str, str] | None = None
 
 
+class LiveLogMessage(WorkoutLogRequest):
+    """A set logged over the live socket; the workout comes from the socket's path."""
+
+    type: Literal["log"]
+    workout_id: uuid.UUID | None = None
+    rest_seconds: int | None = Field(default=None, ge=1, le=3600)
+
+
+class LivePingMessage(BaseModel):
+    type: Literal["ping"]
+
+
+LiveMessage = Annotated[LiveLogMessage | LivePingMessage, Field(discriminator="type")]
+
+
+class SyncLogMutation(WorkoutLogRequest):
+    """A set logged offline; ``id`` is generated by the client so replays are no-ops."""
+
+    type: Literal["log"]
+    id: uuid.UUID
+    logged_at: datetime
+
+
+class SyncFinishMutation(BaseModel):
+    type: Literal["finish"]
+    workout_id: uuid.UUID
+    finished_at: datetime
+
+
+class SyncPreferencesMutation(BaseModel):
+    type: Literal["preferences"]
+    changes: list[SwapRequest] = []
+    preferred_equipment: list[str] | None = None
+
+
+SyncMutation = Annotated[
+    SyncLogMutation | SyncFinishMutation | SyncPreferencesMutation, Field(discriminator="type")
+]
+
+
+class SyncRequest(BaseModel):
+    cursor: int = Field(default=0, ge=0, description="Last seq the client has applied")
+    mutations: list[SyncMutation] = []
+
+
+class SyncMutationResult(BaseModel):
+    index: int
+    status: Literal["applied", "duplicate", "rejected"]
+    detail: str | None = None
+
+
+class SyncChange(BaseModel):
+    seq: int
+    entity: str
+    id: str
+    op: Literal["upsert", "delete"]
+    data: dict[str, Any] | None = None
+
+
+class SyncResponse(BaseModel):
+    cursor: int
+    has_more: bool
+    reset: bool = False
+    results: list[SyncMutationResult]
+    changes: list[SyncChange]
+
+
 class HistoryEntry(BaseModel):
     date: date
     weight: float
@@ -87,3 +170,49 @@ class ExerciseGuideResponse(BaseModel):
     steps: list[str]
     mistakes: list[str]
     metadata: dict[str, Any] | None = None
+
+
+class ExerciseSearchResult(BaseModel):
+    id: str
+    name: str
+    muscle_groups: list[str]
+    equipment: list[str]
+    score: float
+
+
+class ExerciseSearchResponse(BaseModel):
+    query: str
+    results: list[ExerciseSearchResult]
+
+
+class MuscleVolume(BaseModel):
+    muscle_group: str
+    sets: float
+    volume_kg: float
+
+
+class WeeklyVolume(BaseModel):
+    week_start: date
+    muscles: list[MuscleVolume]
+
+
+class Adherence(BaseModel):
+    planned: int
+    finished: int
+    rate: float | None = None
+
+
+class PersonalRecordEntry(BaseModel):
+    exercise_id: str
+    weight: float
+    previous_best: float | None = None
+    achieved_at: datetime
+
+
+class AnalyticsSummaryResponse(BaseModel):
+    weeks: list[WeeklyVolume]
+    adherence: Adherence
+    current_streak_weeks: int
+    longest_streak_weeks: int
+    personal_records: list[PersonalRecordEntry]
+    as_of: datetime | None = None
@@ -1,15 +1,116 @@
+import time
+import uuid
 from collections.abc import AsyncGenerator
 
+from fastapi import Depends
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
+from app.core.metrics import instrument_engine
+from app.core.security import verify_jwt
+from app.db.utils import resolve_user_id
 
 settings = get_settings()
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
-SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+# Per-worker pool; app.server sizes it so all workers fit DB_CONNECTION_BUDGET.
+POOL_OPTIONS = {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow}
+
+engine = create_async_engine(settings.database_url, echo=False, future=True, **POOL_OPTIONS)
+instrument_engine(engine)
+
+
+class PrimarySession(Session):
+    """Sync session class behind primary-engine sessions, used to track writers."""
+
+
+SessionLocal = async_sessionmaker(
+    engine, expire_on_commit=False, class_=AsyncSession, sync_session_class=PrimarySession
+)
+
+if settings.read_database_url:
+    read_engine = create_async_engine(settings.read_database_url, echo=False, future=True, **POOL_OPTIONS)
+    instrument_engine(read_engine)
+    ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+
+def reset_pools_after_fork() -> None:
+    """Give a forked worker fresh, empty pools.
+
+    With a preloaded app the engines are created in the master; ``close=False``
+    drops the inherited pool without touching connections the parent may own.
+    """
+
+    engine.sync_engine.dispose(close=False)
+    if read_engine is not engine:
+        read_engine.sync_engine.dispose(close=False)
+
+
+# user id -> monotonic time of that user's last committed write on the primary.
+# Per process: a read served by another worker or host right after a write
+# can still hit a lagging replica. Deployments that need read-your-writes
+# across workers should route each user to one worker, or run without a
+# replica.
+_recent_writes: dict[uuid.UUID, float] = {}
+
+
+def mark_user_write(user_id: uuid.UUID) -> None:
+    now = time.monotonic()
+    _recent_writes[user_id] = now
+    if len(_recent_writes) > 10_000:
+        cutoff = now - settings.read_your_writes_seconds
+        for stale in [key for key, written in _recent_writes.items() if written < cutoff]:
+            del _recent_writes[stale]
+
+
+def reads_from_primary(user_id: uuid.UUID) -> bool:
+    """True while a user's recent write may not have reached the replica yet."""
+
+    written = _recent_writes.get(user_id)
+    return written is not None and time.monotonic() - written < settings.read_your_writes_seconds
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _note_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _note_dml(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _remember_writer(session: Session) -> None:
+    # ensure_user records whose request this session serves.
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        mark_user_write(user_id)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_db(
+    token: str = Depends(verify_jwt), db: AsyncSession = Depends(get_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the read replica, or the request's primary session.
+
+    Reads go to the primary without a replica or right after the user wrote.
+    They then share the ``get_db`` session (dependencies are cached per
+    request), so a route using both checks out one connection, not two.
+    Sessions connect lazily, so an unused primary session costs no connection.
+    """
+
+    if read_engine is engine or reads_from_primary(resolve_user_id(token)):
+        yield db
+        return
+    async with ReadSessionLocal() as session:
+        yield session
@@ -17,16 +17,26 @@ def resolve_user_id(token: str) -> uuid.UUID:
     return uuid.uuid5(uuid.NAMESPACE_DNS, token)
 
 
-async def ensure_user(db: AsyncSession, token: str) -> User:
-    """Fetch or create a User record for the provided token."""
+async def ensure_user(db: AsyncSession, token: str, *, commit: bool = True) -> User:
+    """Fetch or create a User record for the provided token.
+
+    With ``commit=False`` a newly created user is only flushed, so it lands in
+    the same transaction as the caller's other writes.
+    """
 
     user_id = resolve_user_id(token)
+    # Lets the session attribute its commits to this user (read-your-writes).
+    db.info["user_id"] = user_id
     user = await db.get(User, user_id)
     if user:
         return user
 
     user = User(id=user_id, email=f"{token[:8]}@example.com")
     db.add(user)
+    if not commit:
+        await db.flush()
+        return user
+
     await db.commit()
     await db.refresh(user)
     return user
@@ -1,22 +1,148 @@
+import asyncio
+import contextlib
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
+from app.api.analytics import router as analytics_router
 from app.api.exercise import router as exercise_router
 from app.api.history import router as history_router
+from app.api.live import router as live_router
 from app.api.program import router as program_router
+from app.api.sync import router as sync_router
 from app.api.workouts import router as workouts_router
+from app.core.compression import CompressionMiddleware, compression_stats
 from app.core.config import get_settings
+from app.core.health import build_health_monitor, pool_status
+from app.core.offload import offload_stats, shutdown_offload_pool
+from app.core.profiling import ProfilingMiddleware, profiler
+from app.core.lifecycle import InFlightMiddleware, lifecycle, warm_pool
+from app.core.metrics import MetricsMiddleware, metrics_registry
+from app.core.rate_limit import rate_limiter
+from app.db.session import SessionLocal, engine, read_engine
+from app.services.exercise_catalog import load_exercise_index
+from app.services.guide_cache import guide_cache, load_guide_cache
+from app.services.log_buffer import log_buffer
+from app.services.program_cache import program_template_cache
+from app.services.program_templates import load_program_library, program_library
+from app.services.strength_standards import (
+    load_strength_standards,
+    reload_periodically,
+    strength_standards,
+)
+from app.services.substitution import rebuild_substitutions
 
 settings = get_settings()
+health_monitor = build_health_monitor(engine, read_engine)
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Each step registers its own cleanup as soon as it has started, so a
+    # failure halfway through start-up still stops what already runs.
+    async with contextlib.AsyncExitStack() as stack:
+        engines = {engine} if read_engine is engine else {engine, read_engine}
+        for pool in engines:
+            stack.push_async_callback(pool.dispose)
+        stack.callback(shutdown_offload_pool)
+        if rate_limiter is not None:
+            stack.push_async_callback(rate_limiter.backend.close)
+
+        # Open pool connections first so preloading reuses them.
+        await asyncio.gather(*(warm_pool(pool, settings.db_warmup_connections) for pool in engines))
+        async with SessionLocal() as db:
+            await load_exercise_index(db)
+            await load_guide_cache(db)
+            await load_strength_standards(db)
+        rebuild_substitutions()
+        # Templates are checked against the catalog, so compile them after it loads.
+        load_program_library()
+
+        standards_reloader = asyncio.create_task(
+            reload_periodically(SessionLocal, settings.strength_standards_reload_seconds)
+        )
+        stack.push_async_callback(_cancel, standards_reloader)
+        if log_buffer is not None:
+            await log_buffer.start()
+            stack.push_async_callback(log_buffer.stop)
+        health_monitor.start()
+        stack.push_async_callback(health_monitor.stop)
+        if profiler is not None:
+            profiler.sampler.start(threading.get_ident())
+            stack.callback(profiler.sampler.stop)
+
+        stack.enter_context(lifecycle.drain_on_sigterm(settings.shutdown_delay_seconds))
+        lifecycle.ready = True
+        yield
+        lifecycle.start_draining()
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, default_response_class=ORJSONResponse, lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+if profiler is not None:
+    app.add_middleware(ProfilingMiddleware, slow_profiler=profiler)
+    metrics_registry.register_source("gymbuddy_profiler", profiler.stats)
+if settings.compression_enabled:
+    # Added after MetricsMiddleware so it wraps it and latency excludes compression.
+    app.add_middleware(CompressionMiddleware)
+    metrics_registry.register_source("gymbuddy_compression", compression_stats.stats)
+# Outermost, so a request counts as in flight until its last byte is sent.
+app.add_middleware(InFlightMiddleware)
+
+metrics_registry.register_source("gymbuddy_lifecycle", lifecycle.stats)
+metrics_registry.register_source("gymbuddy_health", health_monitor.stats)
+metrics_registry.register_source("gymbuddy_offload", offload_stats.stats)
+metrics_registry.register_source("gymbuddy_guide_cache", guide_cache.stats)
+metrics_registry.register_source("gymbuddy_program_template_cache", program_template_cache.stats)
+metrics_registry.register_source("gymbuddy_program_templates", lambda: program_library().stats())
+metrics_registry.register_source("gymbuddy_strength_standards", strength_standards.stats)
+if log_buffer is not None:
+    metrics_registry.register_source("gymbuddy_log_buffer", log_buffer.stats)
+if rate_limiter is not None:
+    metrics_registry.register_source("gymbuddy_rate_limit", rate_limiter.stats)
 
 
 @app.get("/health")
-async def health() -> dict[str, str]:
-    return {"status": "ok"}
+async def health() -> ORJSONResponse:
+    """Cached probe results; 503 when the primary database is unreachable."""
+
+    snapshot = health_monitor.snapshot()
+    return ORJSONResponse(snapshot, status_code=503 if snapshot["status"] == "down" else 200)
+
+
+@app.get("/health/pool")
+async def health_pool() -> dict:
+    return {name: pool_status(pool) for name, pool in health_monitor.engines.items()}
+
+
+@app.get("/ready")
+async def ready() -> ORJSONResponse:
+    """Readiness for load balancers: 503 while starting up or draining."""
+
+    if not lifecycle.ready:
+        status = "draining" if lifecycle.draining else "starting"
+        return ORJSONResponse({"status": status}, status_code=503)
+    return ORJSONResponse({"status": "ready"})
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> str:
+    return metrics_registry.render()
 
 
 app.include_router(program_router)
 app.include_router(workouts_router)
+app.include_router(live_router)
+app.include_router(sync_router)
 app.include_router(exercise_router)
 app.include_router(history_router)
+app.include_router(analytics_router)
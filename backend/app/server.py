@@ -0,0 +1,133 @@
+"""Production entry point: gunicorn managing uvicorn workers.
+
+    cd backend && python -m app.server --bind 0.0.0.0:8000
+
+Workers default to one per CPU (``WEB_CONCURRENCY`` overrides): every route
+is async, so one event loop per core saturates the machine. uvloop and
+httptools are used when installed. ``DB_CONNECTION_BUDGET`` is split across
+workers. Each worker's ``pool_size + max_overflow`` is at most
+``budget // workers``, so a full fleet never exceeds Postgres'
+``max_connections``.
+
+The app is preloaded in the master so workers fork with the catalog modules
+already imported. Engines built during that import get fresh pools in each
+worker (``post_fork``). Connections, caches and background tasks start in
+the per-worker lifespan. Without gunicorn (e.g. on Windows) this falls back
+to ``uvicorn --workers``, which cannot preload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import logging
+import math
+import os
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+APP = "app.main:app"
+
+
+def worker_count(requested: int = 0) -> int:
+    return requested if requested > 0 else max(os.cpu_count() or 1, 1)
+
+
+def pool_sizes(budget: int, workers: int) -> tuple[int, int]:
+    """``(pool_size, max_overflow)`` per worker so ``workers`` pools fit in ``budget``.
+
+    Three quarters of a worker's share stay open; the rest is burst overflow.
+    """
+
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(f"DB_CONNECTION_BUDGET={budget} cannot give {workers} workers a connection each")
+    pool_size = max((per_worker * 3) // 4, 1)
+    return pool_size, per_worker - pool_size
+
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def _post_fork(server, worker) -> None:
+    from app.db.session import reset_pools_after_fork
+
+    reset_pools_after_fork()
+
+
+def run_gunicorn(bind: str, workers: int, graceful_timeout: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self) -> None:
+            self.cfg.set("bind", bind)
+            self.cfg.set("workers", workers)
+            # UvicornWorker picks uvloop/httptools itself when they are installed.
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("post_fork", _post_fork)
+            # Leave the worker time to report draining and finish requests before it is killed.
+            self.cfg.set("graceful_timeout", graceful_timeout)
+            self.cfg.set("keepalive", 5)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    Server().run()
+
+
+def run_uvicorn(bind: str, workers: int, graceful_timeout: int) -> None:
+    import uvicorn
+
+    host, _, port = bind.rpartition(":")
+    uvicorn.run(
+        APP,
+        host=host or "127.0.0.1",
+        port=int(port),
+        workers=workers,
+        loop=event_loop(),
+        http=http_protocol(),
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default="127.0.0.1:8000")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to WEB_CONCURRENCY, then CPU count")
+    parser.add_argument("--budget", type=int, default=None, help="defaults to DB_CONNECTION_BUDGET")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    settings = get_settings()
+    workers = worker_count(args.workers if args.workers is not None else settings.web_concurrency)
+    pool_size, max_overflow = pool_sizes(args.budget or settings.db_connection_budget, workers)
+    # Read by app.db.session when the app is imported (in the master with
+    # gunicorn, in each worker with uvicorn).
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    # Workers keep serving for SHUTDOWN_DELAY_SECONDS after SIGTERM (see
+    # app.core.lifecycle), then get SHUTDOWN_DRAIN_SECONDS for in-flight requests.
+    graceful_timeout = math.ceil(settings.shutdown_delay_seconds + settings.shutdown_drain_seconds) + 5
+
+    logger.info(
+        "Starting %d workers on %s (%s, %s), pool %d+%d per worker",
+        workers, args.bind, event_loop(), http_protocol(), pool_size, max_overflow,
+    )
+    if importlib.util.find_spec("gunicorn"):
+        run_gunicorn(args.bind, workers, graceful_timeout)
+    else:
+        run_uvicorn(args.bind, workers, graceful_timeout)
+
+
+if __name__ == "__main__":
+    main()
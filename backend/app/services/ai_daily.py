@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
+from app.core.offload import run_cpu_bound
 from app.db.models import WorkoutLog
 from app.services.progression import apply_progression_to_plan
 
@@ -25,8 +26,8 @@ async def generate_daily_plan(
         if preferences and exercise_id in preferences:
             exercise["id"] = preferences[exercise_id]
 
-    progressed_plan = apply_progression_to_plan(
-        {"day": day_plan.get("day", "Day 1"), "exercises": exercises}, history
+    progressed_plan = await run_cpu_bound(
+        len(history), apply_progression_to_plan, {"day": day_plan.get("day", "Day 1"), "exercises": exercises}, history
     )
 
     return progressed_plan
@@ -4,9 +4,19 @@ from datetime import datetime
 from typing import Any
 
 from app.db.schemas import ProgramCreate
+from app.services.program_templates import program_library, starting_weight
 
 
 async def generate_program(payload: ProgramCreate) -> dict[str, Any]:
+    """Fill a split template; only requests no template covers reach the model."""
+
+    program = program_library().generate(payload)
+    if program is not None:
+        return program
+    return await generate_program_with_model(payload)
+
+
+async def generate_program_with_model(payload: ProgramCreate) -> dict[str, Any]:
     """Placeholder program generation using prompt spec.
 
     Replace with a call to OpenAI once keys are configured. Keeping the
@@ -20,7 +30,7 @@ async def generate_program(payload: ProgramCreate) -> dict[str, Any]:
             {
                 "day": "Push",
                 "exercises": [
-                    {"id": "bench_press", "sets": 3, "reps": "8-10", "target_weight": payload.lifts.get("bench", 60) if payload.lifts else 60},
+                    {"id": "bench_press", "sets": 3, "reps": "8-10", "target_weight": starting_weight(payload, "bench_press", 60)},
                     {"id": "overhead_press", "sets": 3, "reps": "8-10", "target_weight": 40},
                 ],
             },
@@ -34,7 +44,7 @@ async def generate_program(payload: ProgramCreate) -> dict[str, Any]:
             {
                 "day": "Legs",
                 "exercises": [
-                    {"id": "back_squat", "sets": 3, "reps": "8-10", "target_weight": payload.lifts.get("squat", 70) if payload.lifts else 70},
+                    {"id": "back_squat", "sets": 3, "reps": "8-10", "target_weight": starting_weight(payload, "back_squat", 70)},
                     {"id": "romanian_deadlift", "sets": 3, "reps": "10-12", "target_weight": 60},
                 ],
             },
@@ -45,14 +55,14 @@ async def generate_program(payload: ProgramCreate) -> dict[str, Any]:
             {
                 "day": "Upper",
                 "exercises": [
-                    {"id": "bench_press", "sets": 3, "reps": "8-10", "target_weight": payload.lifts.get("bench", 60) if payload.lifts else 60},
+                    {"id": "bench_press", "sets": 3, "reps": "8-10", "target_weight": starting_weight(payload, "bench_press", 60)},
                     {"id": "barbell_row", "sets": 3, "reps": "8-10", "target_weight": 50},
                 ],
             },
             {
                 "day": "Lower",
                 "exercises": [
-                    {"id": "back_squat", "sets": 3, "reps": "8-10", "target_weight": payload.lifts.get("squat", 80) if payload.lifts else 80},
+                    {"id": "back_squat", "sets": 3, "reps": "8-10", "target_weight": starting_weight(payload, "back_squat", 80)},
                     {"id": "romanian_deadlift", "sets": 3, "reps": "10-12", "target_weight": 70},
                 ],
             },
@@ -63,9 +73,9 @@ async def generate_program(payload: ProgramCreate) -> dict[str, Any]:
             {
                 "day": "Full Body",
                 "exercises": [
-                    {"id": "goblet_squat", "sets": 3, "reps": "12", "target_weight": payload.lifts.get("goblet_squat", 24) if payload.lifts else 24},
-                    {"id": "dumbbell_press", "sets": 3, "reps": "10", "target_weight": payload.lifts.get("dumbbell_press", 20) if payload.lifts else 20},
-                    {"id": "dumbbell_row", "sets": 3, "reps": "10", "target_weight": payload.lifts.get("dumbbell_row", 24) if payload.lifts else 24},
+                    {"id": "goblet_squat", "sets": 3, "reps": "12", "target_weight": starting_weight(payload, "goblet_squat", 24)},
+                    {"id": "dumbbell_press", "sets": 3, "reps": "10", "target_weight": starting_weight(payload, "dumbbell_press", 20)},
+                    {"id": "dumbbell_row", "sets": 3, "reps": "10", "target_weight": starting_weight(payload, "dumbbell_row", 24)},
                 ],
             }
         ]
@@ -0,0 +1,112 @@
+"""Training dashboard built purely from the rollup tables (see app/db/rollups.py)."""
+
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import DailyActivity, PersonalRecord, RollupState, WeeklyMuscleVolume
+from app.db.rollups import LOGS_STATE
+
+STREAK_LOOKBACK_DAYS = 364
+MAX_PERSONAL_RECORDS = 20
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def streaks(active_weeks: set[date], this_week: date) -> tuple[int, int]:
+    """Current and longest runs of consecutive active weeks.
+
+    The week in progress only extends the current streak; an empty one does
+    not break it yet.
+    """
+
+    week = this_week if this_week in active_weeks else this_week - timedelta(weeks=1)
+    current = 0
+    while week in active_weeks:
+        current += 1
+        week -= timedelta(weeks=1)
+
+    longest = run = 0
+    previous = None
+    for week in sorted(active_weeks):
+        run = run + 1 if previous == week - timedelta(weeks=1) else 1
+        longest = max(longest, run)
+        previous = week
+    return current, longest
+
+
+async def training_summary(
+    db: AsyncSession, user_id: uuid.UUID, weeks: int, today: date | None = None
+) -> dict[str, Any]:
+    today = today or date.today()
+    this_week = week_start(today)
+    first_week = this_week - timedelta(weeks=weeks - 1)
+
+    volume_rows = await db.execute(
+        select(
+            WeeklyMuscleVolume.week_start,
+            WeeklyMuscleVolume.muscle_group,
+            WeeklyMuscleVolume.sets,
+            WeeklyMuscleVolume.volume_kg,
+        )
+        .where(WeeklyMuscleVolume.user_id == user_id, WeeklyMuscleVolume.week_start >= first_week)
+        .order_by(WeeklyMuscleVolume.week_start, WeeklyMuscleVolume.muscle_group)
+    )
+    by_week: dict[date, list[dict[str, Any]]] = defaultdict(list)
+    for start, muscle, sets, volume in volume_rows.all():
+        by_week[start].append({"muscle_group": muscle, "sets": round(sets, 1), "volume_kg": round(volume, 1)})
+
+    activity_rows = await db.execute(
+        select(DailyActivity.day, DailyActivity.planned, DailyActivity.finished, DailyActivity.logs).where(
+            DailyActivity.user_id == user_id,
+            DailyActivity.day >= today - timedelta(days=STREAK_LOOKBACK_DAYS),
+            or_(DailyActivity.logs > 0, DailyActivity.planned > 0),
+        )
+    )
+    planned = finished = 0
+    active_weeks = set()
+    for day, day_planned, day_finished, logs in activity_rows.all():
+        if logs or day_finished:
+            active_weeks.add(week_start(day))
+        if day >= first_week:
+            planned += day_planned
+            finished += day_finished
+    current_streak, longest_streak = streaks(active_weeks, this_week)
+
+    record_rows = await db.execute(
+        select(
+            PersonalRecord.exercise_id,
+            PersonalRecord.weight,
+            PersonalRecord.previous_best,
+            PersonalRecord.achieved_at,
+        )
+        .where(PersonalRecord.user_id == user_id)
+        .order_by(PersonalRecord.achieved_at.desc())
+        .limit(MAX_PERSONAL_RECORDS)
+    )
+    as_of = await db.scalar(select(RollupState.high_water).where(RollupState.name == LOGS_STATE))
+
+    week_starts = [first_week + timedelta(weeks=offset) for offset in range(weeks)]
+    return {
+        "weeks": [{"week_start": start, "muscles": by_week.get(start, [])} for start in week_starts],
+        "adherence": {
+            "planned": planned,
+            "finished": finished,
+            "rate": round(finished / planned, 3) if planned else None,
+        },
+        "current_streak_weeks": current_streak,
+        "longest_streak_weeks": longest_streak,
+        "personal_records": [
+            {"exercise_id": exercise_id, "weight": weight, "previous_best": previous, "achieved_at": achieved_at}
+            for exercise_id, weight, previous, achieved_at in record_rows.all()
+        ],
+        "as_of": as_of,
+    }
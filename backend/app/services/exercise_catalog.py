@@ -0,0 +1,124 @@
+"""In-memory index over the ``exercises`` catalog.
+
+Loaded once at start-up. Exact lookups go through a dict of normalized ids,
+names and aliases; fuzzy search combines prefix matches with pg_trgm-style
+trigram similarity so "benh pres" still finds Bench Press.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Exercise
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name: str) -> str:
+    """``"Bench-Press "`` / ``"bench press"`` / ``"bench_press"`` -> ``"bench_press"``."""
+
+    return _NON_WORD.sub("_", name.lower()).strip("_")
+
+
+def trigrams(key: str) -> set[str]:
+    grams: set[str] = set()
+    for word in key.split("_"):
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[index : index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: str
+    name: str
+    aliases: tuple[str, ...]
+    muscle_groups: tuple[str, ...]
+    equipment: tuple[str, ...]
+
+
+class ExerciseIndex:
+    def __init__(self, entries: list[CatalogEntry] | None = None) -> None:
+        self.rebuild(entries or [])
+
+    def rebuild(self, entries: list[CatalogEntry]) -> None:
+        self.entries: dict[str, CatalogEntry] = {entry.id: entry for entry in entries}
+        self._exact: dict[str, str] = {}
+        self._key_trigrams: dict[str, set[str]] = {}
+        self._by_trigram: dict[str, set[str]] = {}
+        for entry in entries:
+            for key in {normalize(entry.id), normalize(entry.name), *(normalize(alias) for alias in entry.aliases)}:
+                self._exact.setdefault(key, entry.id)
+                grams = trigrams(key)
+                self._key_trigrams[key] = grams
+                for gram in grams:
+                    self._by_trigram.setdefault(gram, set()).add(key)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, name: str) -> CatalogEntry | None:
+        entry_id = self._exact.get(normalize(name))
+        return self.entries[entry_id] if entry_id else None
+
+    def canonical_id(self, name: str) -> str:
+        """Catalog id for a known exercise, otherwise the normalized input."""
+
+        key = normalize(name)
+        return self._exact.get(key, key)
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[CatalogEntry, float]]:
+        key = normalize(query)
+        if not key:
+            return []
+
+        scores: dict[str, float] = {}
+        exact = self._exact.get(key)
+        if exact:
+            scores[exact] = 1.0
+
+        query_grams = trigrams(key)
+        candidates: set[str] = set()
+        for gram in query_grams:
+            candidates.update(self._by_trigram.get(gram, ()))
+        for candidate in candidates:
+            grams = self._key_trigrams[candidate]
+            score = len(query_grams & grams) / len(query_grams | grams)
+            if candidate.startswith(key):
+                score = max(score, 0.9)
+            entry_id = self._exact[candidate]
+            scores[entry_id] = max(scores.get(entry_id, 0.0), score)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.entries[entry_id], round(score, 3)) for entry_id, score in ranked[:limit] if score >= 0.2]
+
+
+exercise_index = ExerciseIndex()
+
+
+async def load_exercise_index(db: AsyncSession) -> int:
+    """Replace the in-memory index with the current contents of ``exercises``."""
+
+    result = await db.execute(select(Exercise))
+    exercise_index.rebuild(
+        [
+            CatalogEntry(
+                id=row.id,
+                name=row.name,
+                aliases=tuple(row.aliases or ()),
+                muscle_groups=tuple(row.muscle_groups or ()),
+                equipment=tuple(row.equipment or ()),
+            )
+            for row in result.scalars()
+        ]
+    )
+    logger.info("Loaded %d exercises into the catalog index", len(exercise_index))
+    return len(exercise_index)
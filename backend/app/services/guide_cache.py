@@ -0,0 +1,69 @@
+"""In-process copy of ``exercise_guides_cache``.
+
+Preloaded at start-up so guide lookups for known exercises skip the database.
+The table stays the source of truth: a miss here still checks it (another
+worker may have generated the guide) before generating a new one.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models import ExerciseGuideCache
+
+logger = logging.getLogger(__name__)
+
+
+class GuideCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._guides: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._guides)
+
+    def get(self, exercise_name: str) -> dict[str, Any] | None:
+        guide = self._guides.get(exercise_name)
+        if guide is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return guide
+
+    def remember(self, exercise_name: str, guide: dict[str, Any]) -> None:
+        # Names are canonicalized against the catalog, so the key space is
+        # mostly bounded; the cap only guards against a flood of unknown names.
+        if exercise_name in self._guides or len(self._guides) < self.max_size:
+            self._guides[exercise_name] = guide
+
+    def replace(self, guides: dict[str, dict[str, Any]]) -> None:
+        """Swap in ``guides`` wholesale, keeping at most ``max_size`` of them (in the given order)."""
+
+        self._guides = dict(itertools.islice(guides.items(), self.max_size))
+
+    def stats(self) -> dict[str, float]:
+        return {"size": len(self._guides), "hits": self.hits, "misses": self.misses}
+
+
+guide_cache = GuideCache(get_settings().guide_cache_size)
+
+
+async def load_guide_cache(db: AsyncSession) -> int:
+    """Replace the in-memory guides with the most recently updated rows of the table."""
+
+    result = await db.execute(
+        select(ExerciseGuideCache.exercise_name, ExerciseGuideCache.guide_json)
+        .order_by(ExerciseGuideCache.updated_at.desc())
+        .limit(guide_cache.max_size)
+    )
+    guide_cache.replace(dict(result.all()))
+    logger.info("Preloaded %d exercise guides", len(guide_cache))
+    return len(guide_cache)
@@ -0,0 +1,354 @@
+"""Opt-in write-behind buffer for ``POST /api/workout/log``.
+
+Guarantees, with ``log_write_behind`` enabled:
+
+- Durability: a log is acknowledged only after its record has been appended to
+  a local WAL segment (and fsynced unless ``log_wal_fsync`` is off). Segments
+  are deleted only after their records are committed to ``workout_logs`` and
+  are replayed on start-up, so an acknowledged log survives a process crash
+  (not the loss of the local disk).
+- Ordering: a user's records are inserted in acknowledgement order within a
+  process. ``logged_at`` is stamped at acknowledgement, so anything sorting
+  by ``logged_at`` sees the same order as in direct mode.
+- Idempotency: log ids are assigned at acknowledgement and inserted with
+  ``ON CONFLICT DO NOTHING``, so replaying a segment that was partly flushed
+  before a crash does not duplicate rows.
+- Visibility: a log becomes visible to history, progression and finish up to
+  ``log_flush_interval_ms`` after it is acknowledged.
+
+Concurrent appends share one WAL write + fsync (group commit), and the flusher
+inserts up to ``log_flush_size`` rows per statement.
+
+A failed flush is retried with exponential backoff. After
+``log_flush_max_attempts`` failures in a row the batch's segments move to
+``<log_wal_dir>/dead-letter`` and an error is logged; moving them back into
+``log_wal_dir`` replays them on the next start.
+
+Each worker process locks its own ``slot-N`` subdirectory of ``log_wal_dir``,
+so workers never replay or delete each other's live segments. A replacement
+for a crashed worker takes over its slot and replays what it left behind.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import itertools
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import orjson
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.db.models import Workout, WorkoutLog
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_UUID_FIELDS = ("id", "user_id", "workout_id")
+_MAX_RETRY_DELAY = 30.0
+
+
+def _encode(record: dict[str, Any]) -> bytes:
+    return orjson.dumps(record) + b"\n"
+
+
+def _decode(line: bytes) -> dict[str, Any]:
+    record = orjson.loads(line)
+    for name in _UUID_FIELDS:
+        record[name] = uuid.UUID(record[name])
+    record["logged_at"] = datetime.fromisoformat(record["logged_at"])
+    return record
+
+
+def _write(handle, data: bytes, fsync: bool) -> None:
+    handle.write(data)
+    handle.flush()
+    if fsync:
+        os.fsync(handle.fileno())
+
+
+class LogWriteBuffer:
+    def __init__(
+        self,
+        wal_dir: str | Path,
+        flush_size: int,
+        flush_interval: float,
+        fsync: bool = True,
+        max_attempts: int = 10,
+        session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+    ) -> None:
+        self.wal_dir = Path(wal_dir)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_attempts = max_attempts
+        self.session_factory = session_factory
+
+        self._pending: list[dict[str, Any]] = []
+        self._sealed: list[Path] = []
+        self._queue: list[tuple[bytes, dict[str, Any], asyncio.Future]] = []
+        self._segment_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._flush_needed = asyncio.Event()
+        self._writer: asyncio.Task | None = None
+        self._flusher: asyncio.Task | None = None
+        self._segment = None
+        self._segment_index = 0
+        self._slot_dir = self.wal_dir
+        self._slot_lock = None
+        self._failed_attempts = 0
+
+        self.acknowledged = 0
+        self.flushed = 0
+        self.commits = 0
+        self.flush_failures = 0
+        self.dead_lettered = 0
+
+    # -- WAL segments -----------------------------------------------------
+
+    def _open_segment(self) -> None:
+        self._segment_index += 1
+        name = f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{self._segment_index:06d}.wal"
+        self._segment_path = self._slot_dir / name
+        self._segment = open(self._segment_path, "ab")
+
+    def _truncate_segment(self, size: int) -> None:
+        """Cut the open segment back to ``size`` bytes after a failed append."""
+
+        with contextlib.suppress(OSError):
+            # Closing discards whatever the failed write left buffered.
+            self._segment.close()
+        try:
+            os.truncate(self._segment_path, size)
+        except OSError:
+            logger.exception("Could not truncate %s; unacknowledged logs may be replayed", self._segment_path)
+        self._segment = open(self._segment_path, "ab")
+
+    def _seal_segment(self) -> None:
+        self._segment.close()
+        self._sealed.append(self._segment_path)
+        self._open_segment()
+
+    def _claim_slot(self) -> int:
+        """Lock the first free ``slot-N`` directory; the lock dies with the process."""
+
+        self.wal_dir.mkdir(parents=True, exist_ok=True)
+        for index in itertools.count():
+            handle = open(self.wal_dir / f"slot-{index}.lock", "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            self._slot_lock = handle
+            self._slot_dir = self.wal_dir / f"slot-{index}"
+            self._slot_dir.mkdir(exist_ok=True)
+            return index
+
+    async def start(self) -> None:
+        """Replay leftover segments, then start accepting and flushing logs."""
+
+        slot = self._claim_slot()
+        segments = sorted(self._slot_dir.glob("*.wal"))
+        if slot == 0:
+            # Segments written before WAL slots existed.
+            segments = sorted(self.wal_dir.glob("*.wal")) + segments
+        for path in segments:
+            with open(path, "rb") as handle:
+                # A torn final line means the append was never acknowledged.
+                for line in handle:
+                    if line.endswith(b"\n"):
+                        self._pending.append(_decode(line))
+            self._sealed.append(path)
+        if self._pending:
+            logger.info("Replaying %d buffered workout logs from %s", len(self._pending), self._slot_dir)
+
+        self._open_segment()
+        self._flusher = asyncio.create_task(self._flush_loop())
+        if self._pending:
+            self._flush_needed.set()
+
+    async def stop(self) -> None:
+        """Flush what is buffered; whatever fails to flush stays in sealed segments for replay."""
+
+        try:
+            if self._writer is not None:
+                await self._writer
+            if self._flusher is not None:
+                self._flusher.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._flusher
+            await self.flush()
+        finally:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+                # Buffered records live in sealed segments; an empty open one holds nothing.
+                if self._segment_path.stat().st_size == 0:
+                    self._segment_path.unlink()
+            if self._slot_lock is not None:
+                self._slot_lock.close()
+                self._slot_lock = None
+
+    # -- acknowledgement --------------------------------------------------
+
+    async def append(self, record: dict[str, Any]) -> None:
+        """Return once ``record`` is durable in the WAL."""
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((_encode(record), record, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_queued())
+        await future
+
+    async def _write_queued(self) -> None:
+        while self._queue:
+            batch, self._queue = self._queue, []
+            try:
+                async with self._segment_lock:
+                    size = self._segment.tell()
+                    try:
+                        await asyncio.to_thread(
+                            _write, self._segment, b"".join(line for line, _, _ in batch), self.fsync
+                        )
+                    except Exception:
+                        # Whatever part of the batch reached the file was never
+                        # acknowledged, so a replay must not insert it.
+                        await asyncio.to_thread(self._truncate_segment, size)
+                        raise
+                    self._pending.extend(record for _, record, _ in batch)
+            except Exception as exc:  # surface the failure to every waiting request
+                for _, _, future in batch:
+                    # A waiter cancelled meanwhile (client gone) has a done future.
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            # The records are durable whether or not their waiter is still there.
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+            self.acknowledged += len(batch)
+            if len(self._pending) >= self.flush_size:
+                self._flush_needed.set()
+
+    # -- flushing ---------------------------------------------------------
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing buffered workout logs failed")
+                # Back off while the same batch keeps failing.
+                if self._failed_attempts:
+                    await asyncio.sleep(min(self.flush_interval * 2**self._failed_attempts, _MAX_RETRY_DELAY))
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            async with self._segment_lock:
+                if not self._pending:
+                    return 0
+                records, self._pending = self._pending, []
+                self._seal_segment()
+                sealed, self._sealed = self._sealed, []
+
+            try:
+                for offset in range(0, len(records), self.flush_size):
+                    await self._insert(records[offset : offset + self.flush_size])
+            except Exception:
+                self.flush_failures += 1
+                self._failed_attempts += 1
+                if self._failed_attempts >= self.max_attempts:
+                    self._failed_attempts = 0
+                    self._dead_letter(sealed, len(records))
+                else:
+                    async with self._segment_lock:
+                        self._pending[:0] = records
+                        self._sealed[:0] = sealed
+                raise
+
+            self._failed_attempts = 0
+            for path in sealed:
+                path.unlink(missing_ok=True)
+            self.flushed += len(records)
+            return len(records)
+
+    def _dead_letter(self, segments: list[Path], count: int) -> None:
+        """Set aside segments whose records keep failing to insert."""
+
+        dead_dir = self.wal_dir / "dead-letter"
+        dead_dir.mkdir(exist_ok=True)
+        for path in segments:
+            if path.stat().st_size:
+                path.rename(dead_dir / f"{self._slot_dir.name}-{path.name}")
+            else:
+                path.unlink()
+        self.dead_lettered += count
+        logger.error(
+            "Gave up on %d buffered workout logs after %d failed flushes; segments moved to %s",
+            count,
+            self.max_attempts,
+            dead_dir,
+        )
+
+    async def _insert(self, records: list[dict[str, Any]]) -> None:
+        # The change-feed triggers lock each user at commit in row order;
+        # sorting (stably, keeping each user's order) means concurrent
+        # flushes from other workers lock shared users in the same order.
+        records = sorted(records, key=lambda record: record["user_id"])
+        started: dict[uuid.UUID, datetime] = {}
+        for record in records:
+            started.setdefault(record["workout_id"], record["logged_at"])
+
+        workouts = Workout.__table__
+        async with self.session_factory() as session:
+            await session.execute(insert(WorkoutLog.__table__).on_conflict_do_nothing(), records)
+            await session.execute(
+                workouts.update()
+                .where(workouts.c.id == bindparam("workout"), workouts.c.started_at.is_(None))
+                .values(started_at=bindparam("started")),
+                [{"workout": workout_id, "started": at} for workout_id, at in started.items()],
+            )
+            await session.commit()
+        self.commits += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "acknowledged": self.acknowledged,
+            "flushed": self.flushed,
+            "commits": self.commits,
+            "pending": len(self._pending),
+            "flush_failures": self.flush_failures,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+def _build_buffer() -> LogWriteBuffer | None:
+    settings = get_settings()
+    if not settings.log_write_behind:
+        return None
+    return LogWriteBuffer(
+        settings.log_wal_dir,
+        flush_size=settings.log_flush_size,
+        flush_interval=settings.log_flush_interval_ms / 1000,
+        fsync=settings.log_wal_fsync,
+        max_attempts=settings.log_flush_max_attempts,
+    )
+
+
+log_buffer = _build_buffer()
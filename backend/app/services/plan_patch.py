@@ -0,0 +1,59 @@
+"""Versioned JSON Patch (RFC 6902) diffs of a workout's ``plan_json``.
+
+Every change to a persisted plan bumps ``Workout.plan_version`` and appends
+``{"version": new_version, "ops": [...]}`` to ``Workout.plan_patches``; the
+last ``PATCH_HISTORY`` entries are kept. A client holding version ``n``
+catches up by applying the ops of every entry after ``n`` in order.
+
+Diffs are positional: exercises are compared index by index and field by
+field, which is exact for swaps (they never reorder the list) and stays
+valid, if less compact, for anything else.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+PATCH_HISTORY = 20
+
+
+def _pointer(*parts: str | int) -> str:
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in parts)
+
+
+def diff_exercises(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    ops: list[dict[str, Any]] = []
+    for index, (before, after) in enumerate(zip(old, new)):
+        for key in before.keys() - after.keys():
+            ops.append({"op": "remove", "path": _pointer("exercises", index, key)})
+        for key, value in after.items():
+            if key not in before:
+                ops.append({"op": "add", "path": _pointer("exercises", index, key), "value": value})
+            elif before[key] != value:
+                ops.append({"op": "replace", "path": _pointer("exercises", index, key), "value": value})
+    for index in range(len(old) - 1, len(new) - 1, -1):
+        ops.append({"op": "remove", "path": _pointer("exercises", index)})
+    for exercise in new[len(old) :]:
+        ops.append({"op": "add", "path": _pointer("exercises", "-"), "value": exercise})
+    return ops
+
+
+def record_patch(
+    version: int, history: list[dict[str, Any]], ops: list[dict[str, Any]]
+) -> tuple[int, list[dict[str, Any]]]:
+    """New ``(version, history)`` after ``ops``; unchanged when there are no ops."""
+
+    if not ops:
+        return version, history
+    version += 1
+    return version, [*history, {"version": version, "ops": ops}][-PATCH_HISTORY:]
+
+
+def ops_since(version: int, since: int, history: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
+    """Ops taking a client from ``since`` to ``version``, or ``None`` if they were not kept."""
+
+    if since == version:
+        return []
+    if since > version or not history or history[0]["version"] > since + 1:
+        return None
+    return [op for entry in history if entry["version"] > since for op in entry["ops"]]
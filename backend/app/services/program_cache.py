@@ -0,0 +1,151 @@
+"""Content-addressed cache for generated program templates."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models import ProgramTemplate
+from app.db.schemas import ProgramCreate
+from app.services.ai_program import generate_program
+from app.services.exercise_catalog import normalize
+from app.services.program_templates import EXPERIENCE_LEVELS, LIFT_SOURCES, program_library
+from app.services.strength_standards import strength_standards
+from app.services.substitution import normalize_equipment
+
+# Bump when the generation code changes what it builds from the same inputs;
+# edits to program_templates.json change the library version on their own.
+# Rows stored under an older version are never read again.
+GENERATOR_VERSION = 2
+
+
+def normalize_payload(payload: ProgramCreate) -> dict[str, Any]:
+    """Reduce a program request to the inputs program generation depends on.
+
+    Lifts are left out: ``apply_user_weights`` overwrites every exercise a
+    lift seeds, so they cannot change what the user receives.
+    """
+
+    library = program_library()
+    goal = normalize(payload.goal)
+    equipment = normalize_equipment(payload.equipment)
+    return {
+        "version": f"{GENERATOR_VERSION}:{library.version}",
+        "goal": library.goals.get(goal, goal),
+        "experience": EXPERIENCE_LEVELS.get(normalize(payload.experience), 1),
+        "equipment": sorted(equipment) if equipment is not None else None,
+        "days": payload.training_days_per_week or 3,
+    }
+
+
+def template_key(normalized: dict[str, Any]) -> str:
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def apply_user_weights(template: dict[str, Any], payload: ProgramCreate) -> dict[str, Any]:
+    """Copy a shared template and restore the user's exact lift numbers.
+
+    Lifts the user did not submit are seeded from their own cohort's strength
+    standard, since the template was generated without a cohort.
+    """
+
+    program = copy.deepcopy(template)
+    lifts = payload.lifts or {}
+    for day in program.get("days", []):
+        for exercise in day.get("exercises", []):
+            exercise_id = exercise.get("id")
+            if exercise_id not in LIFT_SOURCES:
+                continue
+            for lift_name in LIFT_SOURCES[exercise_id]:
+                if lifts.get(lift_name) is not None:
+                    exercise["target_weight"] = lifts[lift_name]
+                    break
+            else:
+                seeded = strength_standards.starting_weight(exercise_id, payload)
+                if seeded is not None:
+                    exercise["target_weight"] = seeded
+    program["generated_at"] = datetime.utcnow().isoformat()
+    return program
+
+
+class ProgramTemplateCache:
+    """LRU of program templates keyed by normalized request, backed by Postgres.
+
+    Lookups try memory first, then the ``program_templates`` table, and only
+    generate a new template on a miss in both.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, template: dict[str, Any]) -> None:
+        self._entries[key] = template
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_generate(self, db: AsyncSession, payload: ProgramCreate) -> dict[str, Any]:
+        normalized = normalize_payload(payload)
+        key = template_key(normalized)
+
+        template = self._entries.get(key)
+        if template is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return apply_user_weights(template, payload)
+
+        stored = await db.get(ProgramTemplate, key)
+        if stored is not None:
+            self.db_hits += 1
+            self._remember(key, stored.template_json)
+            return apply_user_weights(stored.template_json, payload)
+
+        self.misses += 1
+        # Lifts and cohort fields are not part of the key; leave them out so
+        # the shared template only carries pooled defaults.
+        template_payload = payload.model_copy(
+            update={
+                "lifts": None,
+                "training_days_per_week": normalized["days"],
+                "gender": None,
+                "age": None,
+                "weight_kg": None,
+            }
+        )
+        template = await generate_program(template_payload)
+        # Flushed with the caller's transaction; concurrent misses on the same
+        # key simply keep the first template.
+        await db.execute(
+            insert(ProgramTemplate)
+            .values(cache_key=key, template_json=template, created_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=[ProgramTemplate.cache_key])
+        )
+        self._remember(key, template)
+        return apply_user_weights(template, payload)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        hits = self.memory_hits + self.db_hits
+        return {
+            "size": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+
+program_template_cache = ProgramTemplateCache(get_settings().program_template_cache_size)
@@ -0,0 +1,248 @@
+"""Rule-based program generation from a compiled split template library.
+
+``app/data/program_templates.json`` describes each split as days of slots,
+and each slot lists candidate exercises in order of preference. The library
+is parsed and checked against the exercise catalog once, then compiled into
+frozen dataclasses indexed by days per week. Filling a program is then a few
+tuple walks and dict lookups per slot.
+
+Requests that no template covers return ``None`` from ``generate``, and
+``ai_program.generate_program`` hands those to the model. That covers an
+unknown goal, an unsupported day count, or a required slot that the user's
+equipment cannot fill.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from app.db.exercise_seed import DEFAULT_EXERCISES
+from app.db.schemas import ProgramCreate
+from app.services.exercise_catalog import exercise_index, normalize
+from app.services.strength_standards import strength_standards
+from app.services.substitution import normalize_equipment
+
+logger = logging.getLogger(__name__)
+
+LIBRARY_PATH = Path(__file__).resolve().parents[1] / "data" / "program_templates.json"
+EXPERIENCE_LEVELS = {"beginner": 0, "novice": 0, "intermediate": 1, "advanced": 2, "elite": 2}
+
+# Program exercises whose target weight is seeded from a submitted lift.
+LIFT_SOURCES: dict[str, tuple[str, ...]] = {
+    "bench_press": ("bench", "bench_press"),
+    "back_squat": ("squat", "back_squat"),
+    "deadlift": ("deadlift",),
+    "lat_pulldown": ("lat_pulldown",),
+    "goblet_squat": ("goblet_squat",),
+    "dumbbell_press": ("dumbbell_press",),
+    "dumbbell_row": ("dumbbell_row",),
+    "bent_over_dumbbell_row": ("dumbbell_row",),
+}
+
+
+def starting_weight(payload: ProgramCreate, exercise_id: str, default: float | None) -> float | None:
+    """Submitted lift, else the user's cohort standard, else ``default``."""
+
+    lifts = payload.lifts or {}
+    for lift in LIFT_SOURCES.get(exercise_id, ()):
+        if lifts.get(lift) is not None:
+            return lifts[lift]
+    seeded = strength_standards.starting_weight(exercise_id, payload)
+    return seeded if seeded is not None else default
+
+
+@dataclass(frozen=True, slots=True)
+class Candidate:
+    exercise_id: str
+    equipment: frozenset[str]
+    default_weight: float | None
+    # Whether the target weight comes from the user's lifts or cohort.
+    seeded: bool
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    role: str
+    candidates: tuple[Candidate, ...]
+    optional: bool
+    min_experience: int
+
+
+@dataclass(frozen=True, slots=True)
+class DayTemplate:
+    name: str
+    slots: tuple[Slot, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class SplitTemplate:
+    id: str
+    split: str
+    days: tuple[DayTemplate, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class RepScheme:
+    sets: int
+    reps: str
+
+
+def _equipment_by_exercise() -> dict[str, frozenset[str]]:
+    if len(exercise_index):
+        return {entry.id: frozenset(entry.equipment) for entry in exercise_index.entries.values()}
+    return {exercise_id: frozenset(equipment) for exercise_id, _, _, _, equipment in DEFAULT_EXERCISES}
+
+
+class ProgramLibrary:
+    def __init__(
+        self,
+        by_days: dict[int, SplitTemplate],
+        goals: dict[str, str],
+        schemes: dict[str, dict[str, RepScheme]],
+        version: str = "",
+        default_weights: dict[str, float] | None = None,
+    ) -> None:
+        self.by_days = MappingProxyType(by_days)
+        self.goals = MappingProxyType(goals)
+        self.schemes = MappingProxyType({goal: MappingProxyType(roles) for goal, roles in schemes.items()})
+        # Starting loads for exercises swapped into a plan without history.
+        self.default_weights = MappingProxyType(default_weights or {})
+        # Digest of the source file; cached programs are keyed on it.
+        self.version = version
+        self.generated = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def compile(cls, raw: dict[str, Any], equipment: dict[str, frozenset[str]], version: str = "") -> ProgramLibrary:
+        """Validate the raw library and freeze it; raises ``ValueError`` on bad input."""
+
+        schemes = {
+            goal: {role: RepScheme(int(scheme["sets"]), str(scheme["reps"])) for role, scheme in roles.items()}
+            for goal, roles in raw["rep_schemes"].items()
+        }
+        goals = {normalize(alias): goal for alias, goal in raw["goals"].items()}
+        unknown_goals = set(goals.values()) - set(schemes)
+        if unknown_goals:
+            raise ValueError(f"goals without a rep scheme: {sorted(unknown_goals)}")
+        weights = raw.get("default_weights", {})
+
+        by_days: dict[int, SplitTemplate] = {}
+        for template in raw["templates"]:
+            days = []
+            for day in template["days"]:
+                slots = []
+                for slot in day["slots"]:
+                    missing = [exercise_id for exercise_id in slot["candidates"] if exercise_id not in equipment]
+                    if missing:
+                        raise ValueError(f"{template['id']}/{day['day']}: unknown exercises {missing}")
+                    if any(slot["role"] not in roles for roles in schemes.values()):
+                        raise ValueError(f"{template['id']}/{day['day']}: no rep scheme for role {slot['role']!r}")
+                    slots.append(
+                        Slot(
+                            role=slot["role"],
+                            candidates=tuple(
+                                Candidate(
+                                    exercise_id,
+                                    equipment[exercise_id],
+                                    weights.get(exercise_id),
+                                    exercise_id in LIFT_SOURCES,
+                                )
+                                for exercise_id in slot["candidates"]
+                            ),
+                            optional=bool(slot.get("optional", False)),
+                            min_experience=EXPERIENCE_LEVELS[slot.get("min_experience", "beginner")],
+                        )
+                    )
+                days.append(DayTemplate(day["day"], tuple(slots)))
+            compiled = SplitTemplate(template["id"], template["split"], tuple(days))
+            low, high = template["days_per_week"]
+            for count in range(low, high + 1):
+                if count in by_days:
+                    raise ValueError(f"{template['id']} and {by_days[count].id} both cover {count} days")
+                by_days[count] = compiled
+        default_weights = {exercise_id: float(weight) for exercise_id, weight in weights.items()}
+        return cls(by_days, goals, schemes, version, default_weights)
+
+    def generate(self, payload: ProgramCreate) -> dict[str, Any] | None:
+        template = self.by_days.get(payload.training_days_per_week or 3)
+        goal = self.goals.get(normalize(payload.goal))
+        if template is None or goal is None:
+            self.fallbacks += 1
+            return None
+
+        schemes = self.schemes[goal]
+        experience = EXPERIENCE_LEVELS.get(normalize(payload.experience), 1)
+        available = normalize_equipment(payload.equipment)
+        days = []
+        for day in template.days:
+            exercises = []
+            planned: set[str] = set()
+            for slot in day.slots:
+                if slot.min_experience > experience:
+                    continue
+                chosen = None
+                for candidate in slot.candidates:
+                    # Small equipment sets can leave one exercise as the only
+                    # option for two slots; it is planned once per day.
+                    if candidate.exercise_id in planned:
+                        continue
+                    if available is None or candidate.equipment <= available:
+                        chosen = candidate
+                        break
+                if chosen is None:
+                    if slot.optional:
+                        continue
+                    self.fallbacks += 1
+                    return None
+                planned.add(chosen.exercise_id)
+                scheme = schemes[slot.role]
+                exercises.append(
+                    {
+                        "id": chosen.exercise_id,
+                        "sets": scheme.sets,
+                        "reps": scheme.reps,
+                        "target_weight": (
+                            starting_weight(payload, chosen.exercise_id, chosen.default_weight)
+                            if chosen.seeded
+                            else chosen.default_weight
+                        ),
+                    }
+                )
+            days.append({"day": day.name, "exercises": exercises})
+
+        self.generated += 1
+        return {
+            "split": template.split,
+            "template_id": template.id,
+            "days": days,
+            "generated_at": datetime.utcnow().isoformat(),
+        }
+
+    def stats(self) -> dict[str, float]:
+        return {"templates": len(set(self.by_days.values())), "generated": self.generated, "fallbacks": self.fallbacks}
+
+
+_library: ProgramLibrary | None = None
+
+
+def load_program_library(path: Path = LIBRARY_PATH) -> ProgramLibrary:
+    """(Re)compile the library; call after the exercise catalog is loaded."""
+
+    global _library
+    data = path.read_bytes()
+    _library = ProgramLibrary.compile(
+        json.loads(data), _equipment_by_exercise(), version=hashlib.sha256(data).hexdigest()[:16]
+    )
+    logger.info("Compiled %d program templates from %s", len(set(_library.by_days.values())), path.name)
+    return _library
+
+
+def program_library() -> ProgramLibrary:
+    return _library or load_program_library()
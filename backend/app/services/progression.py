@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Iterable
+from typing import Any, Iterable, Mapping
 
 from app.db.models import WorkoutLog
 
@@ -15,13 +15,17 @@ def _is_full_completion(log: WorkoutLog) -> bool:
 
 
 def apply_progression_to_plan(
-    plan_json: dict[str, Any], user_logs: Iterable[WorkoutLog]
+    plan_json: dict[str, Any],
+    user_logs: Iterable[WorkoutLog],
+    default_weights: Mapping[str, float] | None = None,
 ) -> dict[str, Any]:
     """Adjust today's plan based on the last completed logs.
 
     Simple rule: if the last log for an exercise was marked completed and the reps
     string indicates all sets were done (e.g., "8,8,8"), bump target_weight by
-    2.5kg. The function returns a mutated copy of the plan JSON.
+    2.5kg. An exercise without a target (e.g. one just swapped in) otherwise
+    repeats its last logged weight, or falls back to ``default_weights``. The
+    function returns a mutated copy of the plan JSON.
     """
 
     plan_copy = {**plan_json}
@@ -40,6 +44,9 @@ def apply_progression_to_plan(
 
         last_log = latest_log_by_exercise.get(exercise_id)
         if not last_log or not _is_full_completion(last_log):
+            if exercise.get("target_weight") is None:
+                last_weight = last_log and (last_log.actual_weight or last_log.target_weight)
+                exercise["target_weight"] = last_weight or (default_weights or {}).get(exercise_id)
             continue
 
         target_weight = exercise.get("target_weight")
@@ -0,0 +1,305 @@
+"""Cohort strength standards used to seed starting weights.
+
+A batch job reads every user's profile and strength estimates, buckets them by
+sex, bodyweight class and age band, and stores per-cohort lift percentiles in
+``strength_standards``. Run it periodically (e.g. nightly)::
+
+    python -m app.services.strength_standards refresh
+
+The API keeps the table in a dict and reloads it every
+``STRENGTH_STANDARDS_RELOAD_SECONDS``, so seeding a starting weight costs at
+most four dict lookups: the user's exact cohort, then the same cohort pooled
+over age, bodyweight and finally sex. Cohorts with fewer than
+``MIN_SAMPLES`` users are not stored.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from itertools import product
+from typing import Any
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from app.core.config import get_settings
+from app.db.models import StrengthEstimate, StrengthStandard, UserProfile
+from app.db.schemas import ProgramCreate
+from app.services.exercise_catalog import normalize
+
+logger = logging.getLogger(__name__)
+
+# Program exercise id -> strength_estimates column.
+LIFT_COLUMNS = {
+    "bench_press": StrengthEstimate.bench_press_kg,
+    "back_squat": StrengthEstimate.squat_kg,
+    "deadlift": StrengthEstimate.deadlift_kg,
+    "lat_pulldown": StrengthEstimate.lat_pulldown_kg,
+    "dumbbell_press": StrengthEstimate.dumbbell_press_kg,
+    "dumbbell_row": StrengthEstimate.dumbbell_row_kg,
+    "goblet_squat": StrengthEstimate.goblet_squat_kg,
+}
+# Program exercises seeded from another lift's standards, matching the lift
+# they read in program_templates.LIFT_SOURCES.
+STANDARD_ALIASES = {"bent_over_dumbbell_row": "dumbbell_row"}
+PERCENTILES = (10, 25, 50, 75, 90)
+# Lower bounds; values below the first edge fall in class/band 0.
+WEIGHT_CLASS_EDGES = (60, 70, 80, 90, 100, 110)
+AGE_BAND_EDGES = (25, 35, 45, 55, 65)
+SEXES = ("male", "female")
+ANY = -1
+MIN_SAMPLES = 30
+EXPERIENCE_PERCENTILE = {"beginner": 25, "novice": 25, "intermediate": 50, "advanced": 75, "elite": 90}
+ROUND_TO_KG = 2.5
+
+
+def sex_code(value: str | None) -> int:
+    normalized = (value or "").strip().lower()
+    if normalized in ("m", "male", "man"):
+        return 0
+    if normalized in ("f", "female", "woman"):
+        return 1
+    return ANY
+
+
+def bucket_lower_bound(value: float | None, edges: tuple[int, ...]) -> int:
+    if value is None:
+        return ANY
+    for edge in reversed(edges):
+        if value >= edge:
+            return edge
+    return 0
+
+
+def _bucket_codes(values: np.ndarray, edges: tuple[int, ...]) -> np.ndarray:
+    """Vectorized ``bucket_lower_bound``; NaN maps to ``ANY``."""
+
+    bounds = np.array((0, *edges), dtype=np.int16)
+    codes = bounds[np.searchsorted(np.array(edges, dtype=np.float64), values, side="right")]
+    return np.where(np.isnan(values), ANY, codes).astype(np.int16)
+
+
+def compute_standards(
+    sex: np.ndarray, weight_kg: np.ndarray, age: np.ndarray, lifts: dict[str, np.ndarray]
+) -> list[dict[str, Any]]:
+    """Percentile rows for every cohort and every pooled cohort.
+
+    ``sex`` holds ``sex_code`` values; missing weights, ages and lifts are NaN.
+    Each lift is sorted by value once; each of the eight cohort groupings then
+    only needs a stable sort of small integer keys, so the job stays a handful
+    of O(n log n) numpy passes regardless of cohort count.
+    """
+
+    dimensions = (
+        sex.astype(np.int16),
+        _bucket_codes(weight_kg.astype(np.float64), WEIGHT_CLASS_EDGES),
+        _bucket_codes(age.astype(np.float64), AGE_BAND_EDGES),
+    )
+    quantiles = np.array(PERCENTILES, dtype=np.float64) / 100
+    rows = []
+    for lift, raw in lifts.items():
+        values = raw.astype(np.float64)
+        valid = ~np.isnan(values) & (values > 0)
+        by_value = np.flatnonzero(valid)[np.argsort(values[valid], kind="stable")]
+        sorted_values = values[by_value]
+        codes = [dimension[by_value] for dimension in dimensions]
+
+        for pooled in product((False, True), repeat=3):
+            # A user only counts towards cohorts whose non-pooled dimensions they filled in.
+            include = np.ones(len(by_value), dtype=bool)
+            key = np.zeros(len(by_value), dtype=np.int32)
+            for code, is_pooled, width in zip(codes, pooled, (4, 256, 256)):
+                column = np.full(len(by_value), ANY, dtype=np.int32) if is_pooled else code.astype(np.int32)
+                include &= is_pooled | (code != ANY)
+                key = key * width + (column + 1)
+            order = np.argsort(key[include], kind="stable")
+            grouped = sorted_values[include][order]
+            keys, starts, counts = np.unique(key[include][order], return_index=True, return_counts=True)
+            enough = counts >= MIN_SAMPLES
+            keys, starts, counts = keys[enough], starts[enough], counts[enough]
+            if not len(keys):
+                continue
+
+            position = starts[:, None] + (counts[:, None] - 1) * quantiles[None, :]
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            fraction = position - lower
+            percentiles = grouped[lower] * (1 - fraction) + grouped[upper] * fraction
+
+            for cohort_key, count, values_row in zip(keys.tolist(), counts.tolist(), percentiles.tolist()):
+                age_band = cohort_key % 256 - 1
+                weight_class = cohort_key // 256 % 256 - 1
+                cohort_sex = cohort_key // 65536 - 1
+                rows.append(
+                    {
+                        "lift": lift,
+                        "sex": SEXES[cohort_sex] if cohort_sex != ANY else "any",
+                        "weight_class": weight_class,
+                        "age_band": age_band,
+                        "sample_size": count,
+                        **{f"p{pct}": round(value, 2) for pct, value in zip(PERCENTILES, values_row)},
+                    }
+                )
+    return rows
+
+
+class StrengthStandards:
+    def __init__(self) -> None:
+        self._table: dict[tuple[str, str, int, int], dict[int, float]] = {}
+        self.loaded_at: float | None = None
+        self.lookups = 0
+        self.misses = 0
+
+    def replace(self, rows: list[dict[str, Any]]) -> None:
+        self._table = {
+            (row["lift"], row["sex"], row["weight_class"], row["age_band"]): {
+                pct: row[f"p{pct}"] for pct in PERCENTILES
+            }
+            for row in rows
+        }
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def percentiles(
+        self, lift: str, sex: str | None, weight_kg: float | None, age: int | None
+    ) -> dict[int, float] | None:
+        code = sex_code(sex)
+        cohort = [
+            SEXES[code] if code != ANY else "any",
+            bucket_lower_bound(weight_kg, WEIGHT_CLASS_EDGES),
+            bucket_lower_bound(age, AGE_BAND_EDGES),
+        ]
+        self.lookups += 1
+        # Pool over age, then bodyweight, then sex until a stored cohort matches.
+        for pooled in (None, 2, 1, 0):
+            if pooled is not None:
+                cohort[pooled] = "any" if pooled == 0 else ANY
+            found = self._table.get((lift, *cohort))
+            if found is not None:
+                return found
+        self.misses += 1
+        return None
+
+    def starting_weight(self, exercise_id: str, payload: ProgramCreate) -> float | None:
+        """Cohort percentile matching the user's experience, rounded to 2.5kg.
+
+        Experience is normalized like the program generator does, so both read
+        the same level from e.g. ``"Advanced"``.
+        """
+
+        lift = STANDARD_ALIASES.get(exercise_id, exercise_id)
+        found = self.percentiles(lift, payload.gender, payload.weight_kg, payload.age)
+        if found is None:
+            return None
+        percentile = EXPERIENCE_PERCENTILE.get(normalize(payload.experience), 50)
+        return round(found[percentile] / ROUND_TO_KG) * ROUND_TO_KG
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "cohorts": len(self._table),
+            "lookups": self.lookups,
+            "misses": self.misses,
+            "age_seconds": time.time() - self.loaded_at if self.loaded_at else -1,
+        }
+
+
+strength_standards = StrengthStandards()
+
+
+async def load_strength_standards(db: AsyncSession) -> int:
+    result = await db.execute(select(StrengthStandard))
+    strength_standards.replace(
+        [
+            {column: getattr(row, column) for column in StrengthStandard.__table__.columns.keys()}
+            for row in result.scalars()
+        ]
+    )
+    logger.info("Loaded %d strength standard cohorts", len(strength_standards))
+    return len(strength_standards)
+
+
+async def reload_periodically(session_factory: Callable[[], AsyncSession], interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await load_strength_standards(db)
+        except Exception:  # keep serving the previous table
+            logger.exception("Reloading strength standards failed")
+
+
+async def fetch_columns(conn: AsyncConnection, chunk_size: int = 100_000) -> dict[str, np.ndarray]:
+    """Stream profiles joined with estimates into NaN-filled float arrays."""
+
+    columns = [UserProfile.gender, UserProfile.weight_kg, UserProfile.age, *LIFT_COLUMNS.values()]
+    query = select(*columns).join(StrengthEstimate, StrengthEstimate.user_id == UserProfile.user_id)
+    sexes, numeric = [], []
+    result = await conn.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions(chunk_size):
+        sexes.extend(sex_code(row[0]) for row in partition)
+        numeric.append(np.array([row[1:] for row in partition], dtype=np.float64))
+    matrix = np.vstack(numeric) if numeric else np.empty((0, 2 + len(LIFT_COLUMNS)))
+    return {
+        "sex": np.array(sexes, dtype=np.int16),
+        "weight_kg": matrix[:, 0],
+        "age": matrix[:, 1],
+        **{lift: matrix[:, 2 + index] for index, lift in enumerate(LIFT_COLUMNS)},
+    }
+
+
+async def refresh(conn: AsyncConnection) -> dict[str, float]:
+    started = time.perf_counter()
+    columns = await fetch_columns(conn)
+    fetched = time.perf_counter()
+    rows = compute_standards(
+        columns["sex"], columns["weight_kg"], columns["age"], {lift: columns[lift] for lift in LIFT_COLUMNS}
+    )
+    computed = time.perf_counter()
+
+    now = datetime.now(timezone.utc)
+    await conn.execute(delete(StrengthStandard))
+    if rows:
+        await conn.execute(insert(StrengthStandard), [{**row, "computed_at": now} for row in rows])
+    return {
+        "users": len(columns["sex"]),
+        "cohorts": len(rows),
+        "fetch_seconds": round(fetched - started, 3),
+        "compute_seconds": round(computed - fetched, 3),
+        "write_seconds": round(time.perf_counter() - computed, 3),
+    }
+
+
+async def _main(args: argparse.Namespace) -> int:
+    engine = create_async_engine(args.database_url or get_settings().database_url)
+    try:
+        async with engine.begin() as conn:
+            result = await refresh(conn)
+        print(
+            f"{result['cohorts']} cohorts from {result['users']} users "
+            f"(fetch {result['fetch_seconds']}s, compute {result['compute_seconds']}s, "
+            f"write {result['write_seconds']}s)"
+        )
+        return 0
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL from settings")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("refresh", help="recompute every cohort's percentiles")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Equipment-aware exercise substitution over a precomputed similarity graph.
+
+Each catalog exercise gets a list of every other exercise ranked by cosine
+similarity of muscle-group vectors (primary muscle weighted highest, shared
+equipment as a tie-breaker). Answering "best replacement given my equipment and
+avoid list" walks that short list once and is memoized per graph, so plan
+building pays a dict lookup per exercise.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+from typing import Any
+
+from app.services.exercise_catalog import CatalogEntry, ExerciseIndex, exercise_index, normalize
+
+MIN_SIMILARITY = 0.5
+ALWAYS_AVAILABLE = frozenset({"bodyweight"})
+# Submitting any of these as equipment means every exercise is possible.
+UNRESTRICTED = frozenset({"full_gym", "gym", "commercial_gym"})
+# User wording (already normalized) -> catalog equipment; anything else passes
+# through unchanged and simply matches nothing.
+EQUIPMENT_ALIASES = {
+    "dumbbells": "dumbbell",
+    "db": "dumbbell",
+    "barbells": "barbell",
+    "cables": "cable",
+    "cable_machine": "cable",
+    "machines": "machine",
+    "benches": "bench",
+    "flat_bench": "bench",
+    "bars": "bar",
+    "pull_up_bar": "bar",
+    "pullup_bar": "bar",
+    "chin_up_bar": "bar",
+    "racks": "rack",
+    "squat_rack": "rack",
+    "power_rack": "rack",
+    "dip_bars": "dip_station",
+    "dip_stand": "dip_station",
+    "none": "bodyweight",
+    "no_equipment": "bodyweight",
+    "home": "bodyweight",
+}
+# Bound on memoized ``best_replacement`` answers per graph.
+MAX_MEMOIZED = 65536
+
+
+def _muscle_vector(entry: CatalogEntry) -> dict[str, float]:
+    # Listed order is primary first; later muscles count for less.
+    return {muscle: 1.0 / (rank + 1) for rank, muscle in enumerate(entry.muscle_groups)}
+
+
+def _cosine(left: dict[str, float], right: dict[str, float]) -> float:
+    dot = sum(weight * right.get(muscle, 0.0) for muscle, weight in left.items())
+    norm = math.sqrt(sum(w * w for w in left.values())) * math.sqrt(sum(w * w for w in right.values()))
+    return dot / norm if norm else 0.0
+
+
+def normalize_equipment(items: Iterable[str] | None) -> frozenset[str] | None:
+    """Map user equipment to catalog vocabulary; ``None`` means unrestricted."""
+
+    if not items:
+        return None
+    normalized = {normalize(item) for item in items}
+    if normalized & UNRESTRICTED:
+        return None
+    return frozenset(EQUIPMENT_ALIASES.get(item, item) for item in normalized) | ALWAYS_AVAILABLE
+
+
+class SubstitutionGraph:
+    def __init__(self) -> None:
+        self._neighbours: dict[str, tuple[str, ...]] = {}
+        self._equipment: dict[str, frozenset[str]] = {}
+        self._best: dict[tuple[str, frozenset[str] | None, frozenset[str]], str | None] = {}
+
+    def rebuild(self, index: ExerciseIndex) -> None:
+        entries = list(index.entries.values())
+        vectors = {entry.id: _muscle_vector(entry) for entry in entries}
+        self._equipment = {entry.id: frozenset(entry.equipment) for entry in entries}
+
+        neighbours = {}
+        for entry in entries:
+            scored = []
+            for other in entries:
+                if other.id == entry.id:
+                    continue
+                similarity = _cosine(vectors[entry.id], vectors[other.id])
+                if similarity < MIN_SIMILARITY:
+                    continue
+                overlap = len(self._equipment[entry.id] & self._equipment[other.id])
+                scored.append((similarity + 0.01 * overlap, other.id))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            neighbours[entry.id] = tuple(other_id for _, other_id in scored)
+        self._neighbours = neighbours
+        self._best = {}
+
+    def usable(self, exercise_id: str, equipment: frozenset[str] | None) -> bool:
+        required = self._equipment.get(exercise_id)
+        # Exercises outside the catalog are taken on trust.
+        return equipment is None or required is None or required <= equipment
+
+    def best_replacement(
+        self, exercise_id: str, equipment: frozenset[str] | None, avoid: frozenset[str]
+    ) -> str | None:
+        key = (exercise_id, equipment, avoid)
+        if key in self._best:
+            return self._best[key]
+        best = next(
+            (
+                candidate
+                for candidate in self._neighbours.get(exercise_id, ())
+                if candidate not in avoid and self.usable(candidate, equipment)
+            ),
+            None,
+        )
+        if len(self._best) >= MAX_MEMOIZED:
+            self._best.clear()
+        self._best[key] = best
+        return best
+
+    def apply_preferences(
+        self,
+        exercises: list[dict[str, Any]],
+        custom_variations: dict[str, str] | None,
+        avoid_exercises: Iterable[str] | None,
+        equipment: frozenset[str] | None,
+    ) -> list[dict[str, Any]]:
+        """Apply explicit swaps, then replace avoided or unusable exercises in place.
+
+        Every replaced exercise loses its ``target_weight``: the original load
+        does not carry over to a different movement. Progression re-seeds it
+        from the replacement's own logs or its template default weight.
+        """
+
+        avoid = frozenset(avoid_exercises or ())
+        for exercise in exercises:
+            swapped = (custom_variations or {}).get(exercise.get("id"))
+            if swapped and swapped != exercise.get("id"):
+                exercise["id"] = swapped
+                exercise["target_weight"] = None
+
+        planned = frozenset(exercise.get("id") for exercise in exercises)
+        for exercise in exercises:
+            exercise_id = exercise.get("id")
+            if exercise_id not in avoid and self.usable(exercise_id, equipment):
+                continue
+            replacement = self.best_replacement(exercise_id, equipment, avoid | planned)
+            if replacement:
+                exercise["id"] = replacement
+                exercise["target_weight"] = None
+                planned |= {replacement}
+        return exercises
+
+
+substitution_graph = SubstitutionGraph()
+
+
+def rebuild_substitutions() -> None:
+    substitution_graph.rebuild(exercise_index)
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from app.core.lifecycle import Lifecycle
+
+
+@pytest.fixture
+def server_handler():
+    """Stands in for the SIGTERM handler uvicorn installs while serving."""
+
+    received = []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+    yield received
+    signal.signal(signal.SIGTERM, original)
+
+
+@pytest.mark.anyio
+async def test_sigterm_reports_draining_before_the_server_sees_it(server_handler):
+    state = Lifecycle()
+    state.ready = True
+
+    with state.drain_on_sigterm(0.2):
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.sleep(0.05)
+        assert (state.ready, state.draining, server_handler) == (False, True, [])
+
+        await asyncio.sleep(0.3)
+        assert server_handler == [signal.SIGTERM]
+
+    # The server's handler is back in place afterwards.
+    os.kill(os.getpid(), signal.SIGTERM)
+    assert server_handler == [signal.SIGTERM, signal.SIGTERM]
+
+
+@pytest.mark.anyio
+async def test_second_sigterm_is_passed_on_at_once(server_handler):
+    state = Lifecycle()
+
+    with state.drain_on_sigterm(30):
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.sleep(0.05)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.sleep(0.05)
+        assert server_handler == [signal.SIGTERM]
@@ -0,0 +1,56 @@
+import pytest
+from fastapi import WebSocket
+from pydantic import ValidationError
+
+from app.api.live import _token, live_message
+from app.db.schemas import LiveLogMessage, LivePingMessage
+
+
+def _websocket(headers=(), subprotocols=()) -> WebSocket:
+    scope = {
+        "type": "websocket",
+        "path": "/api/workout/live/x",
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "subprotocols": list(subprotocols),
+    }
+    return WebSocket(scope, receive=None, send=None)
+
+
+@pytest.mark.parametrize(
+    ("headers", "subprotocols", "expected"),
+    [
+        ([("authorization", "Bearer abc")], [], "abc"),
+        ([], ["bearer", "abc"], "abc"),
+        ([("authorization", "Bearer abc")], ["bearer", "other"], "abc"),
+        ([("authorization", "Basic abc")], [], None),
+        ([("authorization", "Bearer  ")], [], None),
+        ([], ["bearer"], None),
+        ([], [], None),
+    ],
+)
+def test_token_sources(headers, subprotocols, expected):
+    assert _token(_websocket(headers, subprotocols)) == expected
+
+
+def test_valid_messages_parse():
+    assert isinstance(live_message.validate_json('{"type": "ping"}'), LivePingMessage)
+    message = live_message.validate_json(b'{"type": "log", "exercise_id": "bench_press", "rest_seconds": 60}')
+    assert isinstance(message, LiveLogMessage)
+    assert message.rest_seconds == 60
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "not json",
+        "[1, 2]",
+        '"log"',
+        '{"type": "dance"}',
+        '{"exercise_id": "bench_press"}',
+        '{"type": "log", "exercise_id": "bench_press", "rest_seconds": "soon"}',
+        '{"type": "log", "exercise_id": "bench_press", "rest_seconds": 0}',
+    ],
+)
+def test_invalid_messages_raise_validation_errors(data):
+    with pytest.raises(ValidationError):
+        live_message.validate_json(data)
@@ -0,0 +1,67 @@
+import uuid
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from app.api import live as live_module
+
+pytestmark = pytest.mark.anyio
+
+PROGRAM = {"goal": "strength", "experience": "beginner", "equipment": ["barbell", "bench", "dumbbell"]}
+
+
+def _open_session(client: TestClient) -> tuple[dict, str]:
+    assert client.post("/api/program/init", json=PROGRAM).status_code == 200
+    plan = client.get("/api/workout/today").json()
+    return plan, f"/api/workout/live/{plan['workout_id']}"
+
+
+async def _run(scenario) -> None:
+    # The test client runs the app on its own event loop in a portal thread.
+    from app.main import app
+
+    def run() -> None:
+        token = f"test-{uuid.uuid4()}"
+        with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as client:
+            scenario(client, token)
+
+    await anyio.to_thread.run_sync(run)
+
+
+async def test_next_target_follows_plan_updates(pg_engine):
+    def scenario(client: TestClient, token: str) -> None:
+        plan, url = _open_session(client)
+        with client.websocket_connect(url, subprotocols=["bearer", token]) as socket:
+            # Swap the first exercise out after the socket has loaded the plan.
+            avoided = plan["exercises"][0]["id"]
+            update = {"day": plan["day"], "changes": [{"exercise_id": avoided, "action": "avoid"}]}
+            assert client.patch("/api/workout/update", json=update).status_code == 200
+            replacement = client.get("/api/workout/today").json()["exercises"][0]["id"]
+            assert replacement != avoided
+
+            socket.send_json({"type": "log", "exercise_id": replacement, "actual_weight": 20, "reps": "8,8,8"})
+            logged = socket.receive_json()
+            assert logged["type"] == "logged"
+            assert logged["next_target_weight"] is not None
+
+    await _run(scenario)
+
+
+async def test_failed_log_sends_an_error_and_keeps_the_socket(pg_engine, monkeypatch):
+    async def failing_record_log(db, workout, record):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(live_module, "record_log", failing_record_log)
+
+    def scenario(client: TestClient, token: str) -> None:
+        plan, url = _open_session(client)
+        with client.websocket_connect(url, subprotocols=["bearer", token]) as socket:
+            socket.send_json({"type": "log", "exercise_id": plan["exercises"][0]["id"]})
+            error = socket.receive_json()
+            assert error["type"] == "error"
+            assert error["detail"] == "Log not saved"
+            socket.send_json({"type": "ping"})
+            assert socket.receive_json() == {"type": "pong"}
+
+    await _run(scenario)
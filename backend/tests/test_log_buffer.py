@@ -0,0 +1,121 @@
+import asyncio
+import fcntl
+import threading
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.services import log_buffer as log_buffer_module
+from app.services.log_buffer import LogWriteBuffer
+
+
+class FailingBuffer(LogWriteBuffer):
+    async def _insert(self, records):
+        raise ConnectionError("database unavailable")
+
+
+def _record() -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "workout_id": uuid.uuid4(),
+        "exercise_id": "bench_press",
+        "logged_at": datetime(2024, 4, 1, 12, 0),
+    }
+
+
+@pytest.mark.anyio
+async def test_stop_releases_slot_and_keeps_segments_when_flush_fails(tmp_path):
+    buffer = FailingBuffer(tmp_path, flush_size=10, flush_interval=60)
+    await buffer.start()
+    await buffer.append(_record())
+
+    with pytest.raises(ConnectionError):
+        await buffer.stop()
+
+    # The slot is free again and the acknowledged log is left for replay.
+    with open(tmp_path / "slot-0.lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    segments = list((tmp_path / "slot-0").glob("*.wal"))
+    assert [path.read_bytes().count(b"\n") for path in segments] == [1]
+
+    replay = FailingBuffer(tmp_path, flush_size=10, flush_interval=60)
+    await replay.start()
+    assert replay.stats()["pending"] == 1
+    with pytest.raises(ConnectionError):
+        await replay.stop()
+
+
+@pytest.mark.anyio
+async def test_failed_append_is_truncated_from_the_segment(tmp_path, monkeypatch):
+    buffer = FailingBuffer(tmp_path, flush_size=10, flush_interval=60)
+    await buffer.start()
+    await buffer.append(_record())
+    size = buffer._segment_path.stat().st_size
+
+    def torn_write(handle, data, fsync):
+        handle.write(data[:10])
+        handle.flush()
+        raise OSError("disk full")
+
+    monkeypatch.setattr(log_buffer_module, "_write", torn_write)
+    with pytest.raises(OSError):
+        await buffer.append(_record())
+
+    assert buffer._segment_path.stat().st_size == size
+    assert buffer.stats()["acknowledged"] == 1
+    assert buffer.stats()["pending"] == 1
+    monkeypatch.undo()
+    await buffer.append(_record())
+    assert buffer._segment_path.read_bytes().count(b"\n") == 2
+
+    with pytest.raises(ConnectionError):
+        await buffer.stop()
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_does_not_stall_its_batch(tmp_path, monkeypatch):
+    buffer = FailingBuffer(tmp_path, flush_size=10, flush_interval=60)
+    await buffer.start()
+    release = threading.Event()
+
+    def slow_write(handle, data, fsync):
+        handle.write(data)
+        handle.flush()
+        release.wait()
+
+    monkeypatch.setattr(log_buffer_module, "_write", slow_write)
+    first = asyncio.create_task(buffer.append(_record()))
+    second = asyncio.create_task(buffer.append(_record()))
+    await asyncio.sleep(0)
+    # Cancel one waiter while its batch is being written.
+    first.cancel()
+    await asyncio.get_running_loop().run_in_executor(None, release.set)
+    await asyncio.wait_for(second, timeout=5)
+
+    assert first.cancelled()
+    assert buffer.stats()["acknowledged"] == 2
+    await buffer.append(_record())
+    with pytest.raises(ConnectionError):
+        await buffer.stop()
+
+
+@pytest.mark.anyio
+async def test_batch_is_dead_lettered_after_max_attempts(tmp_path):
+    buffer = FailingBuffer(tmp_path, flush_size=10, flush_interval=60, max_attempts=2)
+    await buffer.start()
+    await buffer.append(_record())
+
+    with pytest.raises(ConnectionError):
+        await buffer.flush()
+    assert buffer.stats()["pending"] == 1
+    with pytest.raises(ConnectionError):
+        await buffer.flush()
+
+    assert buffer.stats()["pending"] == 0
+    assert buffer.stats()["dead_lettered"] == 1
+    dead = list((tmp_path / "dead-letter").glob("*.wal"))
+    assert [path.read_bytes().count(b"\n") for path in dead] == [1]
+    await buffer.stop()
+    assert not list((tmp_path / "slot-0").glob("*.wal"))
@@ -0,0 +1,74 @@
+import argparse
+import uuid
+from datetime import date, datetime, time, timezone
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.db import partitions
+from app.db.models import User, Workout, WorkoutLog
+from app.db.partitions import DEFAULT_PARTITION, add_months, check, maintain, month_start, partition_name
+
+pytestmark = pytest.mark.anyio
+
+
+def _verify_args(database_url: str, start: date, end: date) -> argparse.Namespace:
+    return argparse.Namespace(
+        command="verify-pruning",
+        database_url=database_url,
+        start=start.isoformat(),
+        end=end.isoformat(),
+        user_id=str(uuid.uuid4()),
+        exercise_id="bench_press",
+    )
+
+
+async def test_verify_pruning_scans_only_the_requested_months(pg_engine, database_url, capsys):
+    this_month = month_start(date.today())
+    end = add_months(this_month, 1).replace(day=15)
+
+    assert await partitions._main(_verify_args(database_url, this_month, end)) == 0
+    scanned = capsys.readouterr().out
+    assert partition_name(this_month) in scanned
+    assert partition_name(add_months(this_month, 1)) in scanned
+    assert partition_name(add_months(this_month, 2)) not in scanned
+
+
+async def test_verify_pruning_fails_when_the_default_partition_is_scanned(pg_engine, database_url, capsys):
+    # Past the pre-created window only the default partition can hold rows.
+    far = add_months(month_start(date.today()), 12)
+
+    assert await partitions._main(_verify_args(database_url, far, far.replace(day=28))) == 1
+    assert DEFAULT_PARTITION in capsys.readouterr().out
+
+
+async def test_maintain_moves_default_rows_into_their_month(pg_engine):
+    far = add_months(month_start(date.today()), 12)
+    user_id, workout_id = uuid.uuid4(), uuid.uuid4()
+    async with pg_engine.begin() as conn:
+        await conn.execute(insert(User).values(id=user_id, created_at=datetime.now(timezone.utc)))
+        await conn.execute(
+            insert(Workout).values(id=workout_id, user_id=user_id, day_name="Day 1", plan_json={}, date=far)
+        )
+        await conn.execute(
+            insert(WorkoutLog).values(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                workout_id=workout_id,
+                exercise_id="bench_press",
+                logged_at=datetime.combine(far, time(12), tzinfo=timezone.utc),
+            )
+        )
+        problems = await check(conn, min_ahead=1)
+        assert any(DEFAULT_PARTITION in problem for problem in problems)
+
+        result = await maintain(conn, ahead=3, retain_months=None, drop=False)
+        assert partition_name(far) in result["created"]
+        assert await check(conn, min_ahead=1) == []
+        assert await conn.scalar(select(func.count()).select_from(WorkoutLog)) == 1
+
+
+async def test_check_flags_a_short_window(pg_engine):
+    async with pg_engine.begin() as conn:
+        assert await check(conn, min_ahead=3) == []
+        assert await check(conn, min_ahead=4) == [f"no partition for {add_months(month_start(date.today()), 4):%Y-%m}"]
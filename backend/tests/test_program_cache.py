@@ -0,0 +1,29 @@
+from app.db.schemas import ProgramCreate
+from app.services.program_cache import normalize_payload, template_key
+from app.services.program_templates import program_library
+
+
+def _key(**fields) -> str:
+    payload = {"goal": "hypertrophy", "experience": "intermediate", "equipment": ["dumbbell"], **fields}
+    return template_key(normalize_payload(ProgramCreate(**payload)))
+
+
+def test_equivalent_requests_share_a_key():
+    base = _key()
+    assert _key(goal="Muscle Gain", equipment=["Dumbbells", "bodyweight"]) == base
+    assert _key(lifts={"bench": 100, "squat": 140}) == base
+    assert _key(equipment=["gym"]) == _key(equipment=["Full-Gym", "dumbbell"])
+
+
+def test_generator_inputs_change_the_key():
+    base = _key()
+    assert _key(goal="strength") != base
+    assert _key(experience="advanced") != base
+    assert _key(equipment=["dumbbell", "bench"]) != base
+    assert _key(training_days_per_week=4) != base
+
+
+def test_library_version_is_part_of_the_key(monkeypatch):
+    base = _key()
+    monkeypatch.setattr(program_library(), "version", "edited")
+    assert _key() != base
@@ -0,0 +1,42 @@
+import pytest
+
+from app.db.schemas import ProgramCreate
+from app.services.program_templates import load_program_library
+from app.services.substitution import normalize_equipment
+
+EQUIPMENT = {
+    "dumbbell-only": ["dumbbells"],
+    "dumbbell-and-bench": ["dumbbell", "bench"],
+    "bodyweight-only": ["bodyweight"],
+    "home": ["home"],
+}
+
+
+@pytest.fixture(scope="module")
+def library():
+    return load_program_library()
+
+
+@pytest.mark.parametrize("days", range(1, 7))
+@pytest.mark.parametrize("equipment", EQUIPMENT.values(), ids=EQUIPMENT.keys())
+@pytest.mark.parametrize("experience", ["beginner", "advanced"])
+def test_every_day_count_generates_with_minimal_equipment(library, days, equipment, experience):
+    program = library.generate(
+        ProgramCreate(goal="hypertrophy", experience=experience, equipment=equipment, training_days_per_week=days)
+    )
+
+    assert program is not None
+    available = normalize_equipment(equipment)
+    for day in program["days"]:
+        ids = [exercise["id"] for exercise in day["exercises"]]
+        assert len(ids) == len(set(ids)), day
+        for exercise_id in ids:
+            slot_equipment = next(
+                candidate.equipment
+                for template in library.by_days.values()
+                for template_day in template.days
+                for slot in template_day.slots
+                for candidate in slot.candidates
+                if candidate.exercise_id == exercise_id
+            )
+            assert slot_equipment <= available, (day["day"], exercise_id)
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from app.db.models import WorkoutLog
+from app.services.progression import apply_progression_to_plan
+from app.services.substitution import SubstitutionGraph
+
+DEFAULTS = {"dumbbell_row": 24.0, "barbell_row": 50.0}
+
+
+def _log(exercise_id: str, weight: float, reps: str, day: int = 1) -> WorkoutLog:
+    return WorkoutLog(
+        exercise_id=exercise_id, actual_weight=weight, reps=reps, completed=True, logged_at=datetime(2024, 4, day)
+    )
+
+
+def _target(exercise: dict, logs: list[WorkoutLog]) -> float | None:
+    progressed = apply_progression_to_plan({"exercises": [exercise]}, logs, DEFAULTS)
+    return progressed["exercises"][0]["target_weight"]
+
+
+def test_swapped_exercise_without_history_gets_its_default():
+    assert _target({"id": "dumbbell_row", "target_weight": None}, []) == 24.0
+
+
+def test_swapped_exercise_repeats_a_partial_last_log():
+    assert _target({"id": "dumbbell_row", "target_weight": None}, [_log("dumbbell_row", 30, "8,8,0")]) == 30
+
+
+def test_swapped_exercise_progresses_from_a_full_last_log():
+    assert _target({"id": "dumbbell_row", "target_weight": None}, [_log("dumbbell_row", 30, "8,8,8")]) == 32.5
+
+
+def test_existing_targets_are_kept():
+    assert _target({"id": "barbell_row", "target_weight": 60}, [_log("barbell_row", 55, "8,8,0")]) == 60
+
+
+def test_explicit_swap_is_served_with_a_weight():
+    graph = SubstitutionGraph()
+    exercises = [{"id": "barbell_row", "target_weight": 60}]
+    graph.apply_preferences(exercises, {"barbell_row": "dumbbell_row"}, None, None)
+    assert exercises[0] == {"id": "dumbbell_row", "target_weight": None}
+
+    assert _target(exercises[0], []) == 24.0
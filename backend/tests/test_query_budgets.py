@@ -0,0 +1,84 @@
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core.metrics import QUERY_BUDGETS, assert_query_budgets, metrics_registry
+
+pytestmark = pytest.mark.anyio
+
+PROGRAM = {
+    "goal": "strength",
+    "experience": "beginner",
+    "equipment": ["barbell", "bench", "dumbbell"],
+    "lifts": {"bench": 60, "squat": 80, "deadlift": 100, "max_pushups": 20},
+    "training_days_per_week": 3,
+}
+
+
+def _statements(method: str, route: str) -> int:
+    return metrics_registry.routes[(method, route)].max_statements
+
+
+async def test_program_init_stays_within_its_query_budget(api_client):
+    # A new user (created in the request's transaction) and a cache miss, then
+    # the same user again with the template cached.
+    for _ in range(2):
+        response = await api_client.post("/api/program/init", json=PROGRAM)
+        assert response.status_code == 200, response.text
+
+    assert metrics_registry.routes[("POST", "/api/program/init")].requests == 2
+    assert _statements("POST", "/api/program/init") <= QUERY_BUDGETS[("POST", "/api/program/init")]
+    assert_query_budgets(metrics_registry)
+
+
+async def test_every_budgeted_route_stays_within_its_query_budget(api_client):
+    for path in ("/health", "/ready", "/health/pool", "/metrics"):
+        assert (await api_client.get(path)).status_code == 200, path
+
+    assert (await api_client.post("/api/program/init", json=PROGRAM)).status_code == 200
+
+    # Generates today's plan, then serves it as stored and as a patch.
+    today = await api_client.get("/api/workout/today")
+    assert today.status_code == 200, today.text
+    plan = today.json()
+    workout_id = plan["workout_id"]
+    exercise_id = plan["exercises"][0]["id"]
+    assert (await api_client.get("/api/workout/today")).status_code == 200
+    assert (await api_client.get("/api/workout/today", params={"since_version": plan["version"]})).status_code == 200
+
+    update = {"day": plan["day"], "changes": [{"exercise_id": exercise_id, "action": "avoid"}]}
+    response = await api_client.patch("/api/workout/update", json=update)
+    assert response.status_code == 200, response.text
+
+    log = {"workout_id": workout_id, "exercise_id": exercise_id, "actual_weight": 50, "sets": 3, "reps": "5"}
+    response = await api_client.post("/api/workout/log", json=log)
+    assert response.status_code == 200, response.text
+    response = await api_client.post("/api/workout/finish", params={"workout_id": workout_id})
+    assert response.status_code == 200, response.text
+
+    now = datetime.now(timezone.utc).isoformat()
+    mutations = [
+        {"type": "log", "id": str(uuid.uuid4()), "logged_at": now, **log},
+        {"type": "finish", "workout_id": workout_id, "finished_at": now},
+        {"type": "preferences", "changes": [], "preferred_equipment": ["dumbbell"]},
+    ]
+    response = await api_client.post("/api/sync", json={"cursor": 0, "mutations": mutations})
+    assert response.status_code == 200, response.text
+    # A cursor past the user's sequence resets the client.
+    response = await api_client.post("/api/sync", json={"cursor": 1_000_000})
+    assert response.status_code == 200, response.text
+
+    for params in ({"exercise_id": exercise_id}, {"exercise_id": exercise_id, "start": date.today().isoformat()}):
+        assert (await api_client.get("/api/history", params=params)).status_code == 200
+
+    # A guide miss reads and fills the table; the repeat is served from memory.
+    for _ in range(2):
+        response = await api_client.post("/api/exercise/guide", json={"exercise_name": "Bench Press"})
+        assert response.status_code == 200, response.text
+    assert (await api_client.get("/api/exercise/search", params={"q": "bench"})).status_code == 200
+    assert (await api_client.get("/api/analytics/summary")).status_code == 200
+
+    missing = set(QUERY_BUDGETS) - set(metrics_registry.routes)
+    assert not missing, f"budgeted routes not exercised: {sorted(missing)}"
+    assert_query_budgets(metrics_registry)
@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+
+from app.core.rate_limit import Limit, MemoryBackend, RateLimiter, RedisBackend
+
+
+@pytest.mark.anyio
+async def test_unreachable_redis_falls_back_to_process_buckets(caplog):
+    # Nothing listens on port 1, so every script call fails to connect.
+    backend = RedisBackend("redis://127.0.0.1:1/0", timeout=0.2)
+    limiter = RateLimiter(backend, {"cheap": Limit(rate=1 / 60, burst=2)})
+    user_id = uuid.uuid4()
+
+    waits = [await limiter.check("cheap", user_id) for _ in range(3)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] > 0
+    assert limiter.stats() == {"allowed": 2, "rejected": 1, "backend_failures": 3}
+    # One warning per outage, not one per request.
+    assert len([record for record in caplog.records if "unreachable" in record.message]) == 1
+    await backend.close()
+
+
+def test_memory_backend_evicts_least_recently_used_users_but_not_global_buckets():
+    backend = MemoryBackend(max_keys=3)
+    user = Limit(rate=1, burst=2)
+    shared = Limit(rate=1, burst=100)
+
+    def take(key: str) -> float:
+        return backend.take([(key, user), ("cheap:*", shared)], 1.0, now=0.0)
+
+    for key in ("cheap:a", "cheap:b", "cheap:c"):
+        take(key)
+    take("cheap:a")  # a is now the most recently used
+    take("cheap:d")  # evicts b, the least recently used
+
+    assert list(backend._buckets) == ["cheap:c", "cheap:a", "cheap:d"]
+    # a kept its spent budget rather than being reset to a full bucket.
+    assert take("cheap:a") > 0
+    for index in range(50):
+        take(f"cheap:flood-{index}")
+    assert backend._global["cheap:*"][0] == 100 - 55
@@ -0,0 +1,106 @@
+"""Replica routing of ``get_read_db``, with SQLite files standing in for the primary and the replica."""
+
+import pytest
+from sqlalchemy import column, insert, table, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db import session as session_module
+from app.db.session import PrimarySession, get_read_db, reads_from_primary
+from app.db.utils import resolve_user_id
+
+TOKEN = "replica-test-user"
+
+
+@pytest.fixture
+async def databases(tmp_path, monkeypatch):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE source (name TEXT)"))
+            await conn.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+    primary_sessions = async_sessionmaker(
+        primary, expire_on_commit=False, class_=AsyncSession, sync_session_class=PrimarySession
+    )
+    monkeypatch.setattr(session_module, "engine", primary)
+    monkeypatch.setattr(session_module, "SessionLocal", primary_sessions)
+    monkeypatch.setattr(session_module, "_recent_writes", {})
+    yield primary, replica, primary_sessions
+    await primary.dispose()
+    await replica.dispose()
+
+
+def _use_replica(monkeypatch, replica) -> None:
+    monkeypatch.setattr(session_module, "read_engine", replica)
+    monkeypatch.setattr(
+        session_module, "ReadSessionLocal", async_sessionmaker(replica, expire_on_commit=False, class_=AsyncSession)
+    )
+
+
+async def _read(primary_session: AsyncSession) -> tuple[AsyncSession, str]:
+    dependency = get_read_db(TOKEN, primary_session)
+    session = await anext(dependency)
+    name = await session.scalar(text("SELECT name FROM source"))
+    await dependency.aclose()
+    return session, name
+
+
+async def _write(primary_sessions) -> None:
+    async with primary_sessions() as db:
+        db.info["user_id"] = resolve_user_id(TOKEN)
+        await db.execute(insert(table("source", column("name"))).values(name="write"))
+        await db.commit()
+
+
+@pytest.mark.anyio
+async def test_without_replica_reads_share_the_primary_session(databases, monkeypatch):
+    primary, _, primary_sessions = databases
+    monkeypatch.setattr(session_module, "read_engine", primary)
+    monkeypatch.setattr(session_module, "ReadSessionLocal", primary_sessions)
+
+    async with primary_sessions() as db:
+        session, name = await _read(db)
+        assert session is db
+        assert name == "primary"
+
+
+@pytest.mark.anyio
+async def test_replica_serves_reads_until_the_user_writes(databases, monkeypatch):
+    _, replica, primary_sessions = databases
+    _use_replica(monkeypatch, replica)
+
+    async with primary_sessions() as db:
+        session, name = await _read(db)
+        assert session is not db
+        assert name == "replica"
+
+    await _write(primary_sessions)
+    assert reads_from_primary(resolve_user_id(TOKEN))
+    async with primary_sessions() as db:
+        session, name = await _read(db)
+        assert session is db
+        assert name == "primary"
+
+
+@pytest.mark.anyio
+async def test_read_your_writes_window_expires(databases, monkeypatch):
+    _, replica, primary_sessions = databases
+    _use_replica(monkeypatch, replica)
+    monkeypatch.setattr(session_module.settings, "read_your_writes_seconds", 0.0)
+
+    await _write(primary_sessions)
+    async with primary_sessions() as db:
+        _, name = await _read(db)
+        assert name == "replica"
+
+
+@pytest.mark.anyio
+async def test_read_only_primary_sessions_do_not_pin_the_user(databases, monkeypatch):
+    _, replica, primary_sessions = databases
+    _use_replica(monkeypatch, replica)
+
+    async with primary_sessions() as db:
+        db.info["user_id"] = resolve_user_id(TOKEN)
+        await db.execute(text("SELECT name FROM source"))
+        await db.commit()
+    assert not reads_from_primary(resolve_user_id(TOKEN))
@@ -0,0 +1,43 @@
+import pytest
+
+from app.db.schemas import ProgramCreate
+from app.services.program_templates import EXPERIENCE_LEVELS, LIFT_SOURCES
+from app.services.strength_standards import (
+    ANY,
+    EXPERIENCE_PERCENTILE,
+    LIFT_COLUMNS,
+    STANDARD_ALIASES,
+    StrengthStandards,
+)
+
+
+def _standards(lift: str) -> StrengthStandards:
+    standards = StrengthStandards()
+    row = {"lift": lift, "sex": "any", "weight_class": ANY, "age_band": ANY}
+    standards.replace([{**row, "p10": 10, "p25": 20, "p50": 30, "p75": 40, "p90": 50}])
+    return standards
+
+
+def _payload(experience: str = "beginner") -> ProgramCreate:
+    return ProgramCreate(goal="strength", experience=experience, equipment=["dumbbell"])
+
+
+def test_every_seeded_program_lift_has_a_standard():
+    for exercise_id in LIFT_SOURCES:
+        assert STANDARD_ALIASES.get(exercise_id, exercise_id) in LIFT_COLUMNS, exercise_id
+
+
+def test_bent_over_dumbbell_row_reads_the_dumbbell_row_standard():
+    assert _standards("dumbbell_row").starting_weight("bent_over_dumbbell_row", _payload()) == 20
+
+
+def test_experience_levels_agree_with_the_generator():
+    assert set(EXPERIENCE_PERCENTILE) == set(EXPERIENCE_LEVELS)
+
+
+@pytest.mark.parametrize(
+    ("experience", "expected"),
+    [("beginner", 20), (" Advanced ", 40), ("ELITE", 50), ("Intermediate-Lifter", 30), ("", 30)],
+)
+def test_experience_is_normalized_like_the_generator(experience, expected):
+    assert _standards("bench_press").starting_weight("bench_press", _payload(experience)) == expected
@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api.sync import _client_time
+from app.db.models import WorkoutLog
+
+PROGRAM = {"goal": "strength", "experience": "beginner", "equipment": ["barbell", "bench", "dumbbell"]}
+
+
+def test_client_time_keeps_accepted_timestamps_as_sent():
+    now = datetime(2024, 4, 1, 12, tzinfo=timezone.utc)
+
+    ahead = now + timedelta(minutes=2)
+    assert _client_time(ahead, now) == (ahead, None)
+    assert _client_time(ahead.replace(tzinfo=None), now) == (ahead, None)
+    assert _client_time(now + timedelta(hours=1), now) == (None, "Timestamp in the future")
+    assert _client_time(now - timedelta(days=365), now) == (None, "Timestamp too old")
+
+
+async def _workout(api_client) -> tuple[str, str]:
+    assert (await api_client.post("/api/program/init", json=PROGRAM)).status_code == 200
+    plan = (await api_client.get("/api/workout/today")).json()
+    return plan["workout_id"], plan["exercises"][0]["id"]
+
+
+@pytest.mark.anyio
+async def test_replayed_future_dated_log_is_a_duplicate(api_client, pg_engine):
+    workout_id, exercise_id = await _workout(api_client)
+    # A device clock a little ahead of the server's.
+    logged_at = (datetime.now(timezone.utc) + timedelta(minutes=2)).isoformat()
+    log = {
+        "type": "log",
+        "id": str(uuid.uuid4()),
+        "workout_id": workout_id,
+        "exercise_id": exercise_id,
+        "logged_at": logged_at,
+        "actual_weight": 50,
+    }
+
+    statuses = []
+    for _ in range(2):
+        response = await api_client.post("/api/sync", json={"mutations": [log]})
+        assert response.status_code == 200, response.text
+        statuses.append(response.json()["results"][0]["status"])
+
+    assert statuses == ["applied", "duplicate"]
+    async with pg_engine.connect() as conn:
+        assert await conn.scalar(select(func.count()).select_from(WorkoutLog)) == 1
+
+
+@pytest.mark.anyio
+async def test_repeated_id_in_a_batch_and_far_future_logs(api_client):
+    workout_id, exercise_id = await _workout(api_client)
+    now = datetime.now(timezone.utc)
+    log = {
+        "type": "log",
+        "id": str(uuid.uuid4()),
+        "workout_id": workout_id,
+        "exercise_id": exercise_id,
+        "logged_at": now.isoformat(),
+    }
+    far = {**log, "id": str(uuid.uuid4()), "logged_at": (now + timedelta(days=1)).isoformat()}
+
+    response = await api_client.post("/api/sync", json={"mutations": [log, log, far]})
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["applied", "duplicate", "rejected"]
+    assert results[2]["detail"] == "Timestamp in the future"
@@ -0,0 +1,135 @@
+"""Dashboard latency as a user's history grows.
+
+Adds one synthetic user per ``--depths`` entry (that many workout_logs each) to
+the benchmark database, rebuilds the analytics rollups, then times
+``GET /api/analytics/summary`` in-process for every user. For contrast it also
+times the ad-hoc equivalent: weekly volume aggregated straight from
+``workout_logs``. The summary should stay flat while the ad-hoc query grows.
+
+    python benchmarks/seed.py --users 10
+    python benchmarks/bench_analytics.py --depths 100 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from common import DEFAULT_DATABASE_URL, latency_summary, write_report
+
+import httpx
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import rollups
+from app.db.models import Program, User, Workout, WorkoutLog
+from app.db.partitions import add_months, ensure_partitions
+from app.db.utils import resolve_user_id
+
+from seed import _user_rows, token_for
+
+# Far from the indices seed.py hands out.
+USER_OFFSET = 9_000_000
+LOGS_PER_WORKOUT = 12
+
+
+async def _seed_user(engine, index: int, depth: int, rng: random.Random) -> None:
+    user, program, workouts, logs = await _user_rows(index, depth, LOGS_PER_WORKOUT, rng)
+    async with engine.begin() as conn:
+        await conn.execute(delete(WorkoutLog).where(WorkoutLog.user_id == user["id"]))
+        await conn.execute(delete(Workout).where(Workout.user_id == user["id"]))
+        await conn.execute(delete(Program).where(Program.user_id == user["id"]))
+        await conn.execute(delete(User).where(User.id == user["id"]))
+        first = min(log["logged_at"] for log in logs).date()
+        await ensure_partitions(conn, first, add_months(date.today().replace(day=1), 1))
+        await conn.execute(insert(User), [user])
+        await conn.execute(insert(Program), [program])
+        await conn.execute(insert(Workout), workouts)
+        for offset in range(0, len(logs), 5000):
+            await conn.execute(insert(WorkoutLog), logs[offset : offset + 5000])
+
+
+async def _time_adhoc(engine, user_id, weeks: int, requests: int) -> list[float]:
+    since = datetime.utcnow() - timedelta(weeks=weeks)
+    week = func.date_trunc("week", WorkoutLog.logged_at)
+    query = (
+        select(week, WorkoutLog.exercise_id, func.count(), func.sum(WorkoutLog.sets))
+        .where(WorkoutLog.user_id == user_id, WorkoutLog.logged_at >= since)
+        .group_by(week, WorkoutLog.exercise_id)
+    )
+    # Streaks and PR timelines need the whole history, not just the window.
+    history = (
+        select(WorkoutLog.exercise_id, func.max(WorkoutLog.actual_weight))
+        .where(WorkoutLog.user_id == user_id)
+        .group_by(WorkoutLog.exercise_id)
+    )
+    samples = []
+    async with engine.connect() as conn:
+        for _ in range(requests):
+            started = time.perf_counter()
+            await conn.execute(query)
+            await conn.execute(history)
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    from app.main import app
+
+    engine = create_async_engine(args.database_url)
+    rng = random.Random(args.seed)
+    for position, depth in enumerate(args.depths):
+        await _seed_user(engine, USER_OFFSET + position, depth, rng)
+
+    started = time.perf_counter()
+    await rollups.reset(engine)
+    refreshed = await rollups.refresh(engine, lag=timedelta(0), chunk=timedelta(hours=args.chunk_hours))
+    results: dict[str, dict[str, float]] = {
+        "rollup_rebuild": {**refreshed, "seconds": round(time.perf_counter() - started, 2)}
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+        for position, depth in enumerate(args.depths):
+            token = token_for(USER_OFFSET + position)
+            headers = {"Authorization": f"Bearer {token}"}
+            params = {"weeks": args.weeks}
+            await client.get("/api/analytics/summary", headers=headers, params=params)
+            samples = []
+            loop_started = time.perf_counter()
+            for _ in range(args.requests):
+                call_started = time.perf_counter()
+                response = await client.get("/api/analytics/summary", headers=headers, params=params)
+                response.raise_for_status()
+                samples.append((time.perf_counter() - call_started) * 1000)
+            results[f"summary_{depth}_logs"] = latency_summary(samples, time.perf_counter() - loop_started)
+
+            adhoc = await _time_adhoc(engine, resolve_user_id(token), args.weeks, args.requests)
+            results[f"adhoc_{depth}_logs"] = latency_summary(adhoc, sum(adhoc) / 1000)
+
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--depths", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per user")
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--chunk-hours", type=float, default=24 * 30, help="rollup refresh window per transaction")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("analytics", asyncio.run(run(args)), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
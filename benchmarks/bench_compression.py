@@ -0,0 +1,109 @@
+"""Bytes saved and CPU spent compressing JSON-heavy responses.
+
+Encodes a generated program (``ProgramResponse.program_json``) and a
+``/api/history`` series with orjson, then pushes each body through
+``CompressionMiddleware`` once per encoding setting. Each body is sent both as
+a single message and as a stream of chunks. Reports the wire size, the bytes
+saved and the CPU milliseconds per response. No database needed.
+
+    python benchmarks/bench_compression.py --entries 5000 --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from common import latency_summary, write_report
+
+from app.core.compression import CompressionMiddleware, CompressionStats, brotli
+from app.db.schemas import ProgramCreate
+from app.services.program_templates import load_program_library
+
+CHUNK_SIZE = 4096
+
+
+def payloads(entries: int) -> dict[str, bytes]:
+    program = load_program_library().generate(
+        ProgramCreate(goal="hypertrophy", experience="advanced", equipment=["full_gym"], training_days_per_week=6)
+    )
+    start = datetime(2020, 1, 1)
+    history = {
+        "exercise": "bench_press",
+        "data": [{"date": (start + timedelta(days=index)).date(), "weight": 60.0 + index % 20} for index in range(entries)],
+    }
+    return {"program_json": orjson.dumps(program), "history": orjson.dumps(history)}
+
+
+def settings_under_test() -> dict[str, tuple[str, dict[str, int]]]:
+    settings = {f"gzip_{level}": ("gzip", {"gzip_level": level}) for level in (1, 6, 9)}
+    if brotli is not None:
+        settings.update({f"br_{quality}": ("br", {"brotli_quality": quality}) for quality in (4, 11)})
+    return settings
+
+
+def body_app(body: bytes, streaming: bool):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        if not streaming:
+            await send({"type": "http.response.body", "body": body})
+            return
+        for offset in range(0, len(body), CHUNK_SIZE):
+            chunk = body[offset : offset + CHUNK_SIZE]
+            await send({"type": "http.response.body", "body": chunk, "more_body": offset + CHUNK_SIZE < len(body)})
+
+    return app
+
+
+async def measure(body: bytes, encoding: str, options: dict[str, int], streaming: bool, repeat: int) -> dict[str, float]:
+    stats = CompressionStats()
+    middleware = CompressionMiddleware(body_app(body, streaming), minimum_size=0, stats=stats, **options)
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", encoding.encode())]}
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    samples = []
+    cpu_started = time.process_time()
+    for _ in range(repeat):
+        started = time.process_time()
+        await middleware(scope, receive, send)
+        samples.append((time.process_time() - started) * 1000)
+    summary = latency_summary(samples, time.process_time() - cpu_started)
+    summary["bytes_in"] = len(body)
+    summary["bytes_out"] = stats.bytes_out // repeat
+    summary["bytes_saved"] = summary["bytes_in"] - summary["bytes_out"]
+    summary["ratio"] = round(summary["bytes_out"] / len(body), 4)
+    summary["compress_cpu_ms"] = round(stats.cpu_seconds / repeat * 1000, 4)
+    return summary
+
+
+async def run(entries: int, repeat: int) -> dict[str, dict[str, dict[str, float]]]:
+    results = {}
+    for name, body in payloads(entries).items():
+        for mode, streaming in (("single", False), ("streaming", True)):
+            results[f"{name}_{mode}"] = {
+                label: await measure(body, encoding, options, streaming, repeat)
+                for label, (encoding, options) in settings_under_test().items()
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=5_000, help="history series length")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("compression", asyncio.run(run(args.entries, args.repeat)), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
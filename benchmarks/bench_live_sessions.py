@@ -0,0 +1,99 @@
+"""Hold thousands of live workout sessions open against one worker.
+
+Start a single worker (``uvicorn app.main:app --app-dir backend --workers 1``)
+on a seeded database, then::
+
+    python benchmarks/bench_live_sessions.py --base-url http://localhost:8000 --sessions 2000
+
+Each session fetches today's plan over HTTP, opens the live WebSocket, and logs
+``--sets`` sets with ``--think-ms`` pauses. Reports connect success, per-message
+round-trip percentiles and message throughput.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from common import latency_summary, write_report
+
+import httpx
+import websockets
+
+from seed import token_for
+
+
+async def _session(
+    http: httpx.AsyncClient, ws_base: str, index: int, args: argparse.Namespace, rtts: list[float], errors: list[str]
+) -> None:
+    token = token_for(index % args.users)
+    today = await http.get("/api/workout/today", headers={"Authorization": f"Bearer {token}"})
+    if today.status_code != 200:
+        errors.append(f"today:{today.status_code}")
+        return
+    plan = today.json()
+    exercises = plan["exercises"] or [{"id": "bench_press", "target_weight": 60}]
+
+    try:
+        async with websockets.connect(
+            f"{ws_base}/api/workout/live/{plan['workout_id']}", subprotocols=["bearer", token]
+        ) as ws:
+            # Stagger start so sessions overlap rather than arriving in lockstep.
+            await asyncio.sleep(args.think_ms / 1000 * (index % 10) / 10)
+            for set_index in range(args.sets):
+                exercise = exercises[set_index % len(exercises)]
+                started = time.perf_counter()
+                await ws.send(
+                    json.dumps(
+                        {
+                            "type": "log",
+                            "exercise_id": exercise["id"],
+                            "actual_weight": exercise.get("target_weight"),
+                            "target_weight": exercise.get("target_weight"),
+                            "sets": 1,
+                            "reps": "8",
+                            "rest_seconds": 1,
+                        }
+                    )
+                )
+                while json.loads(await ws.recv())["type"] != "logged":
+                    pass
+                rtts.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(args.think_ms / 1000)
+    except (OSError, websockets.WebSocketException) as exc:
+        errors.append(type(exc).__name__)
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    ws_base = args.base_url.replace("http", "ws", 1)
+    rtts: list[float] = []
+    errors: list[str] = []
+    limits = httpx.Limits(max_connections=200)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(_session(http, ws_base, index, args, rtts, errors) for index in range(args.sessions)))
+        elapsed = time.perf_counter() - started
+
+    summary = latency_summary(rtts, elapsed, len(errors))
+    summary["sessions"] = args.sessions
+    summary["failed_sessions"] = len(errors)
+    return {"live_log_roundtrip": summary}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=1000, help="seeded users to spread sessions over")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--sets", type=int, default=10)
+    parser.add_argument("--think-ms", type=float, default=500.0)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("live_sessions", asyncio.run(run(args)), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Set-logging throughput: one commit per log vs. the write-behind buffer.
+
+Needs a database prepared by ``seed.py`` (at least one user)::
+
+    python benchmarks/bench_log_commits.py --logs 20000 --concurrency 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+import uuid
+from datetime import date, datetime
+
+from common import DEFAULT_DATABASE_URL, write_report
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.models import Workout, WorkoutLog
+from app.services.log_buffer import LogWriteBuffer
+
+
+def _record(user_id: uuid.UUID, workout_id: uuid.UUID, index: int) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "workout_id": workout_id,
+        "exercise_id": f"bench_exercise_{index % 6}",
+        "actual_weight": 60.0,
+        "target_weight": 60.0,
+        "sets": 3,
+        "reps": "8,8,8",
+        "completed": True,
+        "logged_at": datetime.utcnow(),
+    }
+
+
+async def _drive(logs: int, concurrency: int, log_one) -> float:
+    counter = iter(range(logs))
+
+    async def worker() -> None:
+        for index in counter:
+            await log_one(index)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    engine = create_async_engine(args.database_url, pool_size=args.concurrency, max_overflow=0)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async with factory() as session:
+        user_id = (await session.execute(select(Workout.user_id).limit(1))).scalar_one()
+        workout = Workout(user_id=user_id, day_name="Bench", plan_json={}, date=date.today())
+        session.add(workout)
+        await session.commit()
+
+    async def direct(index: int) -> None:
+        async with factory() as session:
+            await session.execute(insert(WorkoutLog.__table__).values(_record(user_id, workout.id, index)))
+            await session.commit()
+
+    direct_seconds = await _drive(args.logs, args.concurrency, direct)
+
+    buffer = LogWriteBuffer(
+        tempfile.mkdtemp(prefix="gymbuddy-wal-"),
+        flush_size=args.flush_size,
+        flush_interval=args.flush_interval_ms / 1000,
+        fsync=not args.no_fsync,
+        session_factory=factory,
+    )
+    await buffer.start()
+    started = time.perf_counter()
+    ack_seconds = await _drive(
+        args.logs, args.concurrency, lambda index: buffer.append(_record(user_id, workout.id, index))
+    )
+    await buffer.stop()
+    drained_seconds = time.perf_counter() - started
+    await engine.dispose()
+
+    return {
+        "direct": {
+            "logs_per_second": round(args.logs / direct_seconds, 1),
+            "commits_per_second": round(args.logs / direct_seconds, 1),
+            "commits": args.logs,
+        },
+        "write_behind": {
+            "logs_per_second": round(args.logs / ack_seconds, 1),
+            "drained_logs_per_second": round(args.logs / drained_seconds, 1),
+            "commits_per_second": round(buffer.commits / drained_seconds, 1),
+            "commits": buffer.commits,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--logs", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--flush-size", type=int, default=500)
+    parser.add_argument("--flush-interval-ms", type=int, default=200)
+    parser.add_argument("--no-fsync", action="store_true", help="skip fsync on WAL appends")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("log_commits", asyncio.run(run(args)), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
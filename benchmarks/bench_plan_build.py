@@ -0,0 +1,106 @@
+"""Plan-building throughput: substitution plus progression, no database.
+
+Builds the exercise catalog from the seed list, precomputes the substitution
+graph and then repeatedly builds a day plan for users with different equipment
+and avoid lists, the same work /api/workout/today does once per user per day.
+
+    python benchmarks/bench_plan_build.py --iterations 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import write_report
+
+from app.db.exercise_seed import DEFAULT_EXERCISES
+from app.db.models import WorkoutLog
+from app.services.exercise_catalog import CatalogEntry, exercise_index
+from app.services.progression import apply_progression_to_plan
+from app.services.substitution import normalize_equipment, rebuild_substitutions, substitution_graph
+
+DAY = {
+    "day": "Day 1",
+    "exercises": [
+        {"id": "bench_press", "sets": 3, "reps": 8, "target_weight": 60},
+        {"id": "back_squat", "sets": 3, "reps": 8, "target_weight": 80},
+        {"id": "barbell_row", "sets": 3, "reps": 10, "target_weight": 50},
+        {"id": "overhead_press", "sets": 3, "reps": 8, "target_weight": 35},
+        {"id": "lat_pulldown", "sets": 3, "reps": 12, "target_weight": 45},
+    ],
+}
+
+PROFILES = [
+    (None, [], {}),
+    (["dumbbells", "bench"], [], {}),
+    (["bodyweight"], ["back_squat"], {}),
+    (["barbell", "rack"], ["overhead_press"], {"bench_press": "incline_bench_press"}),
+    (["dumbbells", "cables"], ["barbell_row"], {}),
+]
+
+
+def _logs(count: int) -> list[WorkoutLog]:
+    now = datetime.utcnow()
+    ids = [exercise[0] for exercise in DEFAULT_EXERCISES]
+    return [
+        WorkoutLog(
+            exercise_id=random.choice(ids),
+            actual_weight=random.uniform(20, 120),
+            target_weight=60,
+            sets=3,
+            reps="8,8,8",
+            completed=True,
+            logged_at=now - timedelta(days=i),
+        )
+        for i in range(count)
+    ]
+
+
+def run(iterations: int, log_count: int) -> dict[str, dict[str, float]]:
+    started = time.perf_counter()
+    exercise_index.rebuild([CatalogEntry(*exercise) for exercise in DEFAULT_EXERCISES])
+    rebuild_substitutions()
+    graph_ms = (time.perf_counter() - started) * 1000
+
+    logs = _logs(log_count)
+    profiles = [
+        (normalize_equipment(equipment), avoid, variations) for equipment, avoid, variations in PROFILES
+    ]
+
+    for equipment, avoid, variations in profiles:
+        substitution_graph.apply_preferences([dict(ex) for ex in DAY["exercises"]], variations, avoid, equipment)
+
+    results = {"graph": {"exercises": len(exercise_index), "build_ms": round(graph_ms, 3)}}
+    for label, history in (("substitution_only", None), ("substitution_and_progression", logs)):
+        started = time.perf_counter()
+        for i in range(iterations):
+            equipment, avoid, variations = profiles[i % len(profiles)]
+            exercises = [dict(ex) for ex in DAY["exercises"]]
+            substitution_graph.apply_preferences(exercises, variations, avoid, equipment)
+            if history is not None:
+                apply_progression_to_plan({"day": DAY["day"], "exercises": exercises}, history)
+        elapsed = time.perf_counter() - started
+        results[label] = {
+            "plans_per_second": round(iterations / elapsed, 1),
+            "mean_us": round(elapsed / iterations * 1_000_000, 3),
+        }
+    results["cache"] = substitution_graph.best_replacement.cache_info()._asdict()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--logs", type=int, default=50, help="recent logs fed to progression")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    random.seed(7)
+    write_report("plan_build", run(args.iterations, args.logs), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Program generation throughput from the compiled template library.
+
+Builds ``--payloads`` varied onboarding requests (goal, experience, equipment,
+days per week, submitted lifts) and measures programs generated per second
+by ``ProgramLibrary.generate`` and by the async ``generate_program`` that
+``/api/program/init`` calls on a template-cache miss. It also reports how
+many requests fell through to the model. No database needed.
+
+    python benchmarks/bench_program_generation.py --programs 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+from common import write_report
+
+from app.db.schemas import ProgramCreate
+from app.services.ai_program import generate_program
+from app.services.program_templates import load_program_library
+
+GOALS = ("strength", "hypertrophy", "Muscle Gain", "general fitness", "fat loss", "endurance", "powerlifting")
+EXPERIENCE = ("beginner", "intermediate", "advanced")
+EQUIPMENT = (
+    ["full_gym"],
+    ["barbell", "bench", "dumbbells", "cables"],
+    ["dumbbells", "bench", "bar"],
+    ["machines", "cables"],
+    ["bodyweight", "bar"],
+    [],
+)
+# Rarely submitted goals and schedules that no template covers.
+UNUSUAL_GOALS = ("marathon prep", "rehab", "yoga")
+
+
+def payloads(count: int, unusual_share: float, seed: int) -> list[ProgramCreate]:
+    rng = random.Random(seed)
+    generated = []
+    for _ in range(count):
+        unusual = rng.random() < unusual_share
+        lifts = {"bench": rng.randrange(40, 140, 5), "squat": rng.randrange(60, 200, 5)} if rng.random() < 0.5 else None
+        generated.append(
+            ProgramCreate(
+                goal=rng.choice(UNUSUAL_GOALS if unusual else GOALS),
+                experience=rng.choice(EXPERIENCE),
+                equipment=rng.choice(EQUIPMENT),
+                lifts=lifts,
+                training_days_per_week=rng.choice((7,) if unusual and rng.random() < 0.5 else (2, 3, 4, 5, 6)),
+            )
+        )
+    return generated
+
+
+def time_library(library, requests: list[ProgramCreate], programs: int) -> dict[str, float]:
+    started = time.perf_counter()
+    for index in range(programs):
+        library.generate(requests[index % len(requests)])
+    elapsed = time.perf_counter() - started
+    return {"programs_per_second": round(programs / elapsed, 1), "mean_us": round(elapsed / programs * 1e6, 3)}
+
+
+async def time_generate_program(requests: list[ProgramCreate], programs: int) -> dict[str, float]:
+    started = time.perf_counter()
+    for index in range(programs):
+        await generate_program(requests[index % len(requests)])
+    elapsed = time.perf_counter() - started
+    return {"programs_per_second": round(programs / elapsed, 1), "mean_us": round(elapsed / programs * 1e6, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--programs", type=int, default=200_000)
+    parser.add_argument("--payloads", type=int, default=1_000)
+    parser.add_argument("--unusual-share", type=float, default=0.05, help="share of requests no template covers")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    library = load_program_library()
+    compile_ms = (time.perf_counter() - started) * 1000
+    requests = payloads(args.payloads, args.unusual_share, args.seed)
+
+    results = {
+        "compile": {"templates": library.stats()["templates"], "ms": round(compile_ms, 3)},
+        "library": time_library(library, requests, args.programs),
+        "generate_program": asyncio.run(time_generate_program(requests, args.programs)),
+    }
+    stats = library.stats()
+    results["coverage"] = {
+        "from_template": stats["generated"],
+        "model_fallback": stats["fallbacks"],
+        "fallback_share": round(stats["fallbacks"] / (stats["generated"] + stats["fallbacks"]), 4),
+    }
+    write_report("program_generation", results, vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Per-request overhead of the token-bucket rate limiter.
+
+Times the FastAPI dependency as routes run it (user id resolution plus one
+bucket check) against the in-memory backend, spread over many users. Pass
+``--redis-url`` to also time the shared backend, e.g. against the valkey
+service in docker-compose.yml:
+
+    python benchmarks/bench_rate_limit.py --users 10000 --iterations 200000
+    python benchmarks/bench_rate_limit.py --redis-url redis://localhost:6380/0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from common import latency_summary, write_report
+
+from app.core import rate_limit
+from app.core.rate_limit import Limit, MemoryBackend, RateLimiter, RedisBackend
+
+TARGET_US = 50
+
+
+async def _time_dependency(limiter: RateLimiter, users: int, iterations: int) -> dict[str, float]:
+    rate_limit.rate_limiter = limiter
+    dependency = rate_limit.rate_limit("cheap")
+    tokens = [f"bench-user-{i}" for i in range(users)]
+    for token in tokens:
+        await dependency(token)
+
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        try:
+            await dependency(tokens[i % users])
+        except Exception:  # 429s cost the same as admits for this measurement
+            pass
+        samples.append((time.perf_counter() - call_started) * 1_000_000)
+    elapsed = time.perf_counter() - started
+
+    # latency_summary labels its fields in ms; these samples are microseconds.
+    summary = {key.replace("_ms", "_us"): value for key, value in latency_summary(samples, elapsed).items()}
+    summary.update(limiter.stats())
+    summary["within_target"] = summary["p99_us"] < TARGET_US
+    return summary
+
+
+def _limiter(backend) -> RateLimiter:
+    # Generous enough that most calls are admits, the common case in production.
+    return RateLimiter(
+        backend,
+        per_user={"cheap": Limit(rate=1000, burst=1000)},
+        global_limits={"cheap": Limit(rate=1_000_000, burst=1_000_000)},
+    )
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    results = {"memory": await _time_dependency(_limiter(MemoryBackend()), args.users, args.iterations)}
+    if args.redis_url:
+        backend = RedisBackend(args.redis_url, prefix="bench-ratelimit:")
+        try:
+            # Network round-trips: far fewer iterations tell the same story.
+            results["redis"] = await _time_dependency(
+                _limiter(backend), args.users, max(1, args.iterations // 20)
+            )
+        finally:
+            await backend.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--redis-url", help="also benchmark the Redis backend against this server")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("rate_limit", asyncio.run(run(args)), {**vars(args), "target_us": TARGET_US}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""CPU cost of serializing a /api/history response, before and after the orjson fast path.
+
+    python benchmarks/bench_serialization.py --entries 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from common import latency_summary, write_report
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.db.schemas import HistoryEntry, HistoryResponse
+
+
+def _rows(count: int) -> list[tuple[datetime, float | None, float | None]]:
+    start = datetime(2020, 1, 1)
+    return [(start + timedelta(hours=index), 60.0 + index % 20, 60.0) for index in range(count)]
+
+
+async def _model_path(rows, field) -> bytes:
+    """Previous behaviour: build models, re-validate via response_model, stdlib json."""
+
+    entries = [HistoryEntry(date=row[0].date(), weight=row[1] or row[2] or 0) for row in rows]
+    content = await serialize_response(
+        field=field, response_content=HistoryResponse(exercise="bench_press", data=entries), is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+async def _fast_path(rows, field) -> bytes:
+    entries = [
+        {"date": logged_at.date(), "weight": actual or target or 0} for logged_at, actual, target in rows
+    ]
+    return ORJSONResponse({"exercise": "bench_press", "data": entries}).body
+
+
+async def _measure(path, rows, field, repeat: int) -> dict[str, float]:
+    samples = []
+    cpu_started = time.process_time()
+    for _ in range(repeat):
+        started = time.process_time()
+        body = await path(rows, field)
+        samples.append((time.process_time() - started) * 1000)
+    summary = latency_summary(samples, time.process_time() - cpu_started)
+    summary["bytes"] = len(body)
+    return summary
+
+
+async def run(entries: int, repeat: int) -> dict[str, dict[str, float]]:
+    rows = _rows(entries)
+    field = create_response_field(name="history_response", type_=HistoryResponse)
+    results = {
+        "pydantic_stdlib_json": await _measure(_model_path, rows, field, repeat),
+        "dict_rows_orjson": await _measure(_fast_path, rows, field, repeat),
+    }
+    results["speedup"] = {
+        "p50_ratio": round(
+            results["pydantic_stdlib_json"]["p50_ms"] / max(results["dict_rows_orjson"]["p50_ms"], 1e-9), 2
+        )
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("serialization", asyncio.run(run(args.entries, args.repeat)), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Strength-standards batch job and lookup cost at scale.
+
+Generates ``--users`` synthetic profiles with strength estimates (with the
+same share of blanks real onboarding data has), times the vectorized
+percentile computation and the per-request starting-weight lookup. No
+database needed; ``--database-url`` additionally times the full
+``refresh`` (fetch + compute + write) against a database with onboarding data.
+
+    python benchmarks/bench_strength_standards.py --users 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from common import write_report
+
+import numpy as np
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.schemas import ProgramCreate
+from app.services import strength_standards as standards
+
+# Typical working weights (kg) for an 80kg male; scaled by sex and bodyweight.
+BASE_LIFTS = {
+    "bench_press": 70,
+    "back_squat": 90,
+    "deadlift": 110,
+    "lat_pulldown": 60,
+    "dumbbell_press": 24,
+    "dumbbell_row": 28,
+    "goblet_squat": 28,
+}
+
+
+def synthetic_columns(users: int, seed: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    sex = rng.choice(np.array([0, 1, standards.ANY], dtype=np.int16), users, p=[0.5, 0.45, 0.05])
+    weight = np.where(sex == 1, rng.normal(66, 11, users), rng.normal(84, 13, users))
+    age = rng.integers(16, 75, users).astype(np.float64)
+    weight[rng.random(users) < 0.15] = np.nan
+    age[rng.random(users) < 0.15] = np.nan
+
+    scale = np.where(sex == 1, 0.6, 1.0) * np.clip(np.nan_to_num(weight, nan=75) / 80, 0.6, 1.6)
+    lifts = {}
+    for lift, base in BASE_LIFTS.items():
+        values = base * scale * rng.lognormal(0, 0.25, users)
+        values[rng.random(users) < 0.4] = np.nan
+        lifts[lift] = values
+    return {"sex": sex, "weight_kg": weight, "age": age, "lifts": lifts}
+
+
+def time_lookups(iterations: int) -> dict[str, float]:
+    payloads = [
+        ProgramCreate(goal="hypertrophy", experience="intermediate", equipment=[], gender="female", weight_kg=63, age=29),
+        ProgramCreate(goal="strength", experience="advanced", equipment=[], gender="male", weight_kg=92, age=41),
+        ProgramCreate(goal="general", experience="beginner", equipment=[]),
+    ]
+    lifts = list(BASE_LIFTS)
+    started = time.perf_counter()
+    for i in range(iterations):
+        standards.strength_standards.starting_weight(lifts[i % len(lifts)], payloads[i % len(payloads)])
+    elapsed = time.perf_counter() - started
+    return {"lookups_per_second": round(iterations / elapsed, 1), "mean_us": round(elapsed / iterations * 1e6, 3)}
+
+
+async def time_refresh(database_url: str) -> dict[str, float]:
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            return await standards.refresh(conn)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="also time the full refresh against this database")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    columns = synthetic_columns(args.users, args.seed)
+    started = time.perf_counter()
+    rows = standards.compute_standards(columns["sex"], columns["weight_kg"], columns["age"], columns["lifts"])
+    compute_seconds = time.perf_counter() - started
+    standards.strength_standards.replace(rows)
+
+    results = {
+        "compute": {
+            "users": args.users,
+            "cohorts": len(rows),
+            "seconds": round(compute_seconds, 3),
+            "users_per_second": round(args.users / compute_seconds, 1),
+        },
+        "lookup": time_lookups(args.lookups),
+    }
+    if args.database_url:
+        results["refresh"] = asyncio.run(time_refresh(args.database_url))
+    write_report("strength_standards", results, vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Request validation throughput for WorkoutLogRequest and ProgramCreate.
+
+Version-agnostic so the same script can be run under pydantic v1 and v2 to
+compare the two cores.
+
+    python benchmarks/bench_validation.py --iterations 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+
+from common import write_report
+
+import pydantic
+
+from app.db.schemas import ProgramCreate, WorkoutLogRequest
+
+PAYLOADS = {
+    "WorkoutLogRequest": (
+        WorkoutLogRequest,
+        {
+            "workout_id": str(uuid.uuid4()),
+            "exercise_id": "bench_press",
+            "actual_weight": "62.5",
+            "target_weight": 60,
+            "sets": 3,
+            "reps": "8,8,8",
+            "completed": True,
+        },
+    ),
+    "ProgramCreate": (
+        ProgramCreate,
+        {
+            "goal": "hypertrophy",
+            "experience": "intermediate",
+            "equipment": ["barbell", "dumbbells", "cable"],
+            "lifts": {"bench": 60, "squat": "80", "deadlift": 100.0},
+            "gender": "female",
+            "age": 31,
+            "height_cm": 170,
+            "weight_kg": 64.5,
+            "training_days_per_week": 4,
+        },
+    ),
+}
+
+
+def _validator(model):
+    return getattr(model, "model_validate", None) or model.parse_obj
+
+
+def run(iterations: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, (model, payload) in PAYLOADS.items():
+        validate = _validator(model)
+        for _ in range(1000):
+            validate(payload)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            validate(payload)
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            "validations_per_second": round(iterations / elapsed, 1),
+            "mean_us": round(elapsed / iterations * 1_000_000, 3),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    config = {**vars(args), "pydantic_version": pydantic.VERSION}
+    write_report("validation", run(args.iterations), config, args.output)
+
+
+if __name__ == "__main__":
+    main()
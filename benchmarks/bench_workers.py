@@ -0,0 +1,118 @@
+"""Single-worker vs multi-worker throughput of ``python -m app.server``.
+
+Seed first (``benchmarks/seed.py``). For each ``--workers`` value this starts
+the production entry point on a free local port against ``--database-url``,
+waits for ``/ready``, runs ``load_test.py``'s traffic mix for ``--duration``
+seconds and stops the server. Every configuration gets the same
+``DB_CONNECTION_BUDGET``, so the comparison includes the smaller per-worker
+pools. Reports latency and throughput per configuration and the speed-up
+over the first one.
+
+    python benchmarks/bench_workers.py --workers 1 4 --concurrency 128 --duration 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR, DEFAULT_DATABASE_URL, write_report
+
+import httpx
+
+import load_test
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"{base_url} not ready after {timeout}s")
+
+
+async def run_config(workers: int, args: argparse.Namespace) -> dict[str, float]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "DB_CONNECTION_BUDGET": str(args.budget),
+        # Measure the server rather than the limiter; bench_rate_limit.py covers that.
+        "RATE_LIMIT_ENABLED": "false",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await _wait_ready(base_url, args.startup_timeout)
+        load_args = argparse.Namespace(
+            base_url=base_url,
+            database_url=args.database_url,
+            users=args.users,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            init_every=args.init_every,
+            seed=args.seed,
+        )
+        results = await load_test.run(load_args)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    summary = results["all"]
+    summary["workers"] = workers
+    return summary
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    results = {}
+    for workers in args.workers:
+        results[f"workers_{workers}"] = await run_config(workers, args)
+    baseline = results[f"workers_{args.workers[0]}"]["throughput_rps"]
+    results["scaling"] = {
+        f"workers_{workers}": round(results[f"workers_{workers}"]["throughput_rps"] / max(baseline, 1e-9), 2)
+        for workers in args.workers
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--budget", type=int, default=80, help="DB_CONNECTION_BUDGET for every configuration")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per configuration")
+    parser.add_argument("--init-every", type=int, default=20)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("workers", asyncio.run(run(args)), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
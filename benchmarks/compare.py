@@ -0,0 +1,62 @@
+"""Compare a benchmark report against a baseline and fail on regressions.
+
+    python benchmarks/compare.py baseline.json current.json --tolerance 0.15
+
+Latency keys (``*_ms``) regress when they grow, throughput keys (``*_rps``,
+``*_per_second``) when they shrink, by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any
+
+
+def _flatten(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def regressions(baseline: dict[str, Any], current: dict[str, Any], tolerance: float) -> list[str]:
+    base, cur = _flatten(baseline["results"]), _flatten(current["results"])
+    found = []
+    for key, old in sorted(base.items()):
+        new = cur.get(key)
+        if new is None or old == 0:
+            continue
+        change = (new - old) / old
+        if key.endswith("_ms") and change > tolerance:
+            found.append(f"{key}: {old:g} -> {new:g} ({change:+.1%})")
+        elif key.endswith(("_rps", "_per_second")) and change < -tolerance:
+            found.append(f"{key}: {old:g} -> {new:g} ({change:+.1%})")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+
+    found = regressions(baseline, current, args.tolerance)
+    for line in found:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
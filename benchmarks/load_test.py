@@ -0,0 +1,166 @@
+"""Drive every API route with concurrent async clients and report latency percentiles.
+
+Seed first (``benchmarks/seed.py``), then either point at a running server::
+
+    python benchmarks/load_test.py --base-url http://localhost:8000 --concurrency 64
+
+or omit ``--base-url`` to run the app in-process against ``--database-url``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import defaultdict
+
+from common import DEFAULT_DATABASE_URL, latency_summary, write_report
+
+import httpx
+
+from seed import token_for
+
+GUIDE_EXERCISES = ["bench_press", "back_squat", "lat_pulldown", "romanian_deadlift"]
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, name: str, request) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.samples[name].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response
+
+
+async def _session(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    user_index: int,
+    deadline: float,
+    init_every: int,
+    rng: random.Random,
+) -> None:
+    """One virtual user: fetch today's plan, log sets, check history, finish."""
+
+    headers = {"Authorization": f"Bearer {token_for(user_index)}"}
+    iteration = 0
+    while time.perf_counter() < deadline:
+        if init_every and iteration % init_every == 0:
+            await recorder.call(
+                "POST /api/program/init",
+                client.post(
+                    "/api/program/init",
+                    headers=headers,
+                    json={
+                        "goal": "hypertrophy",
+                        "experience": "intermediate",
+                        "equipment": ["full_gym"],
+                        "lifts": {"bench": rng.choice([60, 62.5, 80]), "squat": 100},
+                        "training_days_per_week": rng.choice([3, 4, 5]),
+                    },
+                ),
+            )
+        iteration += 1
+
+        today = await recorder.call("GET /api/workout/today", client.get("/api/workout/today", headers=headers))
+        if today is None:
+            continue
+        plan = today.json()
+        for exercise in plan["exercises"]:
+            await recorder.call(
+                "POST /api/workout/log",
+                client.post(
+                    "/api/workout/log",
+                    headers=headers,
+                    json={
+                        "workout_id": plan["workout_id"],
+                        "exercise_id": exercise["id"],
+                        "actual_weight": exercise.get("target_weight"),
+                        "target_weight": exercise.get("target_weight"),
+                        "sets": exercise.get("sets"),
+                        "reps": "8,8,8",
+                    },
+                ),
+            )
+            await recorder.call(
+                "GET /api/history",
+                client.get("/api/history", headers=headers, params={"exercise_id": exercise["id"]}),
+            )
+        await recorder.call(
+            "POST /api/exercise/guide",
+            client.post("/api/exercise/guide", headers=headers, json={"exercise_name": rng.choice(GUIDE_EXERCISES)}),
+        )
+        await recorder.call(
+            "POST /api/workout/finish",
+            client.post("/api/workout/finish", headers=headers, params={"workout_id": plan["workout_id"]}),
+        )
+
+
+def _client(base_url: str | None, database_url: str, concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30)
+
+    os.environ["DATABASE_URL"] = database_url
+    # Measure the app rather than the limiter; bench_rate_limit.py covers that.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    from app.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    async with _client(args.base_url, args.database_url, args.concurrency) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                _session(client, recorder, index % args.users, deadline, args.init_every, random.Random(rng.random()))
+                for index in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    results = {
+        name: latency_summary(samples, elapsed, recorder.errors[name])
+        for name, samples in sorted(recorder.samples.items())
+    }
+    results["all"] = latency_summary(
+        [sample for samples in recorder.samples.values() for sample in samples],
+        elapsed,
+        sum(recorder.errors.values()),
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=100, help="number of seeded users to spread clients over")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--init-every", type=int, default=20, help="call /program/init every N iterations (0 disables)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    write_report("load_test", asyncio.run(run(args)), vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Seed a benchmark database with synthetic users and workout history.
+
+Example (1k users x 1k logs = 1M workout_logs rows)::
+
+    python benchmarks/seed.py --users 1000 --logs-per-user 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from common import DEFAULT_DATABASE_URL, write_report
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.base import Base
+from app.db.exercise_seed import DEFAULT_EXERCISES
+from app.db.models import Exercise, Program, User, Workout, WorkoutLog
+from app.db.partitions import add_months, create_default_partition, ensure_partitions
+from app.db.schemas import ProgramCreate
+from app.db.utils import resolve_user_id
+from app.services.ai_program import generate_program
+
+
+def token_for(index: int) -> str:
+    """Bearer token of the ``index``-th synthetic user (see ``resolve_user_id``)."""
+
+    return f"bench-user-{index:07d}"
+
+
+async def _user_rows(index: int, logs_per_user: int, logs_per_workout: int, rng: random.Random):
+    user_id = resolve_user_id(token_for(index))
+    now = datetime.utcnow()
+    program_json = await generate_program(
+        ProgramCreate(
+            goal="hypertrophy",
+            experience="intermediate",
+            equipment=["full_gym"],
+            lifts={"bench": rng.choice([40, 60, 80, 100]), "squat": rng.choice([60, 80, 100, 140])},
+            training_days_per_week=rng.choice([3, 4, 5]),
+        )
+    )
+    user = {"id": user_id, "email": f"{token_for(index)}@example.com", "created_at": now}
+    program = {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "split": program_json["split"],
+        "program_json": program_json,
+        "created_at": now - timedelta(days=365),
+    }
+
+    workouts, logs = [], []
+    days = program_json["days"]
+    workout_count = max(1, -(-logs_per_user // logs_per_workout))
+    for workout_index in range(workout_count):
+        performed = now - timedelta(days=workout_count - workout_index)
+        day = days[workout_index % len(days)]
+        workout_id = uuid.uuid4()
+        workouts.append(
+            {
+                "id": workout_id,
+                "user_id": user_id,
+                "program_id": program["id"],
+                "day_index": workout_index % len(days),
+                "day_name": day["day"],
+                "plan_json": day,
+                # Keep seeded history off today's date so /today builds a fresh plan.
+                "date": min(performed.date(), date.today() - timedelta(days=1)),
+                "started_at": performed,
+                "finished_at": performed + timedelta(hours=1),
+            }
+        )
+        for log_index in range(min(logs_per_workout, logs_per_user - len(logs))):
+            exercise = day["exercises"][log_index % len(day["exercises"])]
+            weight = float(exercise["target_weight"]) + rng.choice([-2.5, 0.0, 2.5])
+            logs.append(
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "workout_id": workout_id,
+                    "exercise_id": exercise["id"],
+                    "actual_weight": weight,
+                    "target_weight": exercise["target_weight"],
+                    "sets": exercise["sets"],
+                    "reps": ",".join(str(rng.choice([6, 8, 10])) for _ in range(exercise["sets"])),
+                    "completed": rng.random() > 0.1,
+                    "logged_at": performed + timedelta(minutes=log_index),
+                }
+            )
+    return user, program, workouts, logs
+
+
+async def seed(
+    database_url: str,
+    users: int,
+    logs_per_user: int,
+    logs_per_workout: int,
+    create_schema: bool,
+    seed_value: int,
+) -> dict[str, float]:
+    rng = random.Random(seed_value)
+    engine = create_async_engine(database_url)
+    started = time.perf_counter()
+
+    if create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            # workout_logs is partitioned: cover the seeded history plus a few months ahead.
+            history_days = -(-logs_per_user // logs_per_workout) + 1
+            first = (datetime.utcnow() - timedelta(days=history_days)).date()
+            await ensure_partitions(conn, first, add_months(date.today().replace(day=1), 3))
+            await create_default_partition(conn)
+            await conn.execute(
+                insert(Exercise),
+                [
+                    {"id": id_, "name": name, "aliases": aliases, "muscle_groups": muscles, "equipment": equipment}
+                    for id_, name, aliases, muscles, equipment in DEFAULT_EXERCISES
+                ],
+            )
+
+    total_logs = 0
+    for index in range(users):
+        user, program, workouts, logs = await _user_rows(index, logs_per_user, logs_per_workout, rng)
+        async with engine.begin() as conn:
+            await conn.execute(insert(User), [user])
+            await conn.execute(insert(Program), [program])
+            await conn.execute(insert(Workout), workouts)
+            for offset in range(0, len(logs), 5000):
+                await conn.execute(insert(WorkoutLog), logs[offset : offset + 5000])
+        total_logs += len(logs)
+
+    await engine.dispose()
+    elapsed = time.perf_counter() - started
+    return {
+        "users": users,
+        "workout_logs": total_logs,
+        "seconds": round(elapsed, 2),
+        "logs_per_second": round(total_logs / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--logs-per-user", type=int, default=1000, help="history depth per user")
+    parser.add_argument("--logs-per-workout", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed for reproducible data")
+    parser.add_argument(
+        "--no-create-schema",
+        dest="create_schema",
+        action="store_false",
+        help="reuse an existing schema (e.g. after `alembic upgrade head`) instead of recreating it",
+    )
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        seed(args.database_url, args.users, args.logs_per_user, args.logs_per_workout, args.create_schema, args.seed)
+    )
+    write_report("seed", results, vars(args), args.output)
+
+
+if __name__ == "__main__":
+    main()